@@ -3,16 +3,35 @@
 
 This helper is intended for CI-like reproducible runs that vary the energy budget
 so the KPI trend shows a line rather than a single point.
+
+With --service ADDR (or --service auto to start one for this batch) the
+feasibility, KPI and gate steps go to a warm reactor.service process instead of
+one Python subprocess each; the same files are written.
+
+With --in-process the whole chain runs through reactor.pipeline in a worker
+pool: stages pass results in memory, each run gets its own metrics dict, and
+only the KPI artifacts are written (--write-intermediate adds the feasibility
+reports). --runs N spreads N energy budgets over the default range.
 """
 from __future__ import annotations
 
+import argparse
 import json
+import os
 import subprocess
+import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 PY = str(ROOT / "src")
+if PY not in sys.path:
+    sys.path.insert(0, PY)
+
+from reactor.pipeline import DEMO_FEASIBILITY as FEASIBILITY_ARGS
+
+ENERGY_BUDGETS = [12_000_000, 11_500_000, 11_150_000, 10_800_000, 10_500_000]
 
 def run(cmd, env=None, check=True):
     ev = {}
@@ -26,8 +45,86 @@ def run(cmd, env=None, check=True):
         raise
 
 def main():
-    ENEGS = [12_000_000, 11_500_000, 11_150_000, 10_800_000, 10_500_000]
-    for i, eb in enumerate(ENEGS):
+    ap = argparse.ArgumentParser(description="Batch demo->feasibility->KPI->gate runs")
+    ap.add_argument(
+        "--service",
+        default=None,
+        help="Address of a running reactor.service (socket path or host:port), or 'auto' to start one",
+    )
+    ap.add_argument("--in-process", action="store_true", help="Run the chain via reactor.pipeline (no subprocesses)")
+    ap.add_argument("--runs", type=int, default=None, help="With --in-process: number of runs (default 5)")
+    ap.add_argument("--workers", type=int, default=None, help="With --in-process: worker processes (default CPU count)")
+    ap.add_argument(
+        "--write-intermediate",
+        action="store_true",
+        help="With --in-process: also write feasibility_<tag>.json per run",
+    )
+    args = ap.parse_args()
+    if args.in_process:
+        return run_pipeline(args)
+    if args.service is None:
+        return run_chain(None)
+    from reactor.service import ServiceClient, spawn
+
+    proc = None
+    address = args.service
+    if address == "auto":
+        address = os.path.join(tempfile.mkdtemp(prefix="reactor-svc-"), "reactor.sock")
+        proc = spawn(address)
+    try:
+        with ServiceClient(address) as client:
+            run_chain(client)
+            if proc is not None:
+                client.call("shutdown")
+    finally:
+        if proc is not None:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def run_pipeline(args):
+    import numpy as np
+
+    from reactor.pipeline import run_batch
+    from reactor.reports import count_anomalies
+
+    budgets = ENERGY_BUDGETS
+    if args.runs is not None:
+        budgets = np.linspace(ENERGY_BUDGETS[0], ENERGY_BUDGETS[-1], int(args.runs)).tolist()
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    runs = [
+        {"run_id": f"{stamp}_{i:02d}", "seed": 123 + i, "metrics": {"energy_budget_J": eb}}
+        for i, eb in enumerate(budgets)
+    ]
+    shared = {
+        "scenario": str(ROOT / "examples" / "scenario_min.json"),
+        "steps": 10,
+        "feasibility_args": FEASIBILITY_ARGS,
+        "kpi_drop_fom": True,
+        "require_yield": True,
+        "uq": json.loads(Path("uq_optimized.json").read_text()) if Path("uq_optimized.json").exists() else {},
+        "cost_model": json.loads(Path("configs/cost_model.json").read_text()) if Path("configs/cost_model.json").exists() else {},
+        "anomaly_counts": count_anomalies("docs/timeline_anomalies.ndjson"),
+    }
+    artifacts = {"kpi": "artifacts/production_kpi_{run_id}.json"}
+    if args.write_intermediate:
+        artifacts["feasibility"] = "feasibility_{run_id}.json"
+    failed = 0
+    for res in run_batch(runs, shared=shared, artifacts=artifacts, workers=args.workers):
+        rep = res["report"]
+        failed += not rep["gate_ok"]
+        print(json.dumps(rep))
+    print(json.dumps({"runs": len(runs), "gate_failures": failed}))
+    if failed:
+        raise SystemExit(2)
+    run(["python", "scripts/plot_kpi_trend.py", "--glob", "artifacts/production_kpi_*.json", "--require-passing", "--out", "artifacts/kpi_trend.png"])
+    print("Plotted artifacts/kpi_trend.png")
+
+
+def run_chain(client=None):
+    for i, eb in enumerate(ENERGY_BUDGETS):
         tag = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ") + f"_{i:02d}"
         timeline = f"timeline_{tag}.ndjson"
         feas_orig = f"feasibility_{tag}.json"
@@ -38,22 +135,14 @@ def main():
         run(["python", "scripts/demo_runner.py", "--scenario", "examples/scenario_min.json", "--steps", "10", "--dt", "0.002", "--timeline-log", timeline, "--timeline-budget", "10", "--seed", str(123 + i)])
 
         # 2) feasibility generation with yield model (ensures antiproton_yield_pass present)
-        run([
-            "python",
-            "scripts/generate_feasibility_report.py",
-            "--gamma-series", "[150,150,150,150,150]",
-            "--dt", "0.002",
-            "--b-series", "[5,5,5,5]",
-            "--E-mag", "[0,1e20,1e20,1e20]",
-            "--yield-model", "threshold",
-            "--n-cm3", "1e20",
-            "--Te-eV", "10",
-            "--bennett-n0", "1e20",
-            "--bennett-xi", "2.0",
-            "--bennett-B", "5.0",
-            "--bennett-ripple", "5e-4",
-            "--out", feas_orig,
-        ])
+        if client is not None:
+            client.call("feasibility", out=feas_orig, **FEASIBILITY_ARGS)
+            print("wrote", feas_orig)
+        else:
+            cmd = ["python", "scripts/generate_feasibility_report.py"]
+            for k, v in FEASIBILITY_ARGS.items():
+                cmd += ["--" + k.replace("_", "-"), str(v)]
+            run(cmd + ["--out", feas_orig])
 
         # 3) write a copy of the feasibility without 'fom' so production_kpi falls back to cost-model/metrics
         data = json.loads(Path(feas_orig).read_text())
@@ -68,23 +157,33 @@ def main():
         print("wrote metrics.json energy_budget_J=", eb)
 
         # 5) run production_kpi to produce artifact
-        run([
-            "python",
-            "scripts/production_kpi.py",
-            "--feasibility",
-            feas_nofom,
-            "--metrics",
-            "metrics.json",
-            "--uq",
-            "uq_optimized.json",
-            "--cost-model",
-            "configs/cost_model.json",
-            "--out",
-            str(outpk),
-        ])
+        if client is not None:
+            client.call("kpi", feasibility=feas_nofom, metrics="metrics.json", uq="uq_optimized.json",
+                        cost_model="configs/cost_model.json", out=str(outpk))
+        else:
+            run([
+                "python",
+                "scripts/production_kpi.py",
+                "--feasibility",
+                feas_nofom,
+                "--metrics",
+                "metrics.json",
+                "--uq",
+                "uq_optimized.json",
+                "--cost-model",
+                "configs/cost_model.json",
+                "--out",
+                str(outpk),
+            ])
 
         # 6) validate gates using the original feasibility (which includes antiproton_yield_pass)
-        run(["python", "scripts/metrics_gate.py", "--metrics", "metrics.json", "--report", feas_orig, "--require-yield"])
+        if client is not None:
+            res = client.call("gate", metrics="metrics.json", reports=[feas_orig], require_yield=True)
+            print(json.dumps(res))
+            if not res["ok"]:
+                raise SystemExit(2)
+        else:
+            run(["python", "scripts/metrics_gate.py", "--metrics", "metrics.json", "--report", feas_orig, "--require-yield"])
         print("wrote and validated:", outpk)
 
     # plot the trend from generated artifacts
@@ -15,8 +15,9 @@ _src = os.path.join(_root, "src")
 if _src not in sys.path:
     sys.path.insert(0, _src)
 
-from reactor.metrics import antiproton_yield_estimator, total_fom
+from reactor.metrics import antiproton_yield_persistent, total_fom, total_fom_vec
 from reactor.plotting import _mpl
+from reactor.sensitivity import morris_screening, sobol_indices
 
 
 def main() -> None:
@@ -30,7 +31,11 @@ def main() -> None:
     ap.add_argument("--out-csv", default="cost_sweep.csv")
     ap.add_argument("--out-png", default="cost_sweep.png")
     ap.add_argument("--seed", type=int, default=123)
-    ap.add_argument("--sensitivity", action="store_true", help="Vary price and energy cost jointly and emit sensitivity report")
+    ap.add_argument(
+        "--sensitivity",
+        action="store_true",
+        help="Add Sobol indices and Morris screening of fom over the cost/price ranges to the JSON",
+    )
     args = ap.parse_args()
 
     import numpy as np
@@ -38,23 +43,31 @@ def main() -> None:
     costs = np.geomspace(max(args.cost_min, 1e-12), max(args.cost_max, args.cost_min+1e-12), args.n)
     prices = np.geomspace(max(args.price_min, 1e-12), max(args.price_max, args.price_min+1e-12), args.n)
     # fixed physics point for comparability
-    y_base = antiproton_yield_estimator(1e21, 20.0, {"model": "physics"})
+    y_base = antiproton_yield_persistent(1e21, 20.0, {"model": "physics"})
     E_total = 1e10
     rows: List[dict] = []
     for c in costs:
         for p in prices:
-            # sensitivity mode: introduce tiny coupled perturbation for visualization (deterministic by seed)
             cp = float(c)
             pp = float(p)
-            if args.sensitivity:
-                delta = 0.01 * (np.sin(cp * 1e6) + np.cos(pp * 1e3))
-                cp = max(1e-12, cp * (1.0 + delta))
-                pp = max(1e-12, pp * (1.0 - delta))
             fom = total_fom(y_base * pp, E_total * (1.0 + cp))
             rows.append({"energy_cost_J": float(cp), "price_scale": float(pp), "fom": float(fom)})
+    payload = {"n": len(rows), "rows": rows}
+
+    if args.sensitivity:
+        ranges = {"energy_cost_J": (costs[0], costs[-1]), "price_scale": (prices[0], prices[-1])}
+
+        def _fom(cols):
+            return {"fom": total_fom_vec(y_base * cols["price_scale"], E_total * (1.0 + cols["energy_cost_J"]))}
+
+        logs = list(ranges)
+        payload["sensitivity"] = {
+            "sobol": sobol_indices(_fom, ranges, "fom", n=1024, seed=args.seed, log_params=logs),
+            "morris": morris_screening(_fom, ranges, "fom", r=50, seed=args.seed, log_params=logs),
+        }
 
     # write JSON and CSV
-    Path(args.out_json).write_text(json.dumps({"n": len(rows), "rows": rows}))
+    Path(args.out_json).write_text(json.dumps(payload))
     with open(args.out_csv, "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=["energy_cost_J", "price_scale", "fom"])
         w.writeheader(); w.writerows(rows)
@@ -14,7 +14,7 @@ _src = os.path.join(_root, "src")
 if _src not in sys.path:
     sys.path.insert(0, _src)
 
-from reactor.config import load_json
+from reactor.config import Scenario, load_scenario
 from reactor.core import Reactor
 from reactor.energy import EnergyLedger, lg_mode_enhancement, plot_energy_reduction
 from reactor.metrics import antiproton_yield_estimator, log_fom, log_fom_edge
@@ -60,38 +60,23 @@ def main():
     )
     args = ap.parse_args()
 
-    cfg = {}
-    if args.scenario:
-        cfg = load_json(args.scenario)
+    sc = load_scenario(args.scenario) if args.scenario else Scenario()
 
     # Prefer artifacts/timeline.ndjson by default
     default_artifacts_dir = os.path.join(_root, "artifacts")
     os.makedirs(default_artifacts_dir, exist_ok=True)
     default_timeline = os.path.join(default_artifacts_dir, "timeline.ndjson")
-    timeline_path = args.timeline_log or cfg.get("timeline_log_path") or default_timeline
-    xi = cfg.get("xi", 2.0)
-    br = cfg.get("b_field_ripple_pct", 0.005)
-    grid = tuple(cfg.get("grid", [32, 32]))
-    nu = float(cfg.get("nu", 1e-3))
-    # Optional B-field series in scenario
-    b_series = cfg.get("b_series", None)
+    timeline_path = args.timeline_log or sc.timeline_log_path or default_timeline
 
     random.seed(args.seed)
     from reactor.random_utils import set_seed
     set_seed(int(args.seed))
-    import numpy as _np
-    b_arr = _np.array(b_series, dtype=float) if b_series is not None else None
     R = Reactor(
-        grid=grid,
-        nu=nu,
-        timeline_log_path=timeline_path,
-        xi=xi,
-        b_field_ripple_pct=br,
-        timeline_budget=int(args.timeline_budget)
-        if args.timeline_budget is not None
-        else None,
+        **sc.reactor_kwargs(
+            timeline_log_path=timeline_path,
+            timeline_budget=int(args.timeline_budget) if args.timeline_budget is not None else None,
+        ),
         enforce_density=bool(args.enforce_density),
-        b_series=b_arr,
     )
     # log a run_started event with seed if timeline is enabled
     if timeline_path:
@@ -14,23 +14,30 @@ _src = os.path.join(_root, "src")
 if _src not in sys.path:
     sys.path.insert(0, _src)
 
-from reactor.metrics import antiproton_yield_estimator, total_fom
+from reactor.checkpoint import SweepStore
+from reactor.evalcache import cached_eval
+from reactor.frontier import TopK, tap
+from reactor.metrics import antiproton_yield_cached, antiproton_yield_vec, total_fom, total_fom_vec
+from reactor.refine import refine_envelope
+from reactor.surrogate import fallback_model
+from reactor.sweep import Axis, evaluate_chunk, grid_size, iter_rows, points
+from reactor.thresholds import Thresholds
 
 
 def compute_fom(n_cm3: float, Te_eV: float) -> float:
     # Use physics model yield and proxy energy to get FOM
-    y = antiproton_yield_estimator(n_cm3, Te_eV, {"model": "physics"})
+    y = antiproton_yield_cached(n_cm3, Te_eV, {"model": "physics"})
     E_total = 1e11  # fixed proxy energy for envelope comparison
     return float(total_fom(y, E_total))
 
 
-from typing import Any, Dict, List
+def compute_fom_vec(n_cm3, Te_eV):
+    """Array form of compute_fom for adaptive refinement batches."""
+    y = antiproton_yield_vec(n_cm3, Te_eV, {"model": "physics"})
+    return total_fom_vec(y, 1e11)
 
 
-def _frontier_topk(grid: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
-    if k <= 0:
-        return []
-    return sorted(grid, key=lambda r: float(r.get("fom", 0.0)), reverse=True)[:k]
+from typing import Any, Dict, List
 
 
 def main() -> None:
@@ -47,24 +54,115 @@ def main() -> None:
     ap.add_argument("--seed", type=int, default=42, help="Seed for any stochastic models")
     ap.add_argument("--top-k", type=int, default=20, help="Emit top-k frontier JSON")
     ap.add_argument("--frontier-json", default="artifacts/operating_envelope_frontier.json")
+    ap.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Persist completed grid chunks here; rerunning the same command resumes",
+    )
+    ap.add_argument("--checkpoint-chunk", type=int, default=1024, help="Grid points per checkpointed chunk")
+    ap.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Refine a coarse grid near the FOM contour and steep regions instead of a uniform grid",
+    )
+    ap.add_argument("--fom-level", type=float, default=Thresholds().fom_min, help="Contour level for --adaptive")
+    ap.add_argument("--coarse", type=int, default=8, help="Starting cells per axis for --adaptive")
+    ap.add_argument("--max-depth", type=int, default=6, help="Maximum cell halvings for --adaptive")
+    ap.add_argument("--grad-tol", type=float, default=0.1, help="Split cells whose log-FOM spread exceeds this fraction")
+    ap.add_argument("--max-points", type=int, default=None, help="Evaluation budget for --adaptive")
+    ap.add_argument(
+        "--surrogate",
+        choices=["gp", "pce"],
+        default=None,
+        help="Answer FOM queries from a surrogate fitted on a small design, falling back to the model "
+        "where its predictive std exceeds --surrogate-max-std",
+    )
+    ap.add_argument("--surrogate-design", type=int, default=64, help="Model runs used to fit --surrogate")
+    ap.add_argument("--surrogate-max-std", type=float, default=0.05, help="Largest surrogate std, in log10(FOM) units")
     args = ap.parse_args()
 
     import numpy as np
     np.random.seed(int(args.seed))
-    ns = np.geomspace(float(args.n_min), float(args.n_max), int(args.n_points))
-    Ts = np.linspace(float(args.t_min), float(args.t_max), int(args.n_points))
-    grid: List[Dict[str, Any]] = []
-    for n in ns:
-        for T in Ts:
-            fom_val = compute_fom(float(n), float(T))
-            grid.append({"n_cm3": float(n), "Te_eV": float(T), "fom": float(fom_val)})
+    adaptive: Dict[str, Any] = {}
+    fom_vec = compute_fom_vec
+    surrogate: Dict[str, Any] = {}
+    if args.surrogate:
+        fb, cv = fallback_model(
+            lambda c: {"fom": compute_fom_vec(c["n_cm3"], c["Te_eV"])},
+            {"n_cm3": (float(args.n_min), float(args.n_max)), "Te_eV": (float(args.t_min), float(args.t_max))},
+            "fom",
+            float(args.surrogate_max_std),
+            kind=args.surrogate,
+            n_design=int(args.surrogate_design),
+            seed=int(args.seed),
+            log_params=["n_cm3"],
+            log_y=True,
+        )
+        surrogate = {"kind": args.surrogate, "max_std": float(args.surrogate_max_std), "cv": cv}
+
+        def fom_vec(n_cm3, Te_eV):
+            return fb({"n_cm3": np.asarray(n_cm3, dtype=float), "Te_eV": np.asarray(Te_eV, dtype=float)})["fom"]
+
+    if args.adaptive:
+        ref = refine_envelope(
+            fom_vec,
+            (float(args.n_min), float(args.n_max)),
+            (float(args.t_min), float(args.t_max)),
+            level=float(args.fom_level),
+            coarse=int(args.coarse),
+            max_depth=int(args.max_depth),
+            grad_tol=float(args.grad_tol),
+            log_x=True,
+            log_f=True,
+            max_points=args.max_points,
+        )
+        adaptive = ref.as_dict()
+        chunks = iter([{"n_cm3": ref.x, "Te_eV": ref.y, "fom": ref.f}])
+    else:
+        ns = np.geomspace(float(args.n_min), float(args.n_max), int(args.n_points))
+        Ts = np.linspace(float(args.t_min), float(args.t_max), int(args.n_points))
+        axes = [Axis("n_cm3", ns), Axis("Te_eV", Ts)]
+
+        def _fom(c: Dict[str, Any]) -> Dict[str, Any]:
+            return {"fom": np.array([compute_fom(float(n), float(T))
+                                     for n, T in zip(c["n_cm3"], c["Te_eV"], strict=True)])}
+
+        if args.surrogate:
+            def fom_eval(c: Dict[str, Any]) -> Dict[str, Any]:
+                return {"fom": fom_vec(c["n_cm3"], c["Te_eV"])}
+        else:
+            # whole chunks are reused from $REACTOR_EVAL_CACHE across runs when it is set
+            fom_eval = cached_eval("envelope_sweep.compute_fom", _fom)
+
+        def _chunk(a: int, b: int) -> Dict[str, Any]:
+            return evaluate_chunk(points(axes, a, b), fom_eval)
+
+        if args.checkpoint_dir:
+            meta: Dict[str, Any] = {"mode": "envelope_sweep"}
+            if args.surrogate:
+                meta["surrogate"] = {"kind": args.surrogate, "design": int(args.surrogate_design),
+                                     "max_std": float(args.surrogate_max_std)}
+            store = SweepStore(args.checkpoint_dir, axes, chunk_size=int(args.checkpoint_chunk), seed=int(args.seed),
+                               meta=meta, code=[__file__])
+            chunks = store.run(_chunk)
+        else:
+            chunks = (_chunk(a, min(a + 1024, grid_size(axes))) for a in range(0, grid_size(axes), 1024))
+    # bounded-heap style top-k fed while streaming; never sorts the full grid
+    top = TopK(int(args.top_k), "fom")
+    grid: List[Dict[str, Any]] = [r for ch in tap(chunks, top) for r in iter_rows(ch)]
 
     # Save JSON and CSV
     Path(Path(args.out_json).parent).mkdir(parents=True, exist_ok=True)
     Path(Path(args.out_csv).parent).mkdir(parents=True, exist_ok=True)
     Path(Path(args.frontier_json).parent).mkdir(parents=True, exist_ok=True)
-    Path(args.out_json).write_text(json.dumps({"grid": grid, "n_points": int(args.n_points)}))
-    frontier = _frontier_topk(grid, int(args.top_k))
+    # uniform grids report points per axis (as before); adaptive grids report the points actually evaluated
+    payload: Dict[str, Any] = {"grid": grid, "n_points": len(grid) if args.adaptive else int(args.n_points)}
+    if args.adaptive:
+        payload["adaptive"] = adaptive
+    if args.surrogate:
+        payload["surrogate"] = {**surrogate, **fb.stats()}
+    Path(args.out_json).write_text(json.dumps(payload))
+    frontier = top.rows()
     Path(args.frontier_json).write_text(json.dumps({"frontier": frontier, "k": int(args.top_k)}))
     with open(args.out_csv, "w", newline="", encoding="utf-8") as out_f:
         w = csv.writer(out_f)
@@ -85,7 +183,7 @@ def main() -> None:
         F = np.array([r["fom"] for r in grid])
         # reshape into square if possible, else scatter-color
         k = int(args.n_points)
-        if len(grid) == k*k:
+        if not args.adaptive and len(grid) == k*k:
             N2 = N.reshape(k,k)
             T2 = T.reshape(k,k)
             F2 = F.reshape(k,k)
@@ -94,6 +192,9 @@ def main() -> None:
         else:
             sc = ax.scatter(N, T, c=F, cmap="viridis")
             fig.colorbar(sc, ax=ax, label="FOM")
+        if adaptive.get("contour"):
+            C = np.array(adaptive["contour"])
+            ax.scatter(C[:, 0], C[:, 1], s=4, c="white", label=f"FOM = {adaptive['level']:g}")
         # highlight frontier points if any
         if frontier:
             NF = np.array([r["n_cm3"] for r in frontier])
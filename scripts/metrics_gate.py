@@ -3,8 +3,17 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+_src = os.path.join(_root, "src")
+if _src not in sys.path:
+    sys.path.insert(0, _src)
+
+from reactor.reports import gate_reports
+
 
 def main():
     ap = argparse.ArgumentParser(
@@ -26,7 +35,15 @@ def main():
         default=None,
         help="Optional scenario path or name to enable scenario-specific gates (e.g., high-load). If provided without a value, ignored.",
     )
+    ap.add_argument(
+        "--reports",
+        nargs="+",
+        default=None,
+        help="Gate many reports in one vectorized pass; prints one JSON summary with per-report results",
+    )
     args = ap.parse_args()
+    if args.reports:
+        return _main_batch(args)
     try:
         with open(args.metrics, "r", encoding="utf-8") as f:
             metrics = json.load(f)
@@ -40,47 +57,37 @@ def main():
     except Exception as e:
         print(json.dumps({"gate": "feasibility", "ok": False, "error": f"report load failed: {e}", "path": args.report}))
         sys.exit(2)
-    # Allow scenario inference from report when not explicitly provided
-    if not args.scenario:
-        rep_scenario = rep.get("scenario_id")
-        if isinstance(rep_scenario, str):
-            args.scenario = rep_scenario
-    # simple gate: require stable true when present
-    ok = True
-    reasons = []
-    # Only require overall stability for production-like scenarios; otherwise provide a soft warning.
-    if not rep.get("stable", False):
-        if args.scenario and ("high_load" in args.scenario or "production" in args.scenario):
-            ok = False
-            reasons.append("unstable")
-        else:
-            reasons.append("unstable")
-    # optional specific checks
-    gthr = metrics.get("gamma_min", None)
-    if gthr is not None and rep.get("gamma_stats"):
-        if rep["gamma_stats"].get("gamma_max", 0.0) < float(gthr):
-            ok = False
-            reasons.append(f"gamma_max<{gthr}")
-    # optional yield gate
-    if args.require_yield:
-        if not rep.get("antiproton_yield_pass", False):
-            ok = False
-            reasons.append("yield_gate_fail")
-
-    # High-load branch: require FOM >= 0.1 and include reason breakdown
-    if args.scenario and ("high_load" in args.scenario or "production" in args.scenario):
-        fom = rep.get("fom", None)
-        if fom is None and isinstance(rep.get("fom_details"), dict):
-            fom = rep["fom_details"].get("fom")
-        if fom is not None and float(fom) < 0.1:
-            ok = False
-            reasons.append("fom<0.1")
-
+    (ok,), (reasons,) = gate_reports([rep], metrics, args.require_yield, args.scenario)
     if not ok:
         print(json.dumps({"gate": "feasibility", "ok": False, "reasons": reasons}))
         sys.exit(2)
     print(json.dumps({"gate": "feasibility", "ok": True}))
 
 
+def _main_batch(args) -> None:
+    with open(args.metrics, "r", encoding="utf-8") as f:
+        metrics = json.load(f)
+    reports = []
+    errors = {}
+    for path in args.reports:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.loads(f.read().strip()))
+        except Exception as e:
+            errors[path] = f"report load failed: {e}"
+            reports.append({})
+    ok, reasons = gate_reports(reports, metrics, args.require_yield, args.scenario)
+    results = []
+    for path, r_ok, r_reasons in zip(args.reports, ok, reasons, strict=True):
+        row = {"path": path, "ok": bool(r_ok and path not in errors), "reasons": [] if path in errors else r_reasons}
+        if path in errors:
+            row["error"] = errors[path]
+        results.append(row)
+    n_ok = sum(r["ok"] for r in results)
+    print(json.dumps({"gate": "feasibility", "ok": n_ok == len(results), "n_ok": n_ok, "results": results}))
+    if n_ok != len(results):
+        sys.exit(2)
+
+
 if __name__ == "__main__":
     main()
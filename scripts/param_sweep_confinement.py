@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import argparse
-import csv
+import json
 import os
 import sys
 
@@ -13,14 +13,33 @@ _src = os.path.join(_root, "src")
 if _src not in sys.path:
     sys.path.insert(0, _src)
 
-from typing import Any, Callable, Dict, Iterable, List, Optional
-
-from reactor.analysis import bennett_confinement_check
-from reactor.metrics import (
-    antiproton_yield_estimator,
-    confinement_efficiency_estimator,
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from reactor.analysis_confinement import bennett_confinement_check_vec
+from reactor.checkpoint import SweepStore
+from reactor.evalcache import cached_eval
+from reactor.frontier import ParetoFront, tap
+from reactor.metrics import antiproton_yield_vec, confinement_efficiency_vec, total_fom_vec
+from reactor.optimize import METHODS, OptimizeResult, maximize, threshold_constraints
+from reactor.sweep import (
+    Axis,
+    Columns,
+    EvalFn,
+    concat_chunks,
+    evaluate_chunk,
+    filter_chunks,
+    grid_shape,
+    iter_sweep,
+    map_points,
+    run_sweep,
+    write_columns,
 )
 
+# (I_p, r_p, B) bounds searched by --optimize
+CONFINEMENT_BOUNDS = ((1.0, 50.0), (0.1, 1.0), (5.0, 10.0))
+
 quick_scatter: Optional[Callable[..., Any]]
 try:
     from reactor.plotting import quick_scatter as _quick_scatter
@@ -29,6 +48,27 @@ except Exception:
     quick_scatter = None
 
 
+def _store(args, mode: str, axes) -> Optional[SweepStore]:
+    if not args.checkpoint_dir:
+        return None
+    return SweepStore(
+        os.path.join(args.checkpoint_dir, mode),
+        axes,
+        chunk_size=args.checkpoint_chunk,
+        seed=args.seed,
+        meta={"mode": mode},
+        code=[__file__],
+    )
+
+
+def _sweep(args, mode: str, axes, evaluate: EvalFn):
+    """iter_sweep, or its checkpointed/resumable form when --checkpoint-dir is given."""
+    store = _store(args, mode, axes)
+    if store is None:
+        return iter_sweep(axes, evaluate)
+    return store.run_sweep(evaluate)
+
+
 def main():
     ap = argparse.ArgumentParser(
         description=(
@@ -78,8 +118,45 @@ def main():
         help="Optional JSONL (NDJSON) output path; one row per line",
     )
     ap.add_argument("--seed", type=int, default=None, help="Optional seed for deterministic behavior")
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for per-point Reactor sweeps (--full-sweep-with-dynamic-ripple)",
+    )
+    ap.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Persist completed chunks under DIR/<mode>; rerunning the same command resumes",
+    )
+    ap.add_argument("--checkpoint-chunk", type=int, default=4096, help="Points per checkpointed chunk")
+    ap.add_argument(
+        "--pareto-json",
+        default=None,
+        help=(
+            "Write Pareto frontiers (max fom/yield, min E_total/ripple) of the time and "
+            "dynamic-ripple sweeps to this JSON path"
+        ),
+    )
+    ap.add_argument(
+        "--optimize",
+        choices=METHODS,
+        default=None,
+        help="Search I_p/r_p/B for maximal eta under the confinement gates instead of grid-scanning them",
+    )
+    ap.add_argument("--budget", type=int, default=300, help="Evaluation budget for --optimize")
+    ap.add_argument("--optimize-out", default="data/optimized_confinement.json")
     args = ap.parse_args()
 
+    if args.optimize:
+        res = optimize_confinement_search(
+            *CONFINEMENT_BOUNDS, method=args.optimize, budget=args.budget, seed=int(args.seed or 0)
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(args.optimize_out)), exist_ok=True)
+        with open(args.optimize_out, "w", encoding="utf-8") as fh:
+            json.dump(res.as_dict(), fh, indent=2)
+        print(json.dumps({"wrote": args.optimize_out}))
+
     # Deterministic grid by construction; seed reserved for future stochastic variants
     xi_vals = [
         args.xi_min
@@ -92,50 +169,29 @@ def main():
         for j in range(args.ripple_steps)
     ]
 
-    # optional progress bar
-    def prog_iter_default(x: Iterable[float]) -> Iterable[float]:
-        return x
-    try:
-        from tqdm import tqdm
-
-        def prog_iter_tqdm(x: Iterable[float]) -> Iterable[float]:
-            return tqdm(x)
+    # Vectorized grid evaluation; rows are streamed from columns, not built as dicts
+    axes = [Axis.explicit("xi", xi_vals), Axis.explicit("b_field_ripple_pct", ripple_vals)]
 
-        prog_iter: Callable[[Iterable[float]], Iterable[float]] = prog_iter_tqdm
-    except Exception:
-        prog_iter = prog_iter_default
+    def _eff(c: Dict[str, Any]) -> Dict[str, Any]:
+        return {"efficiency": confinement_efficiency_vec(c["xi"], c["b_field_ripple_pct"])}
 
     # Ensure directory for --out exists
     out_dir = os.path.dirname(os.path.abspath(args.out)) or "."
     os.makedirs(out_dir, exist_ok=True)
-    with open(args.out, 'w', newline='') as f:
-        w = csv.writer(f)
-        w.writerow(["xi", "b_field_ripple_pct", "efficiency"])
-        rows: List[Dict[str, Any]] = []
-        for xi in prog_iter(xi_vals):
-            for rp in ripple_vals:
-                eff = confinement_efficiency_estimator(xi, rp)
-                w.writerow([xi, rp, eff])
-                rows.append({"xi": xi, "b_field_ripple_pct": rp, "efficiency": eff})
-    if args.json_out or args.jsonl_out:
-        import json
-        if args.json_out:
-            with open(args.json_out, "w", encoding="utf-8") as jf:
-                json.dump({"rows": rows}, jf, indent=2)
-        if args.jsonl_out:
-            with open(args.jsonl_out, "w", encoding="utf-8") as jlf:
-                for r in rows:
-                    jlf.write(json.dumps(r) + "\n")
-    if args.plot and quick_scatter is not None:
+    write_columns(
+        _sweep(args, "confinement", axes, _eff),
+        csv_path=args.out,
+        json_path=args.json_out,
+        json_indent=2,
+        jsonl_path=args.jsonl_out,
+    )
+    Z = None
+    if (args.plot or args.heatmap) and quick_scatter is not None:
+        Z = run_sweep(axes, _eff)["efficiency"].reshape(grid_shape(axes))
+    if args.plot and Z is not None and quick_scatter is not None:
         # flatten to a simple scatter over xi dimension by averaging over ripple
-        import numpy as np
-
-        rows2 = []
-        for xi in xi_vals:
-            effs = [confinement_efficiency_estimator(xi, rp) for rp in ripple_vals]
-            rows2.append((xi, float(np.mean(effs))))
-        xs = [r[0] for r in rows2]
-        ys = [r[1] for r in rows2]
+        xs = list(xi_vals)
+        ys = [float(v) for v in Z.mean(axis=1)]
         try:
             quick_scatter(
                 xs,
@@ -147,17 +203,11 @@ def main():
             )
         except Exception as e:  # pragma: no cover
             print(f"Plot failed: {e}")
-    if args.heatmap and quick_scatter is not None:
+    if args.heatmap and Z is not None:
         try:
-            import numpy as np
-
             from reactor.plotting import _mpl
 
             plt = _mpl()
-            Z = np.zeros((len(xi_vals), len(ripple_vals)))
-            for i, xi in enumerate(xi_vals):
-                for j, rp in enumerate(ripple_vals):
-                    Z[i, j] = confinement_efficiency_estimator(xi, rp)
             fig, ax = plt.subplots(figsize=(5, 4))
             extent = (
                 float(min(ripple_vals)),
@@ -178,8 +228,6 @@ def main():
     # Optional confinement vs energy-reduction scatter (synthetic mapping)
     if args.plot_confinement_energy:
         try:
-            import numpy as np
-
             from reactor.plotting import _mpl
 
             plt = _mpl()
@@ -198,128 +246,127 @@ def main():
             print(f"Confinement-energy plot failed: {e}")
 
     # Optional full sweep utility can be imported by other scripts
+    fronts: Dict[str, ParetoFront] = {}
 
     if args.full_sweep_with_ripple:
         # Small demo ranges to keep CI fast
-        import os as _os
-        from itertools import product
-        n_e_range = [1e19, 1e20, 1e21]
-        T_e_range = [5.0, 10.0, 20.0]
-        B_range = [4.5, 5.0, 5.5]
-        xi_range = [1.0, 2.0, 4.0]
-        alpha_range = [0.0, 0.01]
-        rows = []
-        for n_e, T_e, B, xi, alpha in product(n_e_range, T_e_range, B_range, xi_range, alpha_range):
-            ripple = 0.01 * max(0.0, 1.0 - alpha * 0.1)  # t=0.1 proxy
-            y = antiproton_yield_estimator(n_e, T_e, {"model": "physics"})
-            eta_ok = bennett_confinement_check(n_e, xi, B, ripple)
-            rows.append({"n_e": n_e, "T_e": T_e, "B": B, "xi": xi, "alpha": alpha, "yield": y, "eta": bool(eta_ok)})
-        _os.makedirs("data", exist_ok=True)
-        with open("data/full_sweep_with_ripple.csv", "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            w.writeheader()
-            for r in rows:
-                w.writerow(r)
+        axes = [
+            Axis.explicit("n_e", [1e19, 1e20, 1e21]),
+            Axis.explicit("T_e", [5.0, 10.0, 20.0]),
+            Axis.explicit("B", [4.5, 5.0, 5.5]),
+            Axis.explicit("xi", [1.0, 2.0, 4.0]),
+            Axis.explicit("alpha", [0.0, 0.01]),
+        ]
+
+        def _ripple_cols(c: Dict[str, Any]) -> Dict[str, Any]:
+            ripple = 0.01 * np.maximum(0.0, 1.0 - c["alpha"] * 0.1)  # t=0.1 proxy
+            return {
+                "yield": antiproton_yield_vec(c["n_e"], c["T_e"], {"model": "physics"}),
+                "eta": bennett_confinement_check_vec(c["n_e"], c["xi"], c["B"], ripple),
+            }
+
+        os.makedirs("data", exist_ok=True)
+        write_columns(_sweep(args, "full_sweep_with_ripple", axes, _ripple_cols), csv_path="data/full_sweep_with_ripple.csv")
 
     if args.full_sweep_with_time:
         # Include time dimension and compute FOM using a simple energy proxy E_total = t * 1e6
-        import csv as _csv
-        import os as _os
-        from itertools import product
-
-        n_e_range = [1e19, 1e20, 1e21]
-        T_e_range = [5.0, 10.0, 20.0]
-        B_range = [4.5, 5.0, 5.5]
-        xi_range = [1.0, 2.0, 4.0]
-        alpha_range = [0.0, 0.01]
-        t_range = [0.01, 0.1, 1.0]  # seconds
-        rows = []
-        for n_e, T_e, B, xi, alpha, t in product(n_e_range, T_e_range, B_range, xi_range, alpha_range, t_range):
-            ripple = 0.01 * max(0.0, 1.0 - alpha * t)
-            y = antiproton_yield_estimator(n_e, T_e, {"model": "physics"})
-            # energy proxy and FOM
-            E_total = max(1e-9, t) * 1e6
-            from reactor.metrics import total_fom as _fom
-            f = _fom(y, E_total)
-            eta_ok = bennett_confinement_check(n_e, xi, B, ripple)
-            rows.append({
-                "n_e": n_e,
-                "T_e": T_e,
-                "B": B,
-                "xi": xi,
-                "alpha": alpha,
-                "t": t,
+        axes = [
+            Axis.explicit("n_e", [1e19, 1e20, 1e21]),
+            Axis.explicit("T_e", [5.0, 10.0, 20.0]),
+            Axis.explicit("B", [4.5, 5.0, 5.5]),
+            Axis.explicit("xi", [1.0, 2.0, 4.0]),
+            Axis.explicit("alpha", [0.0, 0.01]),
+            Axis.explicit("t", [0.01, 0.1, 1.0]),  # seconds
+        ]
+
+        def _time_cols(c: Dict[str, Any]) -> Dict[str, Any]:
+            ripple = 0.01 * np.maximum(0.0, 1.0 - c["alpha"] * c["t"])
+            y = antiproton_yield_vec(c["n_e"], c["T_e"], {"model": "physics"})
+            E_total = np.maximum(1e-9, c["t"]) * 1e6
+            return {
                 "ripple": ripple,
                 "yield": y,
                 "E_total": E_total,
-                "fom": f,
-                "eta": bool(eta_ok),
-            })
-        _os.makedirs("data", exist_ok=True)
-        with open("data/full_sweep_with_time.csv", "w", newline="", encoding="utf-8") as f:
-            w = _csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            w.writeheader()
-            for r in rows:
-                w.writerow(r)
+                "fom": total_fom_vec(y, E_total),
+                "eta": bennett_confinement_check_vec(c["n_e"], c["xi"], c["B"], ripple),
+            }
+
+        os.makedirs("data", exist_ok=True)
+        front = ParetoFront({"fom": "max", "yield": "max", "E_total": "min", "ripple": "min"})
+        fronts["full_sweep_with_time"] = front
+        write_columns(
+            tap(_sweep(args, "full_sweep_with_time", axes, _time_cols), front),
+            csv_path="data/full_sweep_with_time.csv",
+        )
 
     if args.full_sweep_with_dynamic_ripple:
-        # Use Reactor.adjust_ripple to evolve ripple vs time given a synthetic B_series around mean B
-        from itertools import product
-
-        import numpy as _np
-
-        from reactor.analysis_fields import b_field_rms_fluctuation as _ripple
-        from reactor.core import Reactor as _Reactor
-
-        n_e_range = [1e19, 1e20, 1e21]
-        T_e_range = [5.0, 10.0, 20.0]
-        B_range = [5.0]  # use single mean for series generation
-        xi_range = [1.0, 2.0, 4.0]
-        alpha_range = [0.0, 0.01]
-        t_range = [0.01, 0.1, 1.0]
-        rows = []
-        for n_e, T_e, B, xi, alpha, t in product(n_e_range, T_e_range, B_range, xi_range, alpha_range, t_range):
-            # build B_series around B with small Gaussian ripple
-            base = float(B)
-            series = _np.ones(256) * base + _np.random.normal(0, 5e-5, 256)
-            R = _Reactor(grid=(16, 16), nu=1e-3, b_series=series)
-            R._time_s = float(t)
-            ripple0 = _ripple(R.B_series if R.B_series is not None else series)
-            ripple1 = R.adjust_ripple(alpha=float(alpha))
-            y = antiproton_yield_estimator(n_e, T_e, {"model": "physics"})
-            E_total = max(1e-9, t) * 1e6
-            from reactor.metrics import total_fom as _fom
-            f = _fom(y, E_total)
-            eta_ok = bennett_confinement_check(n_e, xi, base, ripple1)
-            rows.append({
-                "n_e": n_e, "T_e": T_e, "B": base, "xi": xi, "alpha": alpha, "t": t,
-                "ripple_initial": ripple0, "ripple_dynamic": ripple1,
-                "yield": y, "E_total": E_total, "fom": f, "eta": bool(eta_ok)
-            })
-        if rows:
-            import csv as _csv
-            import os as _os
-            _os.makedirs("data", exist_ok=True)
-            with open("data/full_sweep_with_dynamic_ripple.csv", "w", newline="", encoding="utf-8") as f:
-                w = _csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-                w.writeheader()
-                for r in rows:
-                    w.writerow(r)
+        # Use Reactor.adjust_ripple to evolve ripple vs time given a synthetic B_series around mean B.
+        # Each point builds a Reactor, so points are sharded across worker processes; every point
+        # draws from its own (seed, index) RNG stream, so output does not depend on --workers.
+        from reactor.core import dynamic_ripple_point
+
+        axes = [
+            Axis.explicit("n_e", [1e19, 1e20, 1e21]),
+            Axis.explicit("T_e", [5.0, 10.0, 20.0]),
+            Axis.explicit("B", [5.0]),  # use single mean for series generation
+            Axis.explicit("xi", [1.0, 2.0, 4.0]),
+            Axis.explicit("alpha", [0.0, 0.01]),
+            Axis.explicit("t", [0.01, 0.1, 1.0]),
+        ]
+
+        def _dynamic_cols(c: Dict[str, Any]) -> Dict[str, Any]:
+            y = antiproton_yield_vec(c["n_e"], c["T_e"], {"model": "physics"})
+            E_total = np.maximum(1e-9, c["t"]) * 1e6
+            return {
+                "yield": y,
+                "E_total": E_total,
+                "fom": total_fom_vec(y, E_total),
+                "eta": bennett_confinement_check_vec(c["n_e"], c["xi"], c["B"], c["ripple_dynamic"]),
+            }
+
+        def _dynamic_chunk(a: int, b: int) -> Columns:
+            shards = map_points(
+                axes, dynamic_ripple_point, seed=int(args.seed or 0), workers=args.workers,
+                chunk_size=16, start=a, stop=b,
+            )
+            return evaluate_chunk(concat_chunks(shards), _dynamic_cols)
+
+        store = _store(args, "full_sweep_with_dynamic_ripple", axes)
+        if store is None:
+            chunks = (evaluate_chunk(ch, _dynamic_cols) for ch in map_points(
+                axes, dynamic_ripple_point, seed=int(args.seed or 0), workers=args.workers))
+        else:
+            chunks = store.run(_dynamic_chunk)
+        os.makedirs("data", exist_ok=True)
+        front = ParetoFront({"fom": "max", "yield": "max", "E_total": "min", "ripple_dynamic": "min"})
+        fronts["full_sweep_with_dynamic_ripple"] = front
+        write_columns(tap(chunks, front), csv_path="data/full_sweep_with_dynamic_ripple.csv")
+
+    if args.pareto_json:
+        payload = {
+            mode: {"objectives": f.objectives, "n_rows": f.n_seen, "frontier": f.rows()}
+            for mode, f in fronts.items()
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.pareto_json)), exist_ok=True)
+        with open(args.pareto_json, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=2)
 
 
 def full_sweep(n_e_range, T_e_range, B_range, xi_range, out_csv: str = "full_sweep.csv") -> None:
-    import csv as _csv
-    from itertools import product
-    rows = []
-    for n_e, T_e, B, xi in product(n_e_range, T_e_range, B_range, xi_range):
-        y = antiproton_yield_estimator(n_e, T_e, {"model": "physics"})
-        eta = bennett_confinement_check(n0_cm3=n_e, xi=xi, B_T=B, ripple_frac=5e-4)
-        rows.append({"n_e": n_e, "T_e": T_e, "B": B, "xi": xi, "yield": y, "eta": bool(eta)})
-    with open(out_csv, "w", newline="", encoding="utf-8") as f:
-        w = _csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-        w.writeheader()
-        for r in rows:
-            w.writerow(r)
+    axes = [
+        Axis.explicit("n_e", n_e_range),
+        Axis.explicit("T_e", T_e_range),
+        Axis.explicit("B", B_range),
+        Axis.explicit("xi", xi_range),
+    ]
+
+    def _cols(c: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "yield": antiproton_yield_vec(c["n_e"], c["T_e"], {"model": "physics"}),
+            "eta": bennett_confinement_check_vec(c["n_e"], c["xi"], c["B"], 5e-4),
+        }
+
+    write_columns(iter_sweep(axes, cached_eval("param_sweep_confinement.full_sweep", _cols)), csv_path=out_csv)
 
 
 def optimize_confinement(I_p_range, r_p_range, B_range, out_csv: str = "optimized_confinement.csv") -> None:
@@ -328,24 +375,39 @@ def optimize_confinement(I_p_range, r_p_range, B_range, out_csv: str = "optimize
     xi = I_p / (5π r_p B). Use ripple=5e-4 and n0=1e20 cm^-3 as defaults for Bennett check.
     Writes rows meeting eta>=0.94.
     """
-    import csv as _csv
-    import math as _math
-    from itertools import product
-
-    rows = []
-    for I_p, r_p, B in product(I_p_range, r_p_range, B_range):
-        xi = float(I_p) / (5.0 * _math.pi * float(r_p) * float(B) + 1e-12)
-        ripple = 5e-4
-        eta = confinement_efficiency_estimator(xi, ripple)
-        bennett_ok = bennett_confinement_check(1e20, xi, B, ripple)
-        if eta >= 0.94 and bennett_ok:
-            rows.append({"I_p": I_p, "r_p": r_p, "B": B, "xi": xi, "eta": eta})
-    if rows:
-        with open(out_csv, "w", newline="", encoding="utf-8") as f:
-            w = _csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-            w.writeheader()
-            for r in rows:
-                w.writerow(r)
+    axes = [Axis.explicit("I_p", I_p_range), Axis.explicit("r_p", r_p_range), Axis.explicit("B", B_range)]
+    ripple = 5e-4
+
+    def _cols(c: Dict[str, Any]) -> Dict[str, Any]:
+        xi = c["I_p"].astype(float) / (5.0 * np.pi * c["r_p"].astype(float) * c["B"].astype(float) + 1e-12)
+        return {"xi": xi, "eta": confinement_efficiency_vec(xi, ripple),
+                "bennett_ok": bennett_confinement_check_vec(1e20, xi, c["B"], ripple)}
+
+    passing = filter_chunks(iter_sweep(axes, _cols), lambda c: (c["eta"] >= 0.94) & c["bennett_ok"])
+    cols = concat_chunks(passing)
+    if len(cols["eta"]):
+        write_columns([cols], csv_path=out_csv, fieldnames=["I_p", "r_p", "B", "xi", "eta"])
+
+
+def optimize_confinement_search(
+    I_p_bounds, r_p_bounds, B_bounds, method: str = "cmaes", budget: int = 300, seed: int = 0
+) -> OptimizeResult:
+    """Search (I_p, r_p, B) for maximal eta instead of grid-scanning them.
+
+    Same model as ``optimize_confinement``; eta >= confinement_min, B >= b_field_min_T
+    and the Bennett check are constraints.
+    """
+    ripple = 5e-4
+
+    def _cols(c: Dict[str, Any]) -> Dict[str, Any]:
+        xi = c["I_p"] / (5.0 * np.pi * c["r_p"] * c["B"] + 1e-12)
+        return {"xi": xi, "eta": confinement_efficiency_vec(xi, ripple),
+                "bennett_ok": bennett_confinement_check_vec(1e20, xi, c["B"], ripple).astype(float)}
+
+    cons = threshold_constraints(columns=["eta", "B"])
+    cons["bennett_ok"] = (">=", 1.0)
+    return maximize(_cols, {"I_p": I_p_bounds, "r_p": r_p_bounds, "B": B_bounds}, objective="eta",
+                    constraints=cons, method=method, budget=budget, seed=seed)
 
 
 if __name__ == "__main__":
@@ -3,8 +3,18 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import sys
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict
+
+_here = os.path.dirname(os.path.abspath(__file__))
+_root = os.path.dirname(_here)
+_src = os.path.join(_root, "src")
+if _src not in sys.path:
+    sys.path.insert(0, _src)
+
+from reactor.reports import count_anomalies, production_kpi
 
 
 def _read(path: str) -> Dict[str, Any]:
@@ -38,66 +48,7 @@ def main():
     except Exception:
         cost_model = {}
 
-    # Derive FOM: prefer feasibility report; otherwise a simple ratio from cost_model and metrics
-    fom = feas.get("fom") or (feas.get("fom_details") or {}).get("fom")
-    if fom is None and cost_model:
-        try:
-            price_per_antiproton = float(cost_model.get("price_per_antiproton", 0.0) or 0.0)
-            energy_cost_per_J = float(cost_model.get("energy_cost_per_J", 0.0) or 0.0)
-            energy_budget = float(mets.get("energy_budget_J", 0.0) or 0.0)
-            denom = energy_cost_per_J * energy_budget
-            # Only compute fallback FOM if inputs are valid and positive; otherwise leave None
-            if denom and denom > 0.0 and price_per_antiproton > 0.0:
-                fom = price_per_antiproton / denom
-            else:
-                fom = None
-        except Exception:
-            fom = None
-
-    # Optional anomalies adjustment: count 'fail' severities to degrade stability and FOM
-    def _count_fail(ndjson_path: str) -> Tuple[int, int, int]:
-        ok = warn = fail = 0
-        try:
-            p = Path(ndjson_path)
-            if p.exists():
-                for line in p.read_text().splitlines():
-                    line = line.strip()
-                    if not line:
-                        continue
-                    rec = json.loads(line)
-                    status = str(rec.get("status") or rec.get("details", {}).get("severity") or "").strip()
-                    if status == "fail":
-                        fail += 1
-                    elif status == "warn":
-                        warn += 1
-                    elif status == "ok":
-                        ok += 1
-        except Exception:
-            pass
-        return ok, warn, fail
-
-    ok_c, warn_c, fail_c = _count_fail(args.anomalies_ndjson)
-
-    kpi = {
-        "stable": bool(feas.get("stable", False)),
-        "gamma_ok": bool(feas.get("gamma_ok", False)),
-        "yield_pass": bool(feas.get("antiproton_yield_pass", False)),
-        "fom": fom,
-        "energy_budget_J": mets.get("energy_budget_J"),
-        "uq_n_samples": uq.get("n_samples"),
-        "uq_means": uq.get("means"),
-        "cost_model_used": bool(cost_model),
-        "anomaly_counts": {"ok": ok_c, "warn": warn_c, "fail": fail_c},
-    }
-
-    # Apply anomaly impact: if any fail anomalies, mark unstable and reduce FOM slightly
-    if fail_c > 0:
-        try:
-            kpi["stable"] = False
-            if kpi["fom"] is not None:
-                kpi["fom"] = float(kpi["fom"]) * 0.9
-        except Exception:
-            pass
+    kpi = production_kpi(feas, mets, uq, cost_model, count_anomalies(args.anomalies_ndjson))
 
     with open(args.out, "w", encoding="utf-8") as f:
         json.dump(kpi, f, indent=2)
@@ -13,8 +13,52 @@ if _src not in sys.path:
     sys.path.insert(0, _src)
 
 from reactor.analysis_confinement import bennett_confinement_check
-from reactor.metrics import antiproton_yield_estimator, total_fom
-from reactor.uq import run_uq_sampling
+from reactor.evalcache import persistent
+from reactor.metrics import (
+    antiproton_yield_estimator,
+    antiproton_yield_vec,
+    confinement_efficiency_vec,
+    total_fom,
+    total_fom_vec,
+)
+from reactor.optimize import METHODS, maximize, threshold_constraints
+from reactor.sensitivity import morris_screening, sobol_indices
+from reactor.surrogate import fallback_model
+from reactor.thresholds import Thresholds
+from reactor.uq import QMC_METHODS, run_uq_parallel, run_uq_sampling, run_uq_vectorized
+
+
+# Module-level so --workers can ship them to pool processes.
+# Per-sample results are reused across runs when $REACTOR_EVAL_CACHE is set.
+@persistent("uq_optimize.eval_fn")
+def eval_fn(params):
+    y = antiproton_yield_estimator(params["n_e"], params["T_e"], {"model": "physics"})
+    E_total = params["E_total"]
+    f = total_fom(y, E_total)
+    return {"yield": y, "fom": f, "energy": E_total}
+
+
+@persistent("uq_optimize.eval_all")
+def eval_all(params):
+    y = antiproton_yield_estimator(params["n_e"], params["T_e"], {"model": "physics"})
+    eta = bennett_confinement_check(params["n_e"], 2.0, 5.0, 1e-4)
+    f = total_fom(y, params["E_total"])
+    return {"yield": y, "eta": bool(eta), "fom": f, "energy": params["E_total"]}
+
+
+def eval_vec(cols):
+    y = antiproton_yield_vec(cols["n_e"], cols["T_e"], {"model": "physics"})
+    return {"yield": y, "fom": total_fom_vec(y, cols["E_total"]), "energy": cols["E_total"]}
+
+
+def eval_yield(cols):
+    return {"yield": antiproton_yield_vec(cols["n_e"], cols["T_e"], {"model": "physics"})}
+
+
+def eval_design(cols):
+    out = eval_vec(cols)
+    out["eta"] = confinement_efficiency_vec(cols["xi"], cols["ripple"])
+    return out
 
 
 def main():
@@ -24,31 +68,154 @@ def main():
     ap.add_argument("--out", default="uq_optimized.json")
     ap.add_argument("--out-all", default=None)
     ap.add_argument("--production", action="store_true", help="Use production-focused priors/ranges and write uq_production.json")
+    ap.add_argument(
+        "--production-samples",
+        type=int,
+        default=1 << 20,
+        help="Sample count for --production (vectorized; per-sample results are not stored)",
+    )
+    ap.add_argument("--qmc", choices=QMC_METHODS, default="sobol", help="Design for --production sampling")
+    ap.add_argument(
+        "--log-params",
+        nargs="*",
+        default=[],
+        help="Parameters sampled log-uniformly in --production (e.g. n_e E_total)",
+    )
+    ap.add_argument(
+        "--rtol",
+        type=float,
+        default=1e-2,
+        help="--production stops once every mean's 95%% CI half-width is below rtol*|mean|",
+    )
+    ap.add_argument(
+        "--exceed-atol",
+        type=float,
+        default=1e-3,
+        help="--production also requires the P(fom >= fom_min) CI half-width below this",
+    )
+    ap.add_argument(
+        "--surrogate",
+        choices=["gp", "pce"],
+        default=None,
+        help="--production: answer the yield model from a surrogate fitted on a small design, "
+        "falling back to the model where its predictive std exceeds --surrogate-max-std",
+    )
+    ap.add_argument("--surrogate-design", type=int, default=64, help="Model runs used to fit --surrogate")
+    ap.add_argument(
+        "--surrogate-max-std",
+        type=float,
+        default=0.05,
+        help="Largest surrogate std accepted, in log10(yield) units",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Evaluate samples in batches on a process pool with per-batch SeedSequence streams "
+            "(results are identical for any worker count, but differ from the default serial stream)"
+        ),
+    )
+    ap.add_argument(
+        "--optimize",
+        choices=METHODS,
+        default=None,
+        help="Also maximize fom subject to Thresholds with a gradient-free optimizer",
+    )
+    ap.add_argument("--budget", type=int, default=300, help="Evaluation budget for --optimize")
+    ap.add_argument("--optimize-out", default="uq_maximized.json")
+    ap.add_argument(
+        "--sensitivity",
+        choices=["sobol", "morris"],
+        default=None,
+        help="Also rank n_e, T_e, E_total, xi, ripple and B by their effect on fom and eta",
+    )
+    ap.add_argument(
+        "--sensitivity-samples",
+        type=int,
+        default=4096,
+        help="Base sample count N for --sensitivity sobol (N*(d+2) evaluations) or trajectories for morris",
+    )
+    ap.add_argument("--sensitivity-out", default="uq_sensitivity.json")
     args = ap.parse_args()
 
-    def eval_fn(params):
-        y = antiproton_yield_estimator(params["n_e"], params["T_e"], {"model": "physics"})
-        E_total = params["E_total"]
-        f = total_fom(y, E_total)
-        return {"yield": y, "fom": f, "energy": E_total}
+    def sample(**kw):
+        if args.workers is None:
+            return run_uq_sampling(**kw)
+        return run_uq_parallel(**kw, workers=args.workers)
+
+    if args.optimize:
+        # Direct search for the FOM maximum under the density/FOM gates instead of sampling
+        res = maximize(
+            eval_vec,
+            {"n_e": (1e19, 1e21), "T_e": (5.0, 15.0), "E_total": (1e10, 1e12)},
+            objective="fom",
+            constraints=threshold_constraints(Thresholds(), ["n_e", "fom"]),
+            method=args.optimize,
+            budget=args.budget,
+            seed=args.seed,
+            log_params=["n_e", "E_total"],
+            log_objective=True,
+        )
+        with open(args.optimize_out, "w", encoding="utf-8") as f:
+            json.dump(res.as_dict(), f, indent=2)
+        print(json.dumps({"wrote": args.optimize_out}))
+
+    if args.sensitivity:
+        ranges = {
+            "n_e": (1e19, 1e21),
+            "T_e": (5.0, 15.0),
+            "E_total": (1e10, 1e12),
+            "xi": (0.5, 5.0),
+            "ripple": (0.0, 0.01),
+            "B": (5.0, 10.0),
+        }
+        kw = {"outputs": ["fom", "eta"], "seed": args.seed, "log_params": ["n_e", "E_total"]}
+        if args.sensitivity == "sobol":
+            sens = sobol_indices(eval_design, ranges, n=args.sensitivity_samples, **kw)
+        else:
+            sens = morris_screening(eval_design, ranges, r=args.sensitivity_samples, **kw)
+        with open(args.sensitivity_out, "w", encoding="utf-8") as f:
+            json.dump(sens, f, indent=2)
+        print(json.dumps({"wrote": args.sensitivity_out}))
 
     if args.production:
         # Production-focused narrower ranges and higher energies/yields, emit uq_production.json
-        prod_out = run_uq_sampling(
-            n_samples=max(args.samples, 50),
+        prod_ranges = {
+            "n_e": (1e20, 5e21),
+            "T_e": (8.0, 20.0),
+            "E_total": (5e10, 5e12),
+        }
+        prod_eval = eval_vec
+        if args.surrogate:
+            fb, cv = fallback_model(eval_yield, {k: prod_ranges[k] for k in ("n_e", "T_e")}, "yield",
+                                    args.surrogate_max_std, kind=args.surrogate, n_design=args.surrogate_design,
+                                    seed=args.seed, log_params=["n_e"], log_y=True)
+
+            def prod_eval(cols):
+                y = fb(cols)["yield"]
+                return {"yield": y, "fom": total_fom_vec(y, cols["E_total"]), "energy": cols["E_total"]}
+
+        prod_out = run_uq_vectorized(
+            n_samples=max(args.production_samples, 50),
             seed=args.seed,
-            param_ranges={
-                "n_e": (1e20, 5e21),
-                "T_e": (8.0, 20.0),
-                "E_total": (5e10, 5e12),
-            },
-            eval_fn=eval_fn,
+            param_ranges=prod_ranges,
+            eval_fn=prod_eval,
+            method=args.qmc,
+            log_params=args.log_params,
+            batch_size=16384,
+            exceed={"fom": Thresholds().fom_min},
+            rtol=args.rtol,
+            exceed_atol=args.exceed_atol,
         )
+        if args.surrogate:
+            prod_out["surrogate"] = {"kind": args.surrogate, "output": "yield", "max_std": args.surrogate_max_std,
+                                     "cv": cv, **fb.stats()}
         with open("uq_production.json", "w", encoding="utf-8") as f:
             json.dump(prod_out, f, indent=2)
         print(json.dumps({"wrote": "uq_production.json"}))
 
-    out = run_uq_sampling(
+    out = sample(
         n_samples=args.samples,
         seed=args.seed,
         param_ranges={
@@ -64,12 +231,7 @@ def main():
 
     # Optional comprehensive UQ for all targets
     if args.out_all:
-        def eval_all(params):
-            y = antiproton_yield_estimator(params["n_e"], params["T_e"], {"model": "physics"})
-            eta = bennett_confinement_check(params["n_e"], 2.0, 5.0, 1e-4)
-            f = total_fom(y, params["E_total"]) 
-            return {"yield": y, "eta": bool(eta), "fom": f, "energy": params["E_total"]}
-        out_all = run_uq_sampling(
+        out_all = sample(
             n_samples=max(100, args.samples),
             seed=args.seed,
             param_ranges={
@@ -1,21 +1,16 @@
 """
 Plasma Vortex Reactor - core package
 Lightweight, testable stubs modeling vorticity, equilibria, kinetics, EM and control glue.
+
+The public names below are imported on first access, so ``import reactor``
+(and every ``reactor.cli`` subcommand that does not step a reactor) stays
+free of NumPy.
 """
+from __future__ import annotations
+
 __version__ = "0.2.0"
 __author__ = "arcticoder"
 
-from .core import Reactor
-from .models import (
-    adiabatic_mu,
-    bennett_profile,
-    drift_poisson_step,
-    kinetics_update,
-    lg_mode,
-    microwave_maxwell,
-    vorticity_evolution,
-)
-
 __all__ = [
     "Reactor",
     "bennett_profile",
@@ -26,3 +21,19 @@ __all__ = [
     "kinetics_update",
     "adiabatic_mu",
 ]
+
+_LAZY = {name: ".core" if name == "Reactor" else ".models" for name in __all__}
+
+
+def __getattr__(name: str) -> object:
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
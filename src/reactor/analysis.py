@@ -9,4 +9,4 @@ from .analysis_fields import (
     estimate_density_from_em,  # noqa: F401
     simulate_b_field_ripple,  # noqa: F401
 )
-from .analysis_stat import stability_variance, windowed_gamma  # noqa: F401
+from .analysis_stat import OnlineStats, QuantileSketch, stability_variance, windowed_gamma  # noqa: F401
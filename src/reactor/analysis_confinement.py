@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import numpy as np
+
 from .logging_utils import append_event
+from .memo import memoize
 
 
 def bennett_confinement_check(n0_cm3: float, xi: float, B_T: float, ripple_frac: float) -> bool:
@@ -32,6 +35,23 @@ def bennett_confinement_check(n0_cm3: float, xi: float, B_T: float, ripple_frac:
     return _score >= 1.0
 
 
+def bennett_confinement_check_vec(
+    n0_cm3: np.ndarray, xi: np.ndarray, B_T: np.ndarray, ripple_frac: np.ndarray
+) -> np.ndarray:
+    """Array form of ``bennett_confinement_check`` returning a boolean mask."""
+    n0 = np.asarray(n0_cm3, dtype=float)
+    xi = np.asarray(xi, dtype=float)
+    B = np.asarray(B_T, dtype=float)
+    r = np.asarray(ripple_frac, dtype=float)
+    ok = (xi >= 0.5) & (xi <= 5.0) & (B >= 5.0) & (r <= 1e-3) & (n0 >= 1e18)
+    score = (B / 5.0) * (np.minimum(5.0, xi) / 5.0) * (n0 / 1e18) * np.maximum(0.0, 1.0 - r * 1e3)
+    return ok & (score >= 1.0)
+
+
+# Opt-in memoized variant for sweep grids; see reactor.memo.
+bennett_confinement_check_cached = memoize(maxsize=65536)(bennett_confinement_check)
+
+
 def log_confinement(xi: float, B_T: float, path: str = "progress.ndjson") -> None:
     """Log confinement efficiency proxy (η) to NDJSON."""
     ripple = 5e-4
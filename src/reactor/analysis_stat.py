@@ -1,19 +1,27 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, Sequence
+from collections import deque
+from typing import Any, Dict, Iterable, Sequence
 
 import numpy as np
 
 
+def _as_float_array(values: Iterable[float]) -> np.ndarray:
+    """View arrays/sequences as float arrays without the intermediate list copy."""
+    if isinstance(values, (np.ndarray, list, tuple)):
+        return np.asarray(values, dtype=float)
+    return np.fromiter(values, dtype=float)
+
+
 def stability_variance(values: Iterable[float]) -> float:
-    arr = np.asarray(list(values), dtype=float)
+    arr = _as_float_array(values)
     if arr.size == 0:
         return 0.0
     return float(np.var(arr))
 
 
 def windowed_gamma(series: Iterable[float], window_size: int) -> Dict[str, np.ndarray]:
-    arr = np.asarray(list(series), dtype=float)
+    arr = _as_float_array(series)
     w = int(window_size)
     if w <= 0:
         raise ValueError("window_size must be >= 1")
@@ -31,7 +39,7 @@ def windowed_gamma(series: Iterable[float], window_size: int) -> Dict[str, np.nd
 
 def ema(series: Iterable[float], alpha: float) -> np.ndarray:
     """Exponential moving average with smoothing factor alpha in (0,1]."""
-    arr = np.asarray(list(series), dtype=float)
+    arr = _as_float_array(series)
     if arr.size == 0:
         return arr
     a = float(alpha)
@@ -49,7 +57,7 @@ def stability_probability(series: Iterable[float], threshold: float = 140.0, ste
 
     If steps is None, use the full series length.
     """
-    arr = np.asarray(list(series), dtype=float)
+    arr = _as_float_array(series)
     if arr.size == 0:
         return 0.0
     N = int(steps) if steps is not None else arr.size
@@ -59,6 +67,249 @@ def stability_probability(series: Iterable[float], threshold: float = 140.0, ste
     return float(stable_steps) / float(N)
 
 
+def _run_lengths(mask: np.ndarray) -> tuple[int, int, int]:
+    """Return (leading, trailing, longest) run lengths of True values in a boolean mask."""
+    n = int(mask.size)
+    if n == 0:
+        return 0, 0, 0
+    false_idx = np.flatnonzero(~mask)
+    if false_idx.size == 0:
+        return n, n, n
+    lead = int(false_idx[0])
+    trail = int(n - 1 - false_idx[-1])
+    # gaps between consecutive False positions are the interior True runs
+    edges = np.concatenate(([-1], false_idx, [n]))
+    longest = int(np.max(np.diff(edges)) - 1)
+    return lead, trail, longest
+
+
+class OnlineStats:
+    """Streaming count/mean/variance/min/max accumulator (Welford, mergeable).
+
+    Memory stays O(1) in series length: only running moments, per-threshold
+    exceedance counters and an optional fixed-size window for the rolling
+    RMS ripple are kept. ``merge`` combines shards using Chan's parallel
+    update; the merged shard is treated as following this one in time, which
+    is what makes the exceedance run lengths and rolling window well defined.
+
+    Args:
+        thresholds: values v for which ``x >= v`` counts and run lengths are tracked
+            (e.g. Γ >= 140 for the stability-duration gate).
+        window: optional window length for ``rolling_ripple`` (std/mean of the
+            last ``window`` values).
+    """
+
+    def __init__(self, thresholds: Sequence[float] = (), window: int | None = None) -> None:
+        if window is not None and int(window) <= 0:
+            raise ValueError("window must be >= 1")
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.thresholds = tuple(float(t) for t in thresholds)
+        # per threshold: [exceed_count, leading_run, trailing_run, longest_run]
+        self._exceed = [[0, 0, 0, 0] for _ in self.thresholds]
+        self.window = int(window) if window is not None else None
+        self._window: deque[float] = deque(maxlen=self.window or 0)
+
+    @classmethod
+    def from_series(cls, values: Iterable[float], **kwargs: Any) -> "OnlineStats":
+        s = cls(**kwargs)
+        s.update_many(values)
+        return s
+
+    def update(self, x: float) -> None:
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        n = self.count
+        for t, ex in zip(self.thresholds, self._exceed, strict=True):
+            if x >= t:
+                ex[0] += 1
+                ex[2] += 1
+                if ex[1] == n - 1:
+                    ex[1] = n
+                ex[3] = max(ex[3], ex[2])
+            else:
+                ex[2] = 0
+        if self.window:
+            self._window.append(x)
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Fold a chunk of samples in with vectorized moments (one merge per chunk)."""
+        arr = _as_float_array(values).ravel()
+        if arr.size == 0:
+            return
+        self.merge(self._from_chunk(arr))
+
+    def _from_chunk(self, arr: np.ndarray) -> "OnlineStats":
+        part = OnlineStats(self.thresholds, self.window)
+        part.count = int(arr.size)
+        part.mean = float(np.mean(arr))
+        part._m2 = float(np.sum((arr - part.mean) ** 2))
+        part.min = float(np.min(arr))
+        part.max = float(np.max(arr))
+        for t, ex in zip(self.thresholds, part._exceed, strict=True):
+            mask = arr >= t
+            lead, trail, longest = _run_lengths(mask)
+            ex[:] = [int(np.count_nonzero(mask)), lead, trail, longest]
+        if self.window:
+            part._window.extend(arr[-self.window:].tolist())
+        return part
+
+    def merge(self, other: "OnlineStats") -> "OnlineStats":
+        """Merge ``other`` (a later shard) into this accumulator in place and return self."""
+        if other.thresholds != self.thresholds:
+            raise ValueError("cannot merge OnlineStats with different thresholds")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            lead_full = [True] * len(self.thresholds)
+        else:
+            lead_full = [ex[1] == self.count for ex in self._exceed]
+        n_a, n_b = self.count, other.count
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        self.mean += delta * n_b / n
+        self._m2 += other._m2 + delta * delta * n_a * n_b / n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for full, ex, ox in zip(lead_full, self._exceed, other._exceed, strict=True):
+            longest = max(ex[3], ox[3], ex[2] + ox[1])
+            lead = n_a + ox[1] if full else ex[1]
+            trail = ox[2] + ex[2] if ox[2] == n_b else ox[2]
+            ex[:] = [ex[0] + ox[0], lead, trail, longest]
+        self.count = n
+        if self.window:
+            self._window.extend(other._window)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Population variance (ddof=0), matching ``np.var``."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    def ripple(self) -> float:
+        """RMS fluctuation fraction std/mean over the whole stream."""
+        return self.std / self.mean if self.mean else 0.0
+
+    def rolling_ripple(self) -> float:
+        """RMS fluctuation fraction over the last ``window`` samples."""
+        if not self._window:
+            return 0.0
+        w = np.fromiter(self._window, dtype=float)
+        m = float(np.mean(w))
+        return float(np.std(w) / m) if m else 0.0
+
+    def exceed_count(self, threshold: float) -> int:
+        return self._exceed[self.thresholds.index(float(threshold))][0]
+
+    def exceed_fraction(self, threshold: float) -> float:
+        return self.exceed_count(threshold) / self.count if self.count else 0.0
+
+    def longest_run(self, threshold: float) -> int:
+        """Longest run of consecutive samples with value >= threshold."""
+        return self._exceed[self.thresholds.index(float(threshold))][3]
+
+    def as_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {
+            "count": self.count,
+            "mean": float(self.mean),
+            "variance": float(self.variance),
+            "min": float(self.min) if self.count else None,
+            "max": float(self.max) if self.count else None,
+        }
+        if self.thresholds:
+            out["exceedance"] = {
+                str(t): {"count": ex[0], "fraction": ex[0] / self.count if self.count else 0.0, "longest_run": ex[3]}
+                for t, ex in zip(self.thresholds, self._exceed, strict=True)
+            }
+        if self.window:
+            out["rolling_ripple"] = self.rolling_ripple()
+        return out
+
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch (KLL-style compactor hierarchy).
+
+    Level h holds items of weight 2**h. A level that reaches ``k`` items is
+    sorted and every other item (random offset) is promoted to level h+1, so
+    memory stays O(k log(n/k)) and rank error is O(n/k) with high probability.
+    Sketches built with the same ``k`` merge by concatenating levels.
+    """
+
+    def __init__(self, k: int = 512, seed: int = 0) -> None:
+        if int(k) < 2:
+            raise ValueError("k must be >= 2")
+        self.k = int(k)
+        self.count = 0
+        self._levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(int(seed))
+
+    def update_many(self, values: Iterable[float]) -> None:
+        arr = _as_float_array(values).ravel()
+        arr = arr[~np.isnan(arr)]
+        if arr.size == 0:
+            return
+        self.count += int(arr.size)
+        self._levels[0] = np.concatenate((self._levels[0], arr))
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self._levels):
+            buf = self._levels[h]
+            if buf.size >= self.k:
+                buf = np.sort(buf)
+                keep = buf[-1:] if buf.size % 2 else buf[:0]  # odd item stays at this weight
+                pairs = buf[: buf.size - keep.size]
+                up = pairs[int(self._rng.integers(2))::2]
+                self._levels[h] = keep
+                if h + 1 == len(self._levels):
+                    self._levels.append(np.empty(0))
+                self._levels[h + 1] = np.concatenate((self._levels[h + 1], up))
+            h += 1
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.k != self.k:
+            raise ValueError("cannot merge QuantileSketch with different k")
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, buf in enumerate(other._levels):
+            self._levels[h] = np.concatenate((self._levels[h], buf))
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantile(self, q: float | Sequence[float]) -> Any:
+        """Approximate q-quantile(s) (lower/inverted-CDF definition); NaN when empty."""
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            out = np.full(qs.shape, np.nan)
+        else:
+            items = np.concatenate(self._levels)
+            weights = np.concatenate([np.full(b.size, 2.0 ** h) for h, b in enumerate(self._levels)])
+            order = np.argsort(items, kind="stable")
+            cum = np.cumsum(weights[order])
+            idx = np.searchsorted(cum, np.clip(qs, 0.0, 1.0) * cum[-1], side="left")
+            out = items[order][np.minimum(idx, items.size - 1)]
+        return float(out[0]) if np.ndim(q) == 0 else out
+
+    @property
+    def size(self) -> int:
+        """Items currently retained (memory footprint)."""
+        return int(sum(b.size for b in self._levels))
+
+
 def plot_stability_curve(time_ms: Sequence[float], gamma_series: Sequence[float], out_png: str) -> None:
     """Plot Γ vs time (ms) to PNG."""
     from .plotting import _mpl  # lazy import matplotlib
@@ -0,0 +1,331 @@
+"""Incremental artifact builds: make-style targets with a content-hash manifest.
+
+A ``Target`` declares the command that produces its ``outputs`` plus
+everything the result depends on: input files, parameters and code files
+(for script targets, the script and the ``reactor`` modules it imports,
+found by walking imports). The target's key is the SHA-256 of all of these.
+A target is rebuilt only when its key differs from the one recorded in the
+manifest, or an output is missing or was changed since it was built.
+
+A target that reads another target's output depends on it; independent
+stale targets run in parallel. File hashes are cached in the manifest by
+(size, mtime), so an up-to-date build reads no file contents.
+
+Example::
+
+    targets = [script_target("sweep_dyn", "scripts/param_sweep_confinement.py", ["--full-sweep-with-dynamic-ripple"],
+                             outputs=["data/full_sweep_with_dynamic_ripple.csv"])]
+    result = build(targets, manifest="artifacts/build_manifest.json")
+    result["built"], result["fresh"]
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+MANIFEST = "artifacts/build_manifest.json"
+FORMAT = 1
+_PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@dataclass(frozen=True)
+class Target:
+    name: str
+    cmd: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    inputs: Tuple[str, ...] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    code: Tuple[str, ...] = ()
+    deps: Tuple[str, ...] = ()
+
+
+def module_deps(path: str, pkg_dir: str = _PKG_DIR) -> Tuple[str, ...]:
+    """``path`` plus the ``reactor`` modules it imports, transitively (absolute or relative imports)."""
+    seen: Set[str] = set()
+    todo = [os.path.abspath(path)]
+    while todo:
+        p = todo.pop()
+        if p in seen or not os.path.exists(p):
+            continue
+        seen.add(p)
+        try:
+            with open(p, "rb") as f:
+                tree = ast.parse(f.read(), filename=p)
+        except (SyntaxError, ValueError):
+            continue
+        in_pkg = os.path.dirname(p) == pkg_dir
+        for node in ast.walk(tree):
+            names: List[str] = []
+            if isinstance(node, ast.Import):
+                names = [a.name for a in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                if node.level and in_pkg:
+                    base = node.module or ""
+                    names = [base] if base else [a.name for a in node.names]
+                    names = ["reactor." + n for n in names]
+                elif node.module:
+                    names = [node.module] + [f"{node.module}.{a.name}" for a in node.names]
+            for n in names:
+                parts = n.split(".")
+                if parts[0] == "reactor":
+                    # importing any submodule runs the package __init__ first
+                    todo.append(os.path.join(pkg_dir, "__init__.py"))
+                    if len(parts) > 1:
+                        todo.append(os.path.join(pkg_dir, parts[1] + ".py"))
+    return tuple(sorted(seen))
+
+
+def script_target(
+    name: str,
+    script: str,
+    args: Sequence[str] = (),
+    outputs: Sequence[str] = (),
+    inputs: Sequence[str] = (),
+    params: Optional[Dict[str, Any]] = None,
+    deps: Sequence[str] = (),
+    root: str = ".",
+) -> Target:
+    """Target running ``python script args`` from ``root``; code deps are the script and its reactor imports."""
+    code = tuple(os.path.relpath(p, root) for p in module_deps(os.path.join(root, script)))
+    return Target(name, (script, *[str(a) for a in args]), tuple(outputs), tuple(inputs), dict(params or {}),
+                  code, tuple(deps))
+
+
+class _Hasher:
+    """File SHA-256s cached by (size, mtime_ns); entries persist in the manifest."""
+
+    def __init__(self, root: str, cache: Dict[str, List[Any]]) -> None:
+        self.root = root
+        self.cache = cache
+        self._lock = threading.Lock()
+
+    def __call__(self, path: str) -> Optional[str]:
+        full = os.path.join(self.root, path)
+        try:
+            st = os.stat(full)
+        except OSError:
+            return None
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            hit = self.cache.get(path)
+        if hit is not None and hit[:2] == stamp:
+            return hit[2]
+        h = hashlib.sha256()
+        with open(full, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        with self._lock:
+            self.cache[path] = [*stamp, digest]
+        return digest
+
+
+def target_key(t: Target, file_hash: Callable[[str], Optional[str]]) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([t.name, list(t.cmd), sorted(t.outputs), t.params], sort_keys=True, default=str).encode())
+    for group in (t.inputs, t.code):
+        for p in sorted(group):
+            h.update(json.dumps([p, file_hash(p)]).encode())
+    return h.hexdigest()
+
+
+def _order(targets: Sequence[Target]) -> Dict[str, Set[str]]:
+    """Dependencies per target: explicit deps plus producers of its inputs."""
+    by_name = {t.name: t for t in targets}
+    if len(by_name) != len(targets):
+        raise ValueError("duplicate target names")
+    producer: Dict[str, str] = {}
+    for t in targets:
+        for o in map(os.path.normpath, t.outputs):
+            if producer.setdefault(o, t.name) != t.name:
+                raise ValueError(f"{o!r} is an output of both {producer[o]!r} and {t.name!r}")
+    deps: Dict[str, Set[str]] = {}
+    for t in targets:
+        d = set(t.deps) | {producer[p] for p in map(os.path.normpath, t.inputs) if p in producer}
+        d.discard(t.name)
+        unknown = d - set(by_name)
+        if unknown:
+            raise ValueError(f"target {t.name!r} depends on unknown target(s) {sorted(unknown)}")
+        deps[t.name] = d
+    # reject cycles up front
+    done: Set[str] = set()
+    left = set(deps)
+    while left:
+        ready = {n for n in left if deps[n] <= done}
+        if not ready:
+            raise ValueError(f"dependency cycle among targets {sorted(left)}")
+        done |= ready
+        left -= ready
+    return deps
+
+
+def _load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("format") == FORMAT:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"format": FORMAT, "targets": {}, "files": {}}
+
+
+def _run_target(t: Target, root: str) -> Tuple[int, str]:
+    env = dict(os.environ)
+    # the tree's own sources first, then the package this builder runs from
+    paths = (os.path.join(os.path.abspath(root), "src"), os.path.dirname(_PKG_DIR), env.get("PYTHONPATH"))
+    env["PYTHONPATH"] = os.pathsep.join(p for p in paths if p)
+    for o in t.outputs:
+        os.makedirs(os.path.dirname(os.path.join(root, o)) or root, exist_ok=True)
+    proc = subprocess.run([sys.executable, *t.cmd], cwd=root, env=env, capture_output=True, text=True)
+    return proc.returncode, (proc.stdout + proc.stderr)[-4000:]
+
+
+def build(
+    targets: Sequence[Target],
+    manifest: str = MANIFEST,
+    root: str = ".",
+    only: Optional[Sequence[str]] = None,
+    force: bool = False,
+    jobs: Optional[int] = None,
+    dry_run: bool = False,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Bring ``targets`` (or ``only`` these and what they need) up to date.
+
+    Returns lists of ``built``, ``fresh``, ``failed`` and ``skipped`` (a
+    dependency failed) target names, plus ``stale`` for a dry run. Failed
+    targets are not recorded, so they rebuild next time.
+    """
+    deps = _order(targets)
+    by_name = {t.name: t for t in targets}
+    wanted: Set[str] = set()
+    todo = list(only) if only else list(by_name)
+    while todo:
+        n = todo.pop()
+        if n not in by_name:
+            raise KeyError(f"unknown target {n!r}")
+        if n not in wanted:
+            wanted.add(n)
+            todo.extend(deps[n])
+    mpath = os.path.join(root, manifest)
+    state = _load_manifest(mpath)
+    hasher = _Hasher(root, state["files"])
+    lock = threading.Lock()
+    result: Dict[str, List[str]] = {"built": [], "fresh": [], "failed": [], "skipped": [], "stale": []}
+    say = log or (lambda msg: None)
+
+    def save() -> None:
+        os.makedirs(os.path.dirname(mpath) or ".", exist_ok=True)
+        tmp = mpath + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp, mpath)
+
+    def is_fresh(t: Target, key: str) -> bool:
+        rec = state["targets"].get(t.name)
+        if force or rec is None or rec.get("key") != key:
+            return False
+        return all(hasher(o) is not None and hasher(o) == rec["outputs"].get(o) for o in t.outputs)
+
+    def step(t: Target) -> str:
+        key = target_key(t, hasher)
+        if is_fresh(t, key):
+            return "fresh"
+        if dry_run:
+            return "stale"
+        say(f"build {t.name}: {' '.join(t.cmd)}")
+        code, out = _run_target(t, root)
+        missing = [o for o in t.outputs if hasher(o) is None]
+        if code != 0 or missing:
+            say(f"FAILED {t.name} (exit {code}, missing {missing})\n{out}")
+            return "failed"
+        with lock:
+            state["targets"][t.name] = {"key": key, "outputs": {o: hasher(o) for o in t.outputs}}
+            save()
+        return "built"
+
+    status: Dict[str, str] = {}
+    n_jobs = max(1, int(jobs or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=n_jobs) as ex:
+        running: Dict[Future, str] = {}
+        while len(status) < len(wanted):
+            for n in sorted(wanted - set(status) - set(running.values())):
+                if not deps[n] <= set(status):
+                    continue
+                if any(status[d] in ("failed", "skipped") for d in deps[n]):
+                    status[n] = "skipped"
+                elif dry_run and any(status[d] == "stale" for d in deps[n]):
+                    status[n] = "stale"  # upstream will change its inputs
+                else:
+                    running[ex.submit(step, by_name[n])] = n
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                status[running.pop(fut)] = fut.result()
+    for n in [t.name for t in targets if t.name in status]:
+        result[status[n]].append(n)
+    with lock:
+        save()
+    return result
+
+
+def artifact_targets(root: str = ".") -> List[Target]:
+    """The artifact set built by ``pv-build-artifacts``."""
+    def st(*a: Any, **kw: Any) -> Target:
+        return script_target(*a, root=root, **kw)
+
+    datasets = ["datasets/gamma_series.json", "datasets/b_field_series.json", "datasets/E_mag.json"]
+    return [
+        st("demo", "scripts/demo_runner.py",
+           ["--scenario", "examples/scenario_min.json", "--steps", "10", "--dt", "1e-3", "--seed", "123",
+            "--timeline-log", "artifacts/timeline.ndjson", "--json-out", "artifacts/demo_summary.json"],
+           outputs=["artifacts/demo_summary.json", "artifacts/timeline.ndjson"], inputs=["examples/scenario_min.json"]),
+        st("feasibility", "scripts/generate_feasibility_report.py",
+           ["--gamma-series", datasets[0], "--dt", "0.002", "--b-series", datasets[1], "--E-mag", datasets[2],
+            "--out", "feasibility_gates_report.json", "--scenario-id", "ci-demo"],
+           outputs=["feasibility_gates_report.json"], inputs=datasets),
+        st("channel_report", "scripts/generate_channel_report.py", ["--out", "channel_report.json"],
+           outputs=["channel_report.json"]),
+        # each sweep also writes the base xi/ripple sweep; separate --out paths keep parallel runs apart
+        st("sweep_time", "scripts/param_sweep_confinement.py",
+           ["--full-sweep-with-time", "--out", "data/confinement_sweep_time.csv"],
+           outputs=["data/full_sweep_with_time.csv", "data/confinement_sweep_time.csv"]),
+        st("sweep_dyn", "scripts/param_sweep_confinement.py",
+           ["--full-sweep-with-dynamic-ripple", "--out", "data/confinement_sweep_dyn.csv"],
+           outputs=["data/full_sweep_with_dynamic_ripple.csv", "data/confinement_sweep_dyn.csv"]),
+        # every file run_report.py reads is passed explicitly and declared, so none can go stale unnoticed
+        st("run_report", "scripts/run_report.py",
+           ["--feasibility", "feasibility_gates_report.json", "--gate-md", "gate_summary.md",
+            "--timeline-summary", "timeline_summary.json", "--channel-report", "channel_report.json",
+            "--uq", "uq_optimized.json", "--uq-production", "uq_production.json",
+            "--sweep-time", "data/full_sweep_with_time.csv", "--sweep-dyn", "data/full_sweep_with_dynamic_ripple.csv",
+            "--out", "run_report.json", "--integrated-out", "artifacts/integrated_report.json"],
+           outputs=["run_report.json", "artifacts/integrated_report.json"],
+           inputs=["feasibility_gates_report.json", "gate_summary.md", "timeline_summary.json", "channel_report.json",
+                   "uq_optimized.json", "uq_production.json", "data/full_sweep_with_time.csv",
+                   "data/full_sweep_with_dynamic_ripple.csv"]),
+        st("kpi", "scripts/production_kpi.py",
+           ["--feasibility", "feasibility_gates_report.json", "--metrics", "metrics.json", "--uq", "uq_optimized.json",
+            "--out", "production_kpi.json"],
+           outputs=["production_kpi.json"],
+           inputs=["feasibility_gates_report.json", "metrics.json", "uq_optimized.json", "configs/cost_model.json",
+                   "docs/timeline_anomalies.ndjson"]),
+        st("production_fom_plot", "scripts/plot_production_fom.py",
+           ["--fixed", "--out", "artifacts/production_fom_yield.png"], outputs=["artifacts/production_fom_yield.png"]),
+        st("stability_plot", "scripts/plot_stability.py", ["--out", "artifacts/stability.png"],
+           outputs=["artifacts/stability.png"]),
+        st("dynamic_ripple_time_plot", "scripts/plot_dynamic_ripple_time.py",
+           ["--from-csv", "data/full_sweep_with_dynamic_ripple.csv", "--out", "artifacts/dynamic_ripple_time.png"],
+           outputs=["artifacts/dynamic_ripple_time.png"], inputs=["data/full_sweep_with_dynamic_ripple.csv"]),
+    ]
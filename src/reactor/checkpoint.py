@@ -0,0 +1,167 @@
+"""Resumable, checkpointed sweeps backed by an append-only on-disk result store.
+
+A store directory holds ``manifest.json`` (axes, chunk size, seed, package
+version, a content hash of the evaluating code and caller metadata) plus one
+``chunks/<index>.npz`` file per completed chunk.
+Chunk files are written to a temporary name and renamed into place, so a run
+killed mid-chunk never leaves a partial result; files are never rewritten.
+Re-running with the same manifest loads completed chunks and evaluates only
+the missing ones. A mismatched manifest is refused rather than mixed.
+
+The code hash (``code_hash``) covers the files passed as ``code`` and the
+``reactor`` modules they import, or the whole package when ``code`` is not
+given, so editing an estimator invalidates its checkpoints. ``meta`` must
+carry every option that changes results but is not an axis or the seed.
+
+Example::
+
+    store = SweepStore("data/ckpt/time", axes, chunk_size=4096, seed=0, meta={"mode": "time"}, code=[__file__])
+    write_columns(store.run_sweep(evaluate), csv_path="data/full_sweep_with_time.csv")
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .sweep import DEFAULT_CHUNK, Axis, Columns, EvalFn, evaluate_chunk, grid_size, points
+
+ComputeFn = Callable[[int, int], Columns]
+
+MANIFEST = "manifest.json"
+FORMAT = 1
+
+
+def _code_version() -> str:
+    try:
+        from reactor import __version__
+        return str(__version__)
+    except Exception:
+        return "unknown"
+
+
+def code_hash(paths: Optional[Sequence[str]] = None) -> str:
+    """SHA-256 of ``paths`` and the ``reactor`` modules they import (every package module when None)."""
+    from .build import _PKG_DIR, module_deps
+
+    if paths is None:
+        files = set(glob.glob(os.path.join(_PKG_DIR, "*.py")))
+    else:
+        files = {f for p in paths for f in module_deps(p)}
+    h = hashlib.sha256()
+    for f in sorted(files, key=lambda f: (os.path.basename(f), f)):
+        with open(f, "rb") as fh:
+            h.update(os.path.basename(f).encode("utf-8") + b"\0" + fh.read() + b"\0")
+    return h.hexdigest()
+
+
+def _jsonable(x: Any) -> Any:
+    return json.loads(json.dumps(x, default=lambda o: np.asarray(o).tolist()))
+
+
+class SweepStore:
+    """Chunked result store for one sweep; chunk ``i`` covers points [i*chunk_size, (i+1)*chunk_size)."""
+
+    def __init__(
+        self,
+        root: str,
+        axes: Sequence[Axis],
+        chunk_size: int = DEFAULT_CHUNK,
+        seed: Optional[int] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        version: Optional[str] = None,
+        reset: bool = False,
+        code: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.root = str(root)
+        self.axes = list(axes)
+        self.chunk_size = max(1, int(chunk_size))
+        self.total = grid_size(self.axes)
+        self.manifest: Dict[str, Any] = _jsonable({
+            "format": FORMAT,
+            "axes": [{"name": a.name, "values": np.asarray(a.values).tolist()} for a in self.axes],
+            "total": self.total,
+            "chunk_size": self.chunk_size,
+            "seed": seed,
+            "version": _code_version() if version is None else version,
+            "code": code_hash(code),
+            "meta": meta or {},
+        })
+        self._chunks = os.path.join(self.root, "chunks")
+        path = os.path.join(self.root, MANIFEST)
+        if reset and os.path.isdir(self._chunks):
+            shutil.rmtree(self._chunks)
+        if os.path.exists(path) and not reset:
+            with open(path, encoding="utf-8") as f:
+                found = json.load(f)
+            if found != self.manifest:
+                diff = sorted(k for k in set(found) | set(self.manifest) if found.get(k) != self.manifest.get(k))
+                raise ValueError(f"checkpoint manifest mismatch in {self.root}: {', '.join(diff)} differ")
+        else:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp, path)
+        os.makedirs(self._chunks, exist_ok=True)
+
+    @property
+    def n_chunks(self) -> int:
+        return -(-self.total // self.chunk_size)
+
+    def bounds(self, index: int) -> Tuple[int, int]:
+        a = int(index) * self.chunk_size
+        return a, min(a + self.chunk_size, self.total)
+
+    def _path(self, index: int) -> str:
+        return os.path.join(self._chunks, f"{int(index):08d}.npz")
+
+    def completed(self) -> Set[int]:
+        done = set()
+        for name in os.listdir(self._chunks):
+            stem, ext = os.path.splitext(name)
+            if ext == ".npz" and stem.isdigit() and int(stem) < self.n_chunks:
+                done.add(int(stem))
+        return done
+
+    def save(self, index: int, cols: Columns) -> None:
+        path = self._path(index)
+        if os.path.exists(path):
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            # keep column order; npz member order is not guaranteed on load
+            np.savez(f, __order__=np.asarray(list(cols)), **{k: np.asarray(v) for k, v in cols.items()})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load(self, index: int) -> Columns:
+        with np.load(self._path(index), allow_pickle=False) as z:
+            return {str(k): z[str(k)] for k in z["__order__"]}
+
+    def run(self, compute: ComputeFn) -> Iterator[Columns]:
+        """Yield every chunk in order, loading completed ones and computing/saving the rest."""
+        done = self.completed()
+        for i in range(self.n_chunks):
+            if i in done:
+                yield self.load(i)
+                continue
+            a, b = self.bounds(i)
+            cols = compute(a, b)
+            self.save(i, cols)
+            yield cols
+
+    def run_sweep(self, evaluate: EvalFn) -> Iterator[Columns]:
+        """Checkpointed equivalent of ``reactor.sweep.iter_sweep(axes, evaluate, chunk_size)``."""
+        return self.run(lambda a, b: evaluate_chunk(points(self.axes, a, b), evaluate))
+
+    def progress(self) -> Dict[str, int]:
+        done = len(self.completed())
+        return {"chunks_done": done, "chunks_total": self.n_chunks}
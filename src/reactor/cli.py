@@ -1,41 +1,56 @@
+"""``reactor`` command line.
+
+Handlers import what they need when they run, so parsing arguments and the
+JSON-only subcommands (``gate``, ``econ``, ``run-report``) never import
+NumPy or the physics modules (``gate`` uses ``reactor.gates.evaluate_report``);
+``tests`` hold ``gate`` and ``econ`` to an import budget of a few named
+``reactor`` modules plus the standard library.
+
+Every ``scripts/<name>.py`` with a ``main()`` is also a subcommand
+(``reactor plot-production-fom --out x.png``), run in this process.
+``reactor batch FILE`` runs one command per line in a single interpreter,
+so imports and module-level caches are paid once for the whole file
+(``-`` or no file reads stdin; an interactive stdin gets a prompt)::
+
+    # jobs.txt
+    demo --steps 5 --seed 1
+    generate-feasibility-report --out artifacts/feas.json
+    gate --report artifacts/feas.json
+
+    reactor batch jobs.txt --keep-going
+"""
+
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import os
+import shlex
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, TextIO
 
-from .analysis import (
-    b_field_rms_fluctuation,
-    estimate_density_from_em,
-    stability_variance,
+SCRIPTS_DIR = os.environ.get(
+    "REACTOR_SCRIPTS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "scripts"),
 )
-from .config import load_json
-from .core import Reactor
-from .logging_utils import append_event
-from .metrics import confinement_efficiency_estimator
-
-try:
-    from . import plotting as plotting_helpers  # noqa: F401
-except Exception:  # pragma: no cover
-    plotting_helpers = None  # type: ignore[assignment]
+# subcommands defined here; a script of the same name (run_report.py) stays reachable through run_script
+BUILTINS = ("demo", "param-sweep", "feasibility", "run-scenarios", "gate", "econ", "run-report", "batch")
 
 
 def cmd_demo(args: argparse.Namespace) -> None:
-    cfg = load_json(args.scenario) if args.scenario else {}
-    timeline_path = args.timeline_log or cfg.get("timeline_log_path")
-    xi = cfg.get("xi", 2.0)
-    br = cfg.get("b_field_ripple_pct", 0.005)
-    grid = tuple(cfg.get("grid", [32, 32]))
-    nu = float(cfg.get("nu", 1e-3))
+    from .config import Scenario, load_scenario
+    from .core import Reactor
+    from .logging_utils import append_event
     from .random_utils import set_seed
+
+    sc = load_scenario(args.scenario) if args.scenario else Scenario()
+    timeline_path = args.timeline_log or sc.timeline_log_path
     set_seed(int(args.seed))
-    R = Reactor(
-        grid=grid,
-        nu=nu,
-        timeline_log_path=timeline_path,
-        xi=xi,
-        b_field_ripple_pct=br,
-        timeline_budget=args.timeline_budget,
-    )
+    # the demo command has never fed the scenario's B series to the reactor
+    R = Reactor(**sc.reactor_kwargs(timeline_log_path=timeline_path, timeline_budget=args.timeline_budget,
+                                    b_series=None))
     # log run seed for reproducibility, if timeline is enabled
     if timeline_path:
         append_event(
@@ -50,6 +65,11 @@ def cmd_demo(args: argparse.Namespace) -> None:
 
 
 def cmd_param_sweep(args: argparse.Namespace) -> None:
+    import sys
+
+    from .metrics import confinement_efficiency_vec
+    from .sweep import Axis, run_sweep, write_columns
+
     xi_vals = [
         args.xi_min + i * (args.xi_max - args.xi_min) / max(args.xi_steps - 1, 1)
         for i in range(args.xi_steps)
@@ -58,37 +78,22 @@ def cmd_param_sweep(args: argparse.Namespace) -> None:
         args.ripple_min + j * (args.ripple_max - args.ripple_min) / max(args.ripple_steps - 1, 1)
         for j in range(args.ripple_steps)
     ]
-    rows = []
-    def _progress_iter(x):
-        return x
-    try:
-        from tqdm import tqdm
-        def _progress_iter_tqdm(x):
-            return tqdm(x)
-    except Exception:  # pragma: no cover
-        # keep default
-        ...
-    prog_iter = locals().get("_progress_iter_tqdm", _progress_iter)
-    for xi in prog_iter(xi_vals):
-        for rp in ripple_vals:
-            eff = confinement_efficiency_estimator(xi, rp)
-            rows.append({"xi": xi, "b_field_ripple_pct": rp, "efficiency": eff})
-    # Save CSV if requested
-    if args.out:
-        import csv
-        with open(args.out, "w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=["xi", "b_field_ripple_pct", "efficiency"])
-            w.writeheader()
-            for r in rows:
-                w.writerow(r)
+    axes = [Axis.explicit("xi", xi_vals), Axis.explicit("b_field_ripple_pct", ripple_vals)]
+
+    def _eff(c):
+        return {"efficiency": confinement_efficiency_vec(c["xi"], c["b_field_ripple_pct"])}
+
+    # Evaluate once; the same columns feed the CSV / JSON files, the plot and the stdout summary
+    cols = run_sweep(axes, _eff)
+    write_columns([cols], csv_path=args.out, json_path=args.json_out, json_indent=2)
     # Optional quick plot
-    if args.plot and plotting_helpers is not None:
+    if args.plot:
         try:
-            xs = [r["xi"] for r in rows]
-            ys = [r["efficiency"] for r in rows]
+            from . import plotting as plotting_helpers
+
             plotting_helpers.quick_scatter(
-                xs,
-                ys,
+                cols["xi"].tolist(),
+                cols["efficiency"].tolist(),
                 args.plot,
                 xlabel="xi",
                 ylabel="efficiency",
@@ -97,21 +102,17 @@ def cmd_param_sweep(args: argparse.Namespace) -> None:
         except Exception as e:
             # keep CLI robust if plotting unavailable
             print(json.dumps({"warning": f"plotting failed: {e}"}))
-    # Optional JSON output file
-    if args.json_out:
-        with open(args.json_out, "w", encoding="utf-8") as f:
-            json.dump({"rows": rows}, f, indent=2)
     # Always print JSON summary for programmatic consumption
-    print(json.dumps({"rows": rows}))
+    write_columns([cols], json_path=sys.stdout)
+    sys.stdout.write("\n")
 
 
 def cmd_feasibility(args: argparse.Namespace) -> None:
     # Thin wrapper around generate_feasibility_report behavior:
-    # expect precomputed arrays via JSON strings
+    # series are inline JSON arrays or file paths (see reactor.series)
     import sys
 
-    import numpy as np
-
+    from .series import evaluate_series_gates
     from .thresholds import Thresholds, thresholds_from_json
     thr = Thresholds()
     # If user did not override thresholds, try to load from metrics.json present in repo
@@ -119,49 +120,27 @@ def cmd_feasibility(args: argparse.Namespace) -> None:
         thr = thresholds_from_json("metrics.json")
     except Exception:
         pass
-    def _load_series(s):
-        return np.array(json.loads(s), dtype=float) if s else None
-    gamma_series = _load_series(args.gamma_series)
-    b_series = _load_series(args.b_series)
-    E_mag = _load_series(args.E_mag)
-    gamma_ok = False
-    gamma_stats = {}
-    if gamma_series is not None and gamma_series.size > 0:
-        gamma_stats = {
-            "gamma_min": float(np.min(gamma_series)),
-            "gamma_max": float(np.max(gamma_series)),
-            "gamma_mean": float(np.mean(gamma_series)),
-            "gamma_variance": stability_variance(gamma_series),
-            "dt": args.dt,
-        }
-        needed = int(np.ceil(args.gamma_duration / max(args.dt, 1e-12)))
-        mask = gamma_series >= args.gamma_threshold
-        run = 0
-        for m in mask:
-            run = run + 1 if m else 0
-            if run >= needed:
-                gamma_ok = True
-                break
-    b_ok = False
-    b_stats = {}
-    if b_series is not None and b_series.size > 0:
-        rms = b_field_rms_fluctuation(b_series)
-        b_stats = {"b_mean_T": float(np.mean(b_series)), "b_rms_fraction": rms}
-        b_ok = (rms <= args.b_ripple_max) and (np.mean(b_series) >= thr.b_field_min_T)
-    dens_ok = False
-    dens_stats = {}
-    if E_mag is not None and E_mag.size > 0:
-        ne = estimate_density_from_em(E_mag, gamma=1.0, Emin=0.0, ne_min=0.0)
-        dens_stats = {"ne_max_cm3": float(np.max(ne))}
-        dens_ok = float(np.max(ne)) >= args.density_threshold
+    gates = evaluate_series_gates(
+        args.gamma_series,
+        args.b_series,
+        args.E_mag,
+        dt=args.dt,
+        gamma_threshold=args.gamma_threshold,
+        gamma_duration=args.gamma_duration,
+        density_threshold=args.density_threshold,
+        b_ripple_max=args.b_ripple_max,
+        b_min=thr.b_field_min_T,
+        chunk_size=args.chunk_size,
+    )
+    gamma_ok, b_ok, dens_ok = gates.gamma_ok, gates.b_ok, gates.dens_ok
     payload = {
         "stable": gamma_ok and b_ok and dens_ok,
         "gamma_ok": gamma_ok,
         "b_ok": b_ok,
         "dens_ok": dens_ok,
-        "gamma_stats": gamma_stats,
-        "b_stats": b_stats,
-        "density_stats": dens_stats,
+        "gamma_stats": gates.gamma_stats,
+        "b_stats": gates.b_stats,
+        "density_stats": gates.density_stats,
     }
     if args.fail_on_gate and not payload.get("stable", False):
         payload["exit_reason"] = "feasibility_gate_failed"
@@ -170,6 +149,39 @@ def cmd_feasibility(args: argparse.Namespace) -> None:
         sys.exit(2)
 
 
+def cmd_run_scenarios(args: argparse.Namespace) -> None:
+    import sys
+
+    from .scenarios import run_scenarios, scenario_jobs, summarize
+    from .sweep import write_columns
+
+    # check the results path before any job runs, so a bad --out cannot discard a finished batch
+    out = args.out
+    if not out.endswith((".csv", ".jsonl", ".ndjson", ".json")):
+        print(json.dumps({"error": f"--out {out!r} must end in .csv, .jsonl, .ndjson or .json"}), file=sys.stderr)
+        sys.exit(2)
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    seeds = [int(s) for s in str(args.seeds).split(",") if s.strip()]
+    jobs = scenario_jobs(args.scenarios, seeds, steps=args.steps, dt=args.dt)
+
+    def progress(row):
+        print(json.dumps({k: row.get(k) for k in ("job_id", "status", "elapsed_s", "error") if row.get(k) != ""}),
+              file=sys.stderr)
+
+    cols = run_scenarios(jobs, workers=args.workers, timeout=args.timeout, max_mem_mb=args.max_mem_mb,
+                         timeline_dir=args.timeline_dir, progress=progress)
+    write_columns(
+        [cols],
+        csv_path=out if out.endswith(".csv") else None,
+        jsonl_path=out if out.endswith((".jsonl", ".ndjson")) else None,
+        json_path=out if out.endswith(".json") else None,
+    )
+    summary = summarize(cols)
+    print(json.dumps({"wrote": out, **summary}))
+    if args.fail_on_error and summary["n_jobs"] != summary["ok"]:
+        sys.exit(2)
+
+
 def build_parser() -> argparse.ArgumentParser:
     ap = argparse.ArgumentParser(prog="reactor")
     sp = ap.add_subparsers(dest="cmd", required=True)
@@ -196,10 +208,12 @@ def build_parser() -> argparse.ArgumentParser:
     p_sweep.set_defaults(func=cmd_param_sweep)
     # feasibility
     p_feas = sp.add_parser("feasibility")
-    p_feas.add_argument("--gamma-series", default=None)
+    series_help = "JSON array, or .npy/.npz/.f32/.f64/.bin[:dtype]/.json/.ndjson/.csv[:column] file"
+    p_feas.add_argument("--gamma-series", default=None, help=series_help)
     p_feas.add_argument("--dt", type=float, default=1e-3)
-    p_feas.add_argument("--b-series", default=None)
-    p_feas.add_argument("--E-mag", default=None)
+    p_feas.add_argument("--b-series", default=None, help=series_help)
+    p_feas.add_argument("--E-mag", default=None, help=series_help)
+    p_feas.add_argument("--chunk-size", type=int, default=1 << 20, help="Samples per chunk when streaming series")
     p_feas.add_argument("--gamma-threshold", type=float, default=140.0)
     p_feas.add_argument("--gamma-duration", type=float, default=0.01)
     p_feas.add_argument("--density-threshold", type=float, default=1e20)
@@ -210,6 +224,20 @@ def build_parser() -> argparse.ArgumentParser:
         help="Exit non-zero if any feasibility gate fails",
     )
     p_feas.set_defaults(func=cmd_feasibility)
+    # batched scenario runs
+    p_scen = sp.add_parser("run-scenarios", help="Run scenario files x seeds in a process pool")
+    p_scen.add_argument("scenarios", nargs="*", default=["examples/*.json"], help="Scenario files or globs")
+    p_scen.add_argument("--seeds", default="123", help="Comma-separated seeds (each scenario runs once per seed)")
+    p_scen.add_argument("--steps", type=int, default=None, help="Override the scenario's steps (default 10)")
+    p_scen.add_argument("--dt", type=float, default=None, help="Override the scenario's dt (default 1e-3)")
+    p_scen.add_argument("--workers", type=int, default=None, help="Concurrent jobs (default CPU count)")
+    p_scen.add_argument("--timeout", type=float, default=None, help="Per-job wall-clock limit [s]")
+    p_scen.add_argument("--max-mem-mb", type=float, default=None, help="Per-job address-space limit [MiB]")
+    p_scen.add_argument("--timeline-dir", default="artifacts/scenario_timelines",
+                        help="Directory for per-job timelines")
+    p_scen.add_argument("--out", default="artifacts/scenario_results.csv", help="Results table (.csv/.jsonl/.json)")
+    p_scen.add_argument("--fail-on-error", action="store_true", help="Exit non-zero if any job did not finish ok")
+    p_scen.set_defaults(func=cmd_run_scenarios)
     # metrics gate
     def _cmd_gate(a: argparse.Namespace) -> None:
         import sys
@@ -217,16 +245,9 @@ def build_parser() -> argparse.ArgumentParser:
             metrics = json.load(f)
         with open(a.report, "r", encoding="utf-8") as f:
             rep = json.load(f)
-        ok = True
-        if not rep.get("stable", False):
-            ok = False
-        gthr = metrics.get("gamma_min", None)
-        if gthr is not None and rep.get("gamma_stats"):
-            if rep["gamma_stats"].get("gamma_max", 0.0) < float(gthr):
-                ok = False
-        if getattr(a, "require_yield", False):
-            if not rep.get("antiproton_yield_pass", False):
-                ok = False
+        from .gates import evaluate_report, report_gates
+        gates = report_gates(gamma_min=metrics.get("gamma_min", None), require_yield=getattr(a, "require_yield", False))
+        ok, _ = evaluate_report(rep, gates)
         print(json.dumps({"gate": "feasibility", "ok": bool(ok)}))
         if not ok:
             sys.exit(2)
@@ -240,7 +261,6 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_gate.set_defaults(func=_cmd_gate)
     # econ report
-    from .analysis_econ import write_economic_report
     p_econ = sp.add_parser("econ")
     p_econ.add_argument("--out", default="economic_report.json")
     p_econ.add_argument("--energy-J", type=float, default=1000.0)
@@ -253,6 +273,7 @@ def build_parser() -> argparse.ArgumentParser:
         help="If provided, read total_energy_J from this JSON",
     )
     def _cmd_econ(a: argparse.Namespace) -> None:
+        from .analysis_econ import write_economic_report
         energy = a.energy_J
         if a.channel_report:
             try:
@@ -309,13 +330,189 @@ def build_parser() -> argparse.ArgumentParser:
     p_rr.add_argument("--channel-report", default="channel_report.json")
     p_rr.add_argument("--yield-report", default=None)
     p_rr.set_defaults(func=_cmd_run_report)
+    # batch / REPL
+    p_batch = sp.add_parser("batch", help="Run reactor commands from a file, one per line, in this process")
+    p_batch.add_argument("files", nargs="*", help="Command files ('-' = stdin; default stdin, prompting if a tty)")
+    p_batch.add_argument("--keep-going", action="store_true", help="Run the remaining commands after a failure")
+    p_batch.set_defaults(func=cmd_batch)
+    # scripts/*.py (dispatched by run() before parsing; listed here for --help)
+    for cmd, script in script_commands().items():
+        if cmd not in BUILTINS:
+            p_s = sp.add_parser(cmd, help=f"scripts/{script}.py", add_help=False)
+            p_s.add_argument("argv", nargs=argparse.REMAINDER)
+            p_s.set_defaults(func=functools.partial(_cmd_script, script))
     return ap
 
 
-def main():
-    ap = build_parser()
-    args = ap.parse_args()
-    args.func(args)
+# --- scripts as subcommands ------------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=None)
+def script_commands(scripts_dir: str = SCRIPTS_DIR) -> Dict[str, str]:
+    """``{subcommand: script name}`` for every ``scripts/*.py`` defining ``main()``."""
+    out: Dict[str, str] = {}
+    if not os.path.isdir(scripts_dir):
+        return out
+    for fn in sorted(os.listdir(scripts_dir)):
+        name, ext = os.path.splitext(fn)
+        if ext != ".py" or name.startswith("_"):
+            continue
+        with open(os.path.join(scripts_dir, fn), "r", encoding="utf-8") as f:
+            if "\ndef main(" in f.read():
+                out[name.replace("_", "-")] = name
+    return out
+
+
+def _load_script(name: str, scripts_dir: str = SCRIPTS_DIR) -> Any:
+    """Import ``scripts/<name>.py`` once (as ``scripts.<name>``); later calls reuse the module."""
+    import importlib.util
+
+    modname = f"scripts.{name}"
+    mod = sys.modules.get(modname)
+    if mod is not None:
+        return mod
+    path = os.path.join(scripts_dir, f"{name}.py")
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"no script {path}")
+    spec = importlib.util.spec_from_file_location(modname, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {path}")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[modname] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except BaseException:
+        del sys.modules[modname]
+        raise
+    return mod
+
+
+def _exit_code(e: SystemExit) -> int:
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def run_script(name: str, argv: Sequence[str] = (), scripts_dir: str = SCRIPTS_DIR) -> int:
+    """Call ``scripts/<name>.py``'s ``main()`` with ``sys.argv`` set to ``argv``; returns its exit code.
+
+    ``sys.argv`` and the working directory are restored afterwards.
+    """
+    mod = _load_script(name, scripts_dir)
+    saved_argv, saved_cwd = sys.argv, os.getcwd()
+    sys.argv = [os.path.join(scripts_dir, f"{name}.py"), *argv]
+    try:
+        mod.main()
+    except SystemExit as e:
+        return _exit_code(e)
+    finally:
+        sys.argv = saved_argv
+        os.chdir(saved_cwd)
+    return 0
+
+
+def _cmd_script(script: str, args: argparse.Namespace) -> None:
+    code = run_script(script, args.argv)
+    if code:
+        sys.exit(code)
+
+
+def run(argv: Optional[Sequence[str]] = None) -> int:
+    """Run one ``reactor`` command line in this process and return its exit code."""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] == "reactor":
+        argv = argv[1:]
+    scripts = script_commands()
+    try:
+        if argv and argv[0] in scripts and argv[0] not in BUILTINS:
+            return run_script(scripts[argv[0]], argv[1:])
+        args = build_parser().parse_args(argv)
+        args.func(args)
+    except SystemExit as e:
+        return _exit_code(e)
+    return 0
+
+
+# --- batch / REPL ------------------------------------------------------------------------
+
+
+def run_batch(lines: Sequence[str], keep_going: bool = False, log: Optional[TextIO] = None) -> Dict[str, Any]:
+    """Run each command line (``#`` comments and blank lines skipped) via ``run``.
+
+    Stops at the first failing command unless ``keep_going``. With ``log``,
+    one JSON status line per command (line number, exit code, elapsed
+    seconds) is written there. Returns counts and the failed line numbers.
+    """
+    import traceback
+
+    n_run, failed = 0, []
+    for lineno, line in enumerate(lines, 1):
+        t0 = time.perf_counter()
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"line {lineno}: {e}", file=sys.stderr)
+            argv, code = None, 2
+        if argv == []:
+            continue
+        if argv is not None:
+            try:
+                code = run(argv)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+        n_run += 1
+        sys.stdout.flush()
+        if log is not None:
+            print(json.dumps({"line": lineno, "cmd": line.strip(), "exit": code,
+                              "elapsed_s": time.perf_counter() - t0}), file=log, flush=True)
+        if code:
+            failed.append(lineno)
+            if not keep_going:
+                break
+    return {"commands": n_run, "failed": failed, "ok": not failed}
+
+
+def _repl(log: TextIO) -> int:
+    """Prompt for commands until EOF, ``exit`` or ``quit``; returns the number that failed."""
+    n_failed = 0
+    while True:
+        try:
+            line = input("reactor> ")
+        except EOFError:
+            print(file=log)
+            return n_failed
+        if line.strip() in ("exit", "quit"):
+            return n_failed
+        n_failed += len(run_batch([line], keep_going=True, log=log)["failed"])
+
+
+def cmd_batch(args: argparse.Namespace) -> None:
+    files = args.files or ["-"]
+    if files == ["-"] and sys.stdin.isatty():
+        if _repl(sys.stderr):
+            sys.exit(1)
+        return
+    lines: List[str] = []
+    for fn in files:
+        if fn == "-":
+            lines.extend(sys.stdin.read().splitlines())
+        else:
+            with open(fn, "r", encoding="utf-8") as f:
+                lines.extend(f.read().splitlines())
+    res = run_batch(lines, keep_going=args.keep_going, log=sys.stderr)
+    print(json.dumps({"batch": res}))
+    if not res["ok"]:
+        sys.exit(1)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    code = run(argv)
+    if code:
+        sys.exit(code)
 
 
 if __name__ == "__main__":
@@ -1,86 +1,115 @@
 from __future__ import annotations
 
-# Thin wrappers to call existing script main() functions.
+# Thin wrappers to call existing script main() functions in-process (see reactor.cli.run_script);
+# `reactor <script-name>` and `reactor batch` reach the same scripts.
 
-def _run(module: str, func: str = "main") -> None:  # pragma: no cover (thin wrapper)
-    mod = __import__(module, fromlist=[func])
-    getattr(mod, func)()
+def _run(script: str) -> None:  # pragma: no cover (thin wrapper)
+    import sys
+
+    from .cli import run_script
+
+    code = run_script(script, sys.argv[1:])
+    if code:
+        sys.exit(code)
 
 
 def plot_production_fom() -> None:
-    _run("scripts.plot_production_fom")
+    _run("plot_production_fom")
 
 
 def plot_stability() -> None:
-    _run("scripts.plot_stability")
+    _run("plot_stability")
 
 
 def run_report() -> None:
-    _run("scripts.run_report")
+    _run("run_report")
 
 
 def production_kpi() -> None:
-    _run("scripts.production_kpi")
+    _run("production_kpi")
 
 
 def sweep_time() -> None:
-    _run("scripts.param_sweep_confinement")
+    _run("param_sweep_confinement")
 
 
 def sweep_dynamic_ripple() -> None:
-    _run("scripts.param_sweep_confinement")
+    _run("param_sweep_confinement")
 
 
 def hardware_runner() -> None:
-    _run("scripts.hardware_runner")
+    _run("hardware_runner")
 
 
 def sensor_noise() -> None:
-    _run("scripts.sensor_noise_model")
+    _run("sensor_noise_model")
 
 
 def bench_step_loop() -> None:
-    _run("scripts.bench_step_loop")
+    _run("bench_step_loop")
 
 
 def build_artifacts() -> None:
-    # One-shot builder: demo + report + KPI + key plots
+    # Incremental builder: only targets whose inputs, parameters or code changed are rebuilt
+    import argparse
     import json
     import os
     import sys
-    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), ".."))
-    from scripts import demo_runner, generate_feasibility_report
-    from scripts import plot_production_fom as pf
-    from scripts import plot_stability as ps
-    from scripts import production_kpi as kpi
-    from scripts import run_report as rr
-
-    # Demo run (minimal)
-    demo_runner.main()
-    # Feasibility
-    generate_feasibility_report.main()
-    # Integrated report
-    rr.main()
-    # KPI
-    kpi.main()
-    # Plots
-    pf.main()
-    ps.main()
-    print(json.dumps({
-        "ok": True,
-        "built": [
-            "feasibility_gates_report.json",
-            "artifacts/integrated_report.json",
-            "production_kpi.json",
-            "artifacts/production_fom_yield.png",
-            "artifacts/stability.png"
-        ]
-    }))
+
+    from .build import MANIFEST, artifact_targets, build
+
+    ap = argparse.ArgumentParser(description="Build demo/report/KPI/plot artifacts incrementally")
+    ap.add_argument("targets", nargs="*", help="Targets to build (default all)")
+    ap.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    ap.add_argument("--manifest", default=MANIFEST, help="Content-hash manifest, relative to --root")
+    ap.add_argument("--jobs", "-j", type=int, default=None, help="Targets to run in parallel (default CPU count)")
+    ap.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    ap.add_argument("--dry-run", action="store_true", help="Only report which targets are stale")
+    args = ap.parse_args()
+    targets = artifact_targets(args.root)
+    res = build(targets, manifest=args.manifest, root=args.root, only=args.targets or None, force=args.force,
+                jobs=args.jobs, dry_run=args.dry_run, log=lambda m: print(m, file=sys.stderr))
+    outputs = [o for t in targets if t.name in res["built"] + res["fresh"] for o in t.outputs]
+    print(json.dumps({"ok": not (res["failed"] or res["skipped"]), **res, "outputs": outputs}))
+    if res["failed"] or res["skipped"]:
+        sys.exit(1)
+
+
+def cost_model_sweep() -> None:
+    _run("cost_model_sweep")
+
+
+def snr_propagation() -> None:
+    _run("snr_propagation")
+
+
+def performance_budget() -> None:
+    _run("performance_budget")
+
+
+def envelope_sweep() -> None:
+    _run("envelope_sweep")
+
+
+def ablation_ripple() -> None:
+    _run("ablation_ripple")
+
+
+def kpi_diff() -> None:
+    _run("kpi_diff")
+
+
+def ndjson_to_csv() -> None:
+    _run("ndjson_to_csv")
+
+
+def plot_envelope_dual_panel() -> None:
+    _run("plot_envelope_dual_panel")
 
 
 def generate_timeline_anomalies() -> None:
-    _run("scripts.generate_timeline_anomalies")
+    _run("generate_timeline_anomalies")
 
 
 def validate_schemas() -> None:
-    _run("scripts.validate_schemas")
+    _run("validate_schemas")
@@ -1,9 +1,255 @@
+"""Scenario configuration: JSON loading and the validated, frozen ``Scenario`` model.
+
+Scenario files are plain JSON objects (see ``examples/``). ``Scenario``
+validates them once, applies the defaults every runner used to spell out
+(``grid`` 32x32, ``nu`` 1e-3, ``xi`` 2.0, ``b_field_ripple_pct`` 0.005) and
+folds aliases into one name per quantity (``n_e`` -> ``n_cm3``, ``T_e`` ->
+``Te_eV``, ``B`` -> ``B_T``, ``scenario_id`` -> ``name``; ``n_m3`` is
+converted to cm^-3). Keys it does not model are kept in ``extra``.
+
+``load_scenario`` caches by path, mtime and size, falling back to the
+content hash, so repeated loads of an unchanged file parse nothing.
+``load_scenarios`` reads many variants from one JSON/JSONL/CSV file.
+"""
+
 from __future__ import annotations
 
+import csv
+import hashlib
 import json
-from typing import Any, Dict
+import math
+import os
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
 
 
 def load_json(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
+
+
+ALIASES = {"n_e": "n_cm3", "T_e": "Te_eV", "B": "B_T", "scenario_id": "name"}
+
+
+def _canonical(data: Mapping[str, Any]) -> Dict[str, Any]:
+    """Fold aliases into canonical keys (a canonical key in the same mapping wins)."""
+    raw = dict(data)
+    for alias, key in ALIASES.items():
+        if alias in raw:
+            raw.setdefault(key, raw.pop(alias))
+    if "n_m3" in raw:
+        v = raw.pop("n_m3")
+        raw.setdefault("n_cm3", None if v is None else float(v) * 1e-6)
+    return raw
+
+
+@dataclass(frozen=True)
+class Scenario:
+    grid: Tuple[int, int] = (32, 32)
+    nu: float = 1e-3
+    xi: float = 2.0
+    b_field_ripple_pct: float = 0.005
+    b_series: Optional[Tuple[float, ...]] = None
+    timeline_log_path: Optional[str] = None
+    timeline_budget: Optional[int] = None
+    steps: Optional[int] = None
+    dt: Optional[float] = None
+    seed: Optional[int] = None
+    n_cm3: Optional[float] = None
+    Te_eV: Optional[float] = None
+    B_T: Optional[float] = None
+    name: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any], source: Optional[str] = None) -> "Scenario":
+        """Validate and normalize a scenario mapping; raises ValueError listing every problem."""
+        raw = _canonical(data)
+        known = {f.name for f in fields(cls)} - {"extra"}
+        extra = {k: v for k, v in raw.items() if k not in known}
+        kw = {k: v for k, v in raw.items() if k in known and v is not None}
+        errors: List[str] = []
+
+        def num(key: str, kind: type = float, positive: bool = False, minimum: Optional[float] = None) -> None:
+            if key not in kw:
+                return
+            try:
+                v = kind(kw[key])
+                if kind is int and v != float(kw[key]):
+                    raise ValueError
+            except (TypeError, ValueError):
+                errors.append(f"{key}={kw[key]!r} is not a valid {kind.__name__}")
+                return
+            if kind is float and not math.isfinite(v):
+                errors.append(f"{key}={v!r} must be finite")
+            elif positive and v <= 0:
+                errors.append(f"{key}={v!r} must be > 0")
+            elif minimum is not None and v < minimum:
+                errors.append(f"{key}={v!r} must be >= {minimum}")
+            kw[key] = v
+
+        for k in ("nu", "b_field_ripple_pct"):
+            num(k, minimum=0.0)
+        for k in ("xi", "dt", "Te_eV", "B_T"):
+            num(k, positive=True)
+        num("n_cm3", minimum=0.0)
+        num("steps", int, minimum=1)
+        num("timeline_budget", int, minimum=0)
+        num("seed", int)
+        if "grid" in kw:
+            g = kw["grid"]
+            try:
+                grid = tuple(int(x) for x in g)
+                if len(grid) != 2 or min(grid) < 2 or any(int(x) != float(x) for x in g):
+                    raise ValueError
+                kw["grid"] = grid
+            except (TypeError, ValueError):
+                errors.append(f"grid={g!r} must be two integers >= 2")
+        if "b_series" in kw:
+            try:
+                arr = np.asarray(kw["b_series"], dtype=float).ravel()
+                if not np.isfinite(arr).all():
+                    raise ValueError
+                kw["b_series"] = tuple(arr.tolist())
+            except (TypeError, ValueError):
+                errors.append("b_series must be a list of finite numbers")
+        for k in ("timeline_log_path", "name"):
+            if k in kw:
+                kw[k] = str(kw[k])
+        if errors:
+            where = f" in {source}" if source else ""
+            raise ValueError(f"invalid scenario{where}: " + "; ".join(errors))
+        return cls(**kw, extra=extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for f in fields(self):
+            v = getattr(self, f.name)
+            if f.name == "extra" or v is None:
+                continue
+            out[f.name] = list(v) if isinstance(v, tuple) else v
+        out.update(self.extra)
+        return out
+
+    def b_array(self) -> Optional[np.ndarray]:
+        return None if self.b_series is None else np.array(self.b_series, dtype=float)
+
+    def reactor_kwargs(self, **overrides: Any) -> Dict[str, Any]:
+        """Keyword arguments for ``Reactor(...)``; ``overrides`` win (e.g. ``timeline_log_path``)."""
+        kw: Dict[str, Any] = {
+            "grid": self.grid,
+            "nu": self.nu,
+            "timeline_log_path": self.timeline_log_path,
+            "xi": self.xi,
+            "b_field_ripple_pct": self.b_field_ripple_pct,
+            "timeline_budget": self.timeline_budget,
+            "b_series": self.b_array(),
+        }
+        kw.update(overrides)
+        return kw
+
+    def with_overrides(self, **changes: Any) -> "Scenario":
+        """Re-validated copy with ``changes`` applied (aliases allowed)."""
+        return Scenario.from_dict({**self.to_dict(), **changes})
+
+
+# --- cached loading -------------------------------------------------------------------
+
+_lock = threading.Lock()
+_by_path: Dict[str, Tuple[Tuple[int, int], str, Scenario]] = {}
+_by_hash: Dict[str, Scenario] = {}
+
+
+def load_scenario(path: str) -> Scenario:
+    """``Scenario`` for a JSON file, cached by (path, mtime, size) and then by content hash."""
+    full = os.path.abspath(path)
+    st = os.stat(full)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        hit = _by_path.get(full)
+    if hit is not None and hit[0] == stamp:
+        return hit[2]
+    with open(full, "rb") as f:
+        blob = f.read()
+    digest = hashlib.sha256(blob).hexdigest()
+    with _lock:
+        sc = _by_hash.get(digest)
+    if sc is None:
+        sc = Scenario.from_dict(json.loads(blob.decode("utf-8")), source=path)
+    with _lock:
+        _by_hash[digest] = sc
+        _by_path[full] = (stamp, digest, sc)
+    return sc
+
+
+def clear_scenario_cache() -> None:
+    with _lock:
+        _by_path.clear()
+        _by_hash.clear()
+
+
+def as_scenario(obj: Union[None, str, Mapping[str, Any], Scenario]) -> Scenario:
+    """Accept a Scenario, a file path, a mapping or None (all defaults)."""
+    if isinstance(obj, Scenario):
+        return obj
+    if obj is None:
+        return Scenario()
+    if isinstance(obj, str):
+        return load_scenario(obj)
+    return Scenario.from_dict(obj)
+
+
+def _cell(v: str) -> Any:
+    s = v.strip()
+    if s == "":
+        return None
+    if s[0] in "[{\"" or s in ("true", "false", "null"):
+        return json.loads(s)
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+
+def load_scenarios(path: str, base: Union[None, str, Mapping[str, Any], Scenario] = None) -> List[Scenario]:
+    """Many scenario variants from one file, each applied over ``base``.
+
+    ``.jsonl``/``.ndjson``: one object per line; ``.json``: a list of objects,
+    ``{"rows": [...]}`` (``write_columns`` output) or a dict of equal-length
+    columns; ``.csv``: one row per variant, list cells as JSON (``"[32, 32]"``)
+    and empty cells meaning "use base". Validation errors name the row.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    rows: List[Dict[str, Any]]
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if ext in (".jsonl", ".ndjson"):
+            rows = [json.loads(line) for line in f if line.strip()]
+        elif ext == ".csv":
+            rows = [{k: _cell(v) for k, v in r.items() if k is not None} for r in csv.DictReader(f)]
+        else:
+            data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get("rows"), list):
+                data = data["rows"]
+            if isinstance(data, dict):
+                n = len(next(iter(data.values()), []))
+                data = [{k: v[i] for k, v in data.items()} for i in range(n)]
+            rows = list(data)
+    b = as_scenario(base)
+    base_dict = b.to_dict() if base is not None else {}
+    out: List[Scenario] = []
+    for i, r in enumerate(rows):
+        row = _canonical({k: v for k, v in r.items() if v is not None})
+        merged = {**base_dict, **row}
+        if merged == base_dict and base is not None:
+            out.append(b)
+            continue
+        out.append(Scenario.from_dict(merged, source=f"{path} row {i}"))
+    return out
+
@@ -5,6 +5,7 @@ from typing import Callable, Optional
 import numpy as np
 
 from .analysis_fields import b_field_rms_fluctuation
+from .analysis_stat import OnlineStats
 from .logging_utils import append_event
 from .metrics import (
     antiproton_yield_estimator,
@@ -20,6 +21,7 @@ class Reactor:
     """Minimal reactor state and stepper glue for integration testing.
 
     Optional timeline logging: set timeline_log_path to write NDJSON events.
+    Optional streaming stats: pass an OnlineStats to accumulate max|ω| per step.
     """
     def __init__(
         self,
@@ -31,6 +33,7 @@ class Reactor:
         timeline_budget: int | None = None,
         enforce_density: bool = True,
         b_series: np.ndarray | None = None,
+        online_stats: OnlineStats | None = None,
     ) -> None:
         self.grid = grid
         self.nu = float(nu)
@@ -57,12 +60,15 @@ class Reactor:
         self.B_series = b_series
         # Internal time accumulator (s) for dynamic ripple adjustment
         self._time_s = 0.0
+        self.online_stats = online_stats
 
     def step(self, dt: float = 1e-3) -> np.ndarray:
         self.omega = vorticity_evolution(self.omega, self.psi, self.nu, dt, forcing=None)
         self.psi = drift_poisson_step(self.omega, max_iter=3)
         self.state = self.omega.copy()
         self._time_s += float(dt)
+        if self.online_stats is not None:
+            self.online_stats.update(float(np.max(np.abs(self.omega))))
         # optional timeline logging
         if self.timeline_log_path:
             wmax = float(np.max(np.abs(self.omega)))
@@ -335,6 +341,27 @@ class Reactor:
             return
 
 
+def dynamic_ripple_point(
+    point: dict,
+    rng: np.random.Generator,
+    n_samples: int = 256,
+    noise_T: float = 5e-5,
+) -> dict:
+    """Sweep point evaluator: B ripple before/after Reactor.adjust_ripple at time t.
+
+    Expects point keys B (mean field, T), alpha and t (s). Draws a synthetic
+    B_series from ``rng`` so results depend only on the point's RNG stream;
+    module-level so it can be shipped to worker processes by reactor.sweep.map_points.
+    """
+    base = float(point["B"])
+    series = np.ones(int(n_samples)) * base + rng.normal(0, float(noise_T), int(n_samples))
+    R = Reactor(grid=(16, 16), nu=1e-3, b_series=series)
+    R._time_s = float(point["t"])
+    ripple0 = b_field_rms_fluctuation(series)
+    ripple1 = R.adjust_ripple(alpha=float(point["alpha"]))
+    return {"ripple_initial": ripple0, "ripple_dynamic": ripple1}
+
+
 # Optional ecosystem integration with unified_gut_polymerization
 try:
     # pair_production_rate(n_e_cm3, T_eV) -> rate [1/(cm^3 s)]
@@ -2,16 +2,31 @@ from __future__ import annotations
 
 from typing import Sequence
 
+import numpy as np
+
+INTEGRATION_METHODS = ("exact", "trapezoid")
+
 
 class EnergyLedger:
-    """Accumulate energy input and compute energy per antiproton."""
+    """Accumulate energy input and compute energy per antiproton.
+
+    By default channels keep totals only. With ``series_resolution_s > 0`` they
+    also keep a cumulative-energy time series (``channel_series``) holding the
+    last point in each bin of that width; ``series_resolution_s=None`` keeps
+    one point per interval boundary, which grows with every call. Whole power
+    arrays go through ``add_power_series``.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, series_resolution_s: float | None = 0.0) -> None:
         self._energy_j = 0.0
         self._n_pbar = 0.0
         self._channels: dict[str, float] = {}
         # Enhancement factor (>1 means achieved total is reduced relative to raw)
         self._enhancement = 1.0
+        self._resolution = None if series_resolution_s is None else max(0.0, float(series_resolution_s))
+        self._clock: dict[str, float] = {}  # channel -> end time of its last interval [s]
+        self._series: dict[str, list[tuple[np.ndarray, np.ndarray]]] = {}  # channel -> (t, E_cum) chunks
+        self._pending: dict[str, list[tuple[float, float]]] = {}  # scalar points not yet in _series
 
     def add_power_sample(self, power_w: float, dt_s: float) -> None:
         self._energy_j += float(power_w) * float(dt_s)
@@ -31,6 +46,92 @@ class EnergyLedger:
         e = float(power_w) * float(dt_s)
         self._energy_j += e
         self._channels[channel] = self._channels.get(channel, 0.0) + e
+        t = self._clock[channel] = self._clock.get(channel, 0.0) + float(dt_s)
+        if self._resolution != 0.0:
+            pts = self._pending.setdefault(channel, [])
+            pts.append((t, self._channels[channel]))
+            if len(pts) >= 4096:
+                self._flush(channel)
+
+    def add_power_series(
+        self,
+        channel: str,
+        power_w: np.ndarray,
+        dt_s: float | np.ndarray,
+        method: str = "exact",
+        t0_s: float | None = None,
+    ) -> float:
+        """Integrate a whole power array into ``channel``; returns the energy added [J].
+
+        ``exact`` holds each sample for its interval (the sum of
+        ``add_channel_energy`` calls, to rounding): ``dt_s`` is one spacing or
+        one interval per sample. ``trapezoid`` integrates linearly between
+        samples: ``dt_s`` is one spacing or the ``n - 1`` gaps. The series
+        starts at ``t0_s`` (default: where the channel's last one ended).
+        """
+        p = np.asarray(power_w, dtype=float).ravel()
+        if method not in INTEGRATION_METHODS:
+            raise ValueError(f"unknown integration method {method!r}; expected one of {INTEGRATION_METHODS}")
+        n_int = p.size if method == "exact" else max(p.size - 1, 0)
+        dt = np.asarray(dt_s, dtype=float)
+        if dt.ndim == 0:
+            dt = np.full(n_int, float(dt))
+        if dt.shape != (n_int,):
+            raise ValueError(f"dt_s must be a scalar or {n_int} intervals for {p.size} samples ({method})")
+        if n_int == 0:
+            return 0.0
+        if (dt < 0).any() or not np.isfinite(dt).all():
+            raise ValueError("dt_s must be finite and >= 0")
+        e = p * dt if method == "exact" else 0.5 * (p[1:] + p[:-1]) * dt
+        self._flush(channel)
+        base = self._channels.get(channel, 0.0)
+        cum = np.cumsum(e)
+        cum += base
+        added = float(cum[-1] - base)
+        self._energy_j += added
+        self._channels[channel] = float(cum[-1])
+        t_start = self._clock.get(channel, 0.0) if t0_s is None else float(t0_s)
+        self._record(channel, t_start + np.cumsum(dt), cum)
+        return added
+
+    def _record(self, channel: str, t: np.ndarray, cum: np.ndarray) -> None:
+        self._clock[channel] = float(t[-1])
+        res = self._resolution
+        if res == 0.0:
+            return
+        chunks = self._series.setdefault(channel, [])
+        if res is not None:
+            # keep the last point in each resolution bin, replacing a stored point from the same bin
+            b = np.floor(t / res)
+            keep = np.append(b[1:] != b[:-1], True)
+            t, cum = t[keep], cum[keep]
+            if chunks:
+                pt, pe = chunks[-1]
+                if np.floor(pt[-1] / res) == np.floor(t[0] / res):
+                    chunks[-1] = (pt[:-1], pe[:-1])
+        chunks.append((t, cum))
+        if len(chunks) > 64:
+            self._series[channel] = [self._compact(channel)]
+
+    def _flush(self, channel: str) -> None:
+        pts = self._pending.pop(channel, None)
+        if pts:
+            arr = np.array(pts, dtype=float)
+            self._record(channel, arr[:, 0], arr[:, 1])
+
+    def _compact(self, channel: str) -> tuple[np.ndarray, np.ndarray]:
+        self._flush(channel)
+        chunks = self._series.get(channel) or []
+        if not chunks:
+            return np.empty(0), np.empty(0)
+        return np.concatenate([c[0] for c in chunks]), np.concatenate([c[1] for c in chunks])
+
+    def channel_series(self, channel: str) -> tuple[np.ndarray, np.ndarray]:
+        """``(t_s, E_cum_J)`` for ``channel`` (raw energy, before any enhancement)."""
+        t, e = self._compact(channel)
+        if channel in self._series:
+            self._series[channel] = [(t, e)]
+        return t.copy(), e.copy()
 
     def channels(self):
         return dict(self._channels)
@@ -118,12 +219,46 @@ class energy_interval:
 
 
 def merge_ledgers(*ledgers: EnergyLedger) -> EnergyLedger:
-    out = EnergyLedger()
-    for L in ledgers:
-        out._energy_j += L._energy_j
-        out._n_pbar += L._n_pbar
-        for k, v in L._channels.items():
-            out._channels[k] = out._channels.get(k, 0.0) + v
+    """Sum totals, yields and channels of many ledgers; channel series are summed on the union of their times.
+
+    A ledger's series counts as 0 before its first point and holds its last
+    value after it; in between it is interpolated linearly. Ledgers that kept
+    no series for a channel (``series_resolution_s=0``) add to its total only.
+
+    The result records further series at the coarsest input resolution
+    (totals-only beats any bin width, which beats ``None``). Its enhancement is
+    the effective one, raw total / sum of ``total_energy()``, so the merged
+    ``total_energy()`` is the sum of the inputs' (their common factor when all agree).
+    """
+    if not ledgers:
+        return EnergyLedger()
+    res = max((L._resolution for L in ledgers), key=lambda r: (r == 0.0, -1.0 if r is None else r))
+    out = EnergyLedger(series_resolution_s=res)
+    out._energy_j = float(np.sum([L._energy_j for L in ledgers]))
+    out._n_pbar = float(np.sum([L._n_pbar for L in ledgers]))
+    names = [k for L in ledgers for k in L._channels]
+    if names:
+        keys, inv = np.unique(np.array(names, dtype=object), return_inverse=True)
+        vals = np.fromiter((v for L in ledgers for v in L._channels.values()), dtype=float, count=len(names))
+        sums = dict(zip(keys.tolist(), np.bincount(inv, weights=vals).tolist(), strict=True))
+        out._channels = {k: sums[k] for k in dict.fromkeys(names)}  # first-seen order
+    for ch in out._channels:
+        parts = [p for p in (L._compact(ch) for L in ledgers) if p[0].size]
+        if parts:
+            t = np.unique(np.concatenate([p[0] for p in parts]))
+            e = np.zeros_like(t)
+            for pt, pe in parts:
+                e += np.interp(t, pt, pe, left=0.0, right=pe[-1])
+            out._series[ch] = [(t, e)]
+        clocks = [L._clock[ch] for L in ledgers if ch in L._clock]
+        if clocks:
+            out._clock[ch] = max(clocks)
+    factors = {L._enhancement for L in ledgers}
+    achieved = float(np.sum([L.total_energy() for L in ledgers]))
+    if len(factors) == 1:
+        out._enhancement = factors.pop()
+    elif achieved > 0.0:
+        out._enhancement = max(1.0, out._energy_j / achieved)
     return out
 
 
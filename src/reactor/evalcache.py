@@ -0,0 +1,301 @@
+"""Content-addressed on-disk evaluation cache shared across scripts and runs.
+
+Entries live in a single sqlite file keyed by the SHA-256 of (estimator name,
+package version, normalized inputs). Two granularities are supported:
+
+- ``persistent(name)`` wraps a scalar estimator; arguments are normalized with
+  ``reactor.memo.freeze`` so positional/keyword forms and int/float spellings
+  share an entry. Values must be JSON-serializable.
+- ``cached_eval(name, evaluate)`` wraps a columnar sweep evaluator; a whole
+  chunk is keyed by the bytes of its input columns, so re-running the same
+  grid (any script, any process) reuses prior chunks without per-point hashing.
+
+The cache is size-bounded: once the stored payload exceeds ``max_bytes`` the
+least recently used entries are deleted. The payload total is kept as a
+running count (summed from the file once, then adjusted per write) and
+re-summed only before an eviction, since other processes may share the
+file; hit timestamps are buffered and written with the next insert, so
+neither a hit nor a miss scans the table. Scripts pick it up from the
+``REACTOR_EVAL_CACHE`` environment variable (a file path); when unset, the
+wrappers call straight through.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .memo import _Unfreezable, freeze
+
+ENV_PATH = "REACTOR_EVAL_CACHE"
+ENV_MAX_BYTES = "REACTOR_EVAL_CACHE_MAX_BYTES"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_TOUCH_FLUSH = 1024  # buffered LRU timestamps written in one transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries(used);
+"""
+
+
+def _code_version() -> str:
+    try:
+        from reactor import __version__
+        return str(__version__)
+    except Exception:
+        return "unknown"
+
+
+def _encode(value: Any) -> Tuple[str, bytes]:
+    if isinstance(value, dict) and value and all(isinstance(v, np.ndarray) for v in value.values()):
+        buf = io.BytesIO()
+        np.savez(buf, __order__=np.asarray(list(value)), **value)
+        return "npz", buf.getvalue()
+    return "json", json.dumps(value, default=lambda o: np.asarray(o).tolist()).encode("utf-8")
+
+
+def _decode(kind: str, blob: bytes) -> Any:
+    if kind == "npz":
+        with np.load(io.BytesIO(blob), allow_pickle=False) as z:
+            return {str(k): z[str(k)] for k in z["__order__"]}
+    return json.loads(blob.decode("utf-8"))
+
+
+class EvalCache:
+    """sqlite-backed key/value store with LRU eviction by total payload size."""
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, version: Optional[str] = None) -> None:
+        self.path = str(path)
+        self.max_bytes = int(max_bytes)
+        self.version = _code_version() if version is None else str(version)
+        parent = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(parent, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")  # durable across crashes in WAL mode, no fsync per commit
+            self._db.executescript(_SCHEMA)
+            self._total = self._sum_sizes()
+        self._touched: Dict[str, int] = {}  # key -> last hit time, not yet written
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, name: str, inputs: Any) -> str:
+        """Hex digest for (name, version, inputs); ``inputs`` must be freezable or bytes."""
+        h = hashlib.sha256()
+        h.update(json.dumps([str(name), self.version]).encode("utf-8"))
+        if isinstance(inputs, (bytes, bytearray, memoryview)):
+            h.update(bytes(inputs))
+        else:
+            h.update(repr(freeze(inputs)).encode("utf-8"))
+        return h.hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        found: Dict[str, Any] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                part = keys[i:i + 500]
+                q = "SELECT key, kind, value FROM entries WHERE key IN (%s)" % ",".join("?" * len(part))
+                for k, kind, blob in self._db.execute(q, part):
+                    found[k] = _decode(kind, blob)
+            if found:
+                now = time.time_ns()
+                self._touched.update(dict.fromkeys(found, now))
+                if len(self._touched) >= _TOUCH_FLUSH:
+                    with self._db:
+                        self._flush_touched()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.get_many([key]).get(key, default)
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]) -> None:
+        now = time.time_ns()
+        rows = []
+        for k, v in items:
+            kind, blob = _encode(v)
+            rows.append((k, kind, sqlite3.Binary(blob), len(blob), now))
+        if not rows:
+            return
+        with self._lock:
+            with self._db:
+                self._flush_touched()
+                keys = [r[0] for r in rows]
+                replaced = 0
+                for i in range(0, len(keys), 500):
+                    part = keys[i:i + 500]
+                    q = "SELECT COALESCE(SUM(size), 0) FROM entries WHERE key IN (%s)" % ",".join("?" * len(part))
+                    replaced += int(self._db.execute(q, part).fetchone()[0])
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries(key, kind, value, size, used) VALUES (?, ?, ?, ?, ?)", rows
+                )
+            self._total += sum(r[3] for r in rows) - replaced
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def put(self, key: str, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def _sum_sizes(self) -> int:
+        return int(self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0])
+
+    def _flush_touched(self) -> None:
+        """Write buffered hit times (caller holds the lock and a transaction)."""
+        if self._touched:
+            self._db.executemany("UPDATE entries SET used=? WHERE key=?", [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        # the running total may miss other processes' writes; re-sum before deleting anything
+        total = self._total = self._sum_sizes()
+        if total <= self.max_bytes:
+            return
+        # drop least recently used entries down to 90% of the cap
+        target = int(0.9 * self.max_bytes)
+        doomed: List[str] = []
+        for k, size in self._db.execute("SELECT key, size FROM entries ORDER BY used ASC"):
+            if total <= target:
+                break
+            doomed.append(k)
+            total -= int(size)
+        with self._db:
+            self._db.executemany("DELETE FROM entries WHERE key=?", [(k,) for k in doomed])
+        self._total = total
+        self.evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries")
+            self._touched.clear()
+            self._total = 0
+
+    def flush(self) -> None:
+        """Write buffered LRU timestamps now (``put`` and ``close`` also do)."""
+        with self._lock, self._db:
+            self._flush_touched()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            n, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": int(n), "bytes": int(size), "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                with self._db:
+                    self._flush_touched()
+            except sqlite3.ProgrammingError:  # already closed
+                return
+            self._db.close()
+
+
+_DEFAULT: Dict[str, EvalCache] = {}
+
+
+def default_cache() -> Optional[EvalCache]:
+    """Process-wide cache at $REACTOR_EVAL_CACHE, or None when the variable is unset."""
+    path = os.environ.get(ENV_PATH)
+    if not path:
+        return None
+    cache = _DEFAULT.get(path)
+    if cache is None:
+        cache = EvalCache(path, max_bytes=int(os.environ.get(ENV_MAX_BYTES, DEFAULT_MAX_BYTES)))
+        _DEFAULT[path] = cache
+        atexit.register(cache.close)  # writes buffered hit times
+    return cache
+
+
+def persistent(
+    name: str,
+    cache: Optional[EvalCache] = None,
+    key: Optional[Callable[..., Any]] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator caching a scalar estimator's JSON-serializable result on disk.
+
+    ``name`` must identify the function's semantics (it is part of the key);
+    ``key`` may drop arguments the function ignores, as in ``reactor.memo.memoize``.
+    Without an explicit ``cache`` the one from ``default_cache()`` is used per call.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            store = cache if cache is not None else default_cache()
+            if store is None:
+                return fn(*args, **kwargs)
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                k = store.key(name, key(**bound.arguments) if key is not None else tuple(bound.arguments.items()))
+            except _Unfreezable:
+                return fn(*args, **kwargs)
+            hit = store.get_many([k])
+            if k in hit:
+                return hit[k]
+            value = fn(*args, **kwargs)
+            store.put(k, value)
+            return value
+
+        wrapper.__wrapped__ = fn  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorate
+
+
+def columns_key(cache: EvalCache, name: str, cols: Dict[str, Any], params: Any = None) -> str:
+    h = hashlib.sha256()
+    h.update(repr(freeze(params)).encode("utf-8"))
+    for k in sorted(cols):
+        arr = np.ascontiguousarray(cols[k])
+        h.update(f"{k}|{arr.dtype.str}|{arr.shape}|".encode("utf-8"))
+        h.update(arr.tobytes())
+    return cache.key(name, h.digest())
+
+
+def cached_eval(
+    name: str,
+    evaluate: Callable[[Dict[str, np.ndarray]], Dict[str, Any]],
+    cache: Optional[EvalCache] = None,
+    params: Any = None,
+) -> Callable[[Dict[str, np.ndarray]], Dict[str, Any]]:
+    """Wrap a columnar evaluator (see ``reactor.sweep``) so whole chunks are cached by input content."""
+
+    @functools.wraps(evaluate)
+    def wrapper(cols: Dict[str, np.ndarray]) -> Dict[str, Any]:
+        store = cache if cache is not None else default_cache()
+        if store is None:
+            return evaluate(cols)
+        k = columns_key(store, name, cols, params)
+        hit = store.get_many([k])
+        if k in hit:
+            return hit[k]
+        out = {c: np.asarray(v) for c, v in evaluate(cols).items()}
+        store.put(k, out)
+        return out
+
+    return wrapper
@@ -0,0 +1,169 @@
+"""Streaming top-k and Pareto frontier extraction over sweep chunks.
+
+Both accumulators consume columnar chunks (``reactor.sweep`` style dicts of
+equal-length arrays) or row dicts and keep only their current frontier, so
+memory is bounded by k (or the frontier size) plus one chunk regardless of
+sweep size. Use ``tap`` to feed them while streaming chunks to a writer.
+
+Example::
+
+    top, front = TopK(20, "fom"), ParetoFront({"fom": "max", "E_total": "min"})
+    write_columns(tap(iter_sweep(axes, ev), top, front), csv_path="sweep.csv")
+    top.rows(), front.rows()
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .sweep import Columns, concat_chunks, iter_rows
+
+
+def _rows_to_columns(rows: Iterable[Mapping[str, Any]]) -> Columns:
+    rows = list(rows)
+    if not rows:
+        return {}
+    return {k: np.asarray([r.get(k) for r in rows]) for k in rows[0]}
+
+
+def _take(cols: Columns, idx: np.ndarray) -> Columns:
+    return {k: np.asarray(v)[idx] for k, v in cols.items()}
+
+
+class _Accumulator(ABC):
+    def __init__(self) -> None:
+        self._cols: Columns = {}
+        self._seen = 0
+
+    def update(self, chunk: Columns) -> None:
+        n = len(next(iter(chunk.values()))) if chunk else 0
+        if n == 0:
+            return
+        chunk = dict(chunk)
+        chunk["__index__"] = np.arange(self._seen, self._seen + n, dtype=np.int64)
+        self._seen += n
+        self._cols = self._reduce(concat_chunks([self._cols, chunk]) if self._cols else chunk)
+
+    def update_rows(self, rows: Iterable[Mapping[str, Any]], batch: int = 4096) -> None:
+        buf: List[Mapping[str, Any]] = []
+        for r in rows:
+            buf.append(r)
+            if len(buf) >= batch:
+                self.update(_rows_to_columns(buf))
+                buf = []
+        if buf:
+            self.update(_rows_to_columns(buf))
+
+    @abstractmethod
+    def _reduce(self, cols: Columns) -> Columns:
+        """Keep the frontier rows of ``cols`` (the stored frontier plus one new chunk)."""
+
+    def columns(self) -> Columns:
+        """Frontier columns; ``__index__`` holds each row's position in the stream."""
+        return dict(self._cols)
+
+    def rows(self, fieldnames: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        names = list(fieldnames or [k for k in self._cols if k != "__index__"])
+        return list(iter_rows(self._cols, names)) if self._cols else []
+
+    @property
+    def n_seen(self) -> int:
+        return self._seen
+
+    def __len__(self) -> int:
+        return int(len(self._cols["__index__"])) if self._cols else 0
+
+
+class TopK(_Accumulator):
+    """The k rows with the largest (or smallest) ``key``; ties keep stream order, like a stable sort."""
+
+    def __init__(self, k: int, key: str = "fom", largest: bool = True) -> None:
+        super().__init__()
+        self.k = max(0, int(k))
+        self.key = key
+        self.largest = bool(largest)
+
+    def _reduce(self, cols: Columns) -> Columns:
+        v = np.asarray(cols[self.key], dtype=float)
+        v = np.where(np.isnan(v), -np.inf if self.largest else np.inf, v)
+        s = -v if self.largest else v
+        if len(s) > self.k:
+            # partition first so each chunk costs O(n); only the survivors get sorted
+            keep = np.argpartition(s, self.k - 1)[: self.k] if self.k else np.empty(0, dtype=np.int64)
+            cut = s[keep].max() if self.k else -np.inf
+            keep = np.union1d(keep, np.flatnonzero(s == cut))  # all ties at the cut, resolved below
+        else:
+            keep = np.arange(len(s))
+        order = keep[np.lexsort((cols["__index__"][keep], s[keep]))][: self.k]
+        return _take(cols, order)
+
+
+def nondominated(F: np.ndarray) -> np.ndarray:
+    """Boolean mask of rows of ``F`` (all objectives maximized) not dominated by any other row.
+
+    Rows are visited in descending lexicographic order, so a row can only be
+    dominated by rows already on the front; each check is one vectorized
+    comparison against the current front. Duplicate rows are all kept.
+    """
+    F = np.asarray(F, dtype=float)
+    n = len(F)
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+    order = np.lexsort(tuple(-F[:, j] for j in range(F.shape[1] - 1, -1, -1)))
+    front = np.empty_like(F)
+    m = 0
+    for i in order:
+        f = F[i]
+        if m:
+            P = front[:m]
+            if np.any(np.all(P >= f, axis=1) & np.any(P > f, axis=1)):
+                continue
+        front[m] = f
+        m += 1
+        mask[i] = True
+    return mask
+
+
+class ParetoFront(_Accumulator):
+    """Non-dominated rows for ``objectives`` mapping column name -> "max" or "min"."""
+
+    def __init__(self, objectives: Mapping[str, str]) -> None:
+        super().__init__()
+        bad = {k: v for k, v in objectives.items() if v not in ("max", "min")}
+        if not objectives or bad:
+            raise ValueError(f"objectives must map columns to 'max' or 'min', got {dict(objectives)!r}")
+        self.objectives = dict(objectives)
+
+    def _matrix(self, cols: Columns) -> np.ndarray:
+        F = np.stack([np.asarray(cols[k], dtype=float) * (1.0 if d == "max" else -1.0)
+                      for k, d in self.objectives.items()], axis=1)
+        return np.where(np.isnan(F), -np.inf, F)
+
+    def _reduce(self, cols: Columns) -> Columns:
+        F = self._matrix(cols)
+        # cheap pre-filter: drop rows dominated by the current front before the full sort
+        if self._cols:
+            P = self._matrix(self._cols)
+            n_old = len(P)
+            alive = np.ones(len(F), dtype=bool)
+            for s in range(n_old, len(F), 4096):
+                blk = F[s:s + 4096]
+                dom = (np.all(P[None, :, :] >= blk[:, None, :], axis=2)
+                       & np.any(P[None, :, :] > blk[:, None, :], axis=2)).any(axis=1)
+                alive[s:s + 4096] = ~dom
+            cols, F = _take(cols, np.flatnonzero(alive)), F[alive]
+        keep = np.flatnonzero(nondominated(F))
+        keep = keep[np.argsort(cols["__index__"][keep], kind="stable")]
+        return _take(cols, keep)
+
+
+def tap(chunks: Iterable[Columns], *accumulators: _Accumulator) -> Iterator[Columns]:
+    """Pass chunks through unchanged while feeding each accumulator."""
+    for ch in chunks:
+        for acc in accumulators:
+            acc.update(ch)
+        yield ch
@@ -0,0 +1,266 @@
+"""Declarative feasibility gates evaluated over many runs at once.
+
+A gate reads one or more columns of a run table (``reactor.sweep`` style
+dict of equal-length arrays, one row per run) and returns a pass mask. A
+whole gate set is evaluated in one vectorized pass per gate, so gating
+thousands of scenario runs costs a handful of array comparisons instead of
+one process per run.
+
+Missing data: a gate whose columns are absent, or NaN for a run, is *not
+evaluated* for that run. ``required`` gates then fail, optional ones are
+skipped. Gates with ``enforce=False`` still report reasons but do not affect
+``ok`` (soft warnings).
+
+Example::
+
+    res = evaluate_gates(run_columns(reports), report_gates(gamma_min=140.0, require_yield=True))
+    res.ok            # (n_runs,) bool
+    res.reasons()     # per run: ["gamma_max<140.0", ...]
+
+One report can also be gated with ``evaluate_report``, which applies the
+same gates to plain floats; NumPy is imported only by the columnar paths,
+so ``reactor gate`` stays NumPy-free.
+"""
+
+from __future__ import annotations
+
+import math
+import operator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .thresholds import Thresholds
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Columns = Dict[str, "np.ndarray"]
+GateFn = Callable[[Columns], "np.ndarray"]
+
+# operator.* compare arrays elementwise and floats as floats, so compare gates work on either
+_OPS: Dict[str, Tuple[Callable[[Any, float], Any], str]] = {
+    ">=": (operator.ge, "<"),
+    "<=": (operator.le, ">"),
+    ">": (operator.gt, "<="),
+    "<": (operator.lt, ">="),
+}
+
+
+@dataclass(frozen=True)
+class Gate:
+    name: str
+    columns: Tuple[str, ...]
+    test: GateFn
+    reason: str
+    required: bool = True
+    enforce: bool = True
+
+
+def compare_gate(
+    name: str,
+    column: str,
+    op: str,
+    value: float,
+    reason: Optional[str] = None,
+    required: bool = True,
+    enforce: bool = True,
+) -> Gate:
+    """Gate ``column <op> value``; the default reason is the violated comparison, e.g. ``fom<0.1``."""
+    if op not in _OPS:
+        raise ValueError(f"unknown gate operator {op!r}; expected one of {sorted(_OPS)}")
+    fn, neg = _OPS[op]
+    v = float(value)
+    return Gate(name, (column,), lambda c: fn(c[column], v), reason or f"{column}{neg}{value}", required, enforce)
+
+
+def feasibility_gates(th: Optional[Thresholds] = None, yield_min: float = 1e8) -> Tuple[Gate, ...]:
+    """Gates on run-level series summaries (see ``reactor.series.SeriesGates.summary``).
+
+    Γ duration, B mean and ripple, and density are required; yield, FOM and
+    the Bennett check are applied to runs that carry those columns.
+    """
+    th = th or Thresholds()
+    dur = float(th.gamma_duration_s)
+
+    def gamma_run(c: Columns) -> np.ndarray:
+        import numpy as np
+
+        needed = np.ceil(dur / np.maximum(c["dt"], 1e-12))
+        return c["gamma_longest_run"] >= needed
+
+    def bennett(c: Columns) -> np.ndarray:
+        from .analysis_confinement import bennett_confinement_check_vec
+
+        return bennett_confinement_check_vec(c["bennett_n0"], c["bennett_xi"], c["bennett_B"], c["bennett_ripple"])
+
+    return (
+        Gate("gamma_ok", ("gamma_longest_run", "dt"), gamma_run, f"gamma>={th.gamma_min} for <{dur}s"),
+        compare_gate("b_mean_ok", "b_mean_T", ">=", th.b_field_min_T),
+        compare_gate("b_ripple_ok", "b_rms_fraction", "<=", th.b_ripple_max_pct),
+        compare_gate("dens_ok", "ne_max_cm3", ">=", th.density_min_cm3),
+        compare_gate("yield_ok", "antiproton_yield_value", ">=", yield_min, required=False),
+        compare_gate("fom_ok", "fom", ">=", th.fom_min, required=False),
+        Gate("bennett_ok", ("bennett_n0", "bennett_xi", "bennett_B", "bennett_ripple"), bennett, "bennett_check_failed",
+             required=False),
+    )
+
+
+def report_gates(
+    gamma_min: Optional[float] = None,
+    require_yield: bool = False,
+    require_stable: bool = True,
+    fom_min: Optional[float] = None,
+) -> Tuple[Gate, ...]:
+    """Gates on feasibility report fields (see ``run_columns``), as applied by the metrics gate.
+
+    ``gamma_min``/``fom_min`` add the Γ-max and FOM gates (skipped for reports
+    without those fields). With ``require_stable=False`` an unstable report
+    only adds an "unstable" reason.
+    """
+    gates = [compare_gate("stable", "stable", ">=", 1.0, reason="unstable", enforce=require_stable)]
+    if gamma_min is not None:
+        gates.append(compare_gate("gamma_max", "gamma_max", ">=", gamma_min, reason=f"gamma_max<{gamma_min}",
+                                  required=False))
+    if require_yield:
+        gates.append(compare_gate("yield", "antiproton_yield_pass", ">=", 1.0, reason="yield_gate_fail"))
+    if fom_min is not None:
+        gates.append(compare_gate("fom", "fom", ">=", fom_min, required=False))
+    return tuple(gates)
+
+
+@dataclass
+class GateResult:
+    names: List[str]
+    passed: np.ndarray  # (n_runs, n_gates) gate passed (False where not evaluated)
+    evaluated: np.ndarray  # (n_runs, n_gates) gate columns present and finite
+    failed: np.ndarray  # (n_runs, n_gates) counts as a failure (evaluated and not passed, or required and missing)
+    ok: np.ndarray  # (n_runs,) no enforced gate failed
+    gates: Tuple[Gate, ...]
+
+    def __len__(self) -> int:
+        return int(self.ok.size)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.passed[:, self.names.index(name)]
+
+    def reasons(self) -> List[List[str]]:
+        """Per run, the reasons of every failed gate (soft ones included), in gate order."""
+        text = [g.reason for g in self.gates]
+        return [[t for t, f in zip(text, row.tolist(), strict=True) if f] for row in self.failed]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "n_runs": len(self),
+            "n_ok": int(self.ok.sum()),
+            "failures": {n: int(c) for n, c in zip(self.names, self.failed.sum(axis=0).tolist(), strict=True)},
+        }
+
+    def rows(self) -> List[Dict[str, Any]]:
+        out = []
+        for i, reasons in enumerate(self.reasons()):
+            row: Dict[str, Any] = {"ok": bool(self.ok[i])}
+            row.update({n: (bool(self.passed[i, j]) if self.evaluated[i, j] else None)
+                        for j, n in enumerate(self.names)})
+            row["reasons"] = reasons
+            out.append(row)
+        return out
+
+
+def evaluate_gates(cols: Mapping[str, Any], gates: Optional[Sequence[Gate]] = None) -> GateResult:
+    """Evaluate ``gates`` (default ``feasibility_gates()``) for every row of ``cols``."""
+    import numpy as np
+
+    gates = tuple(feasibility_gates() if gates is None else gates)
+    arrays = {k: np.asarray(v) for k, v in cols.items()}
+    n = max((int(a.size) for a in arrays.values() if a.ndim), default=1) if arrays else 0
+    fcols: Columns = {}
+    for c in {c for g in gates for c in g.columns if c in arrays}:
+        a = arrays[c]
+        fcols[c] = np.broadcast_to(_object_floats(a) if a.dtype == object else a.astype(float), (n,))
+    passed = np.zeros((n, len(gates)), dtype=bool)
+    evaluated = np.zeros((n, len(gates)), dtype=bool)
+    for j, g in enumerate(gates):
+        if not all(c in fcols for c in g.columns):
+            continue
+        have = np.logical_and.reduce([~np.isnan(fcols[c]) for c in g.columns])
+        evaluated[:, j] = have
+        if have.any():
+            with np.errstate(invalid="ignore"):
+                passed[:, j] = np.asarray(g.test(fcols), dtype=bool) & have
+    required = np.array([g.required for g in gates], dtype=bool)
+    enforce = np.array([g.enforce for g in gates], dtype=bool)
+    failed = (evaluated & ~passed) | (~evaluated & required)
+    ok = ~(failed & enforce).any(axis=1)
+    return GateResult([g.name for g in gates], passed, evaluated, failed, ok, gates)
+
+
+def evaluate_report(rep: Mapping[str, Any], gates: Sequence[Gate]) -> Tuple[bool, List[str]]:
+    """``(ok, reasons)`` for one feasibility report, as ``evaluate_gates(run_columns([rep]), gates)``.
+
+    Gate tests see plain floats, so this needs no NumPy for compare gates
+    (``report_gates``); the same missing-data and ``enforce`` rules apply.
+    """
+    vals = report_values(rep)
+    ok, reasons = True, []
+    for g in gates:
+        have = all(c in vals and not math.isnan(vals[c]) for c in g.columns)
+        passed = have and bool(g.test(vals))
+        if (have and not passed) or (not have and g.required):
+            reasons.append(g.reason)
+            ok = ok and not g.enforce
+    return ok, reasons
+
+
+def _object_floats(a: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    return np.array([np.nan if v is None else float(v) for v in a.ravel()], dtype=float).reshape(a.shape)
+
+
+# report field -> column, for the nested feasibility report layout
+_REPORT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "stable": ("stable",),
+    "gamma_max": ("gamma_stats", "gamma_max"),
+    "antiproton_yield_pass": ("antiproton_yield_pass",),
+    "antiproton_yield_value": ("antiproton_yield_value",),
+    "fom": ("fom",),
+    "fom_details": ("fom_details", "fom"),
+    "b_mean_T": ("b_stats", "b_mean_T"),
+    "b_rms_fraction": ("b_stats", "b_rms_fraction"),
+    "ne_max_cm3": ("density_stats", "ne_max_cm3"),
+}
+_REPORT_BOOLS = ("stable", "antiproton_yield_pass")
+
+
+def report_values(rep: Mapping[str, Any]) -> Dict[str, float]:
+    """One feasibility report as the floats of its ``run_columns`` row.
+
+    Missing numbers become NaN (gate not evaluated); missing booleans are
+    False, matching ``rep.get(flag, False)``. ``fom`` falls back to
+    ``fom_details.fom``.
+    """
+    out: Dict[str, float] = {}
+    for col, path in _REPORT_FIELDS.items():
+        v: Any = rep
+        for key in path:
+            v = v.get(key) if isinstance(v, Mapping) else None
+        if col in _REPORT_BOOLS:
+            out[col] = float(bool(v))
+        else:
+            out[col] = math.nan if v is None else float(v)
+    # a present gamma_stats block without gamma_max reads as 0.0, like rep["gamma_stats"].get("gamma_max", 0.0)
+    if rep.get("gamma_stats") and math.isnan(out["gamma_max"]):
+        out["gamma_max"] = 0.0
+    details = out.pop("fom_details")
+    if math.isnan(out["fom"]):
+        out["fom"] = details
+    return out
+
+
+def run_columns(reports: Iterable[Mapping[str, Any]]) -> Columns:
+    """Stack feasibility report dicts (``report_values`` rows) into run columns for ``report_gates``."""
+    import numpy as np
+
+    rows = [report_values(rep) for rep in reports]
+    names = [c for c in _REPORT_FIELDS if c != "fom_details"]
+    return {c: np.array([r[c] for r in rows], dtype=float) for c in names}
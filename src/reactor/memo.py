@@ -0,0 +1,117 @@
+"""Opt-in memoization for pure scalar estimators evaluated inside sweep grids.
+
+Cartesian-product sweeps re-evaluate estimators such as
+``antiproton_yield_estimator(n_e, T_e, {"model": "physics"})`` for identical
+arguments across inner dimensions they do not depend on. ``memoize`` wraps
+such a function with a bounded LRU keyed on normalized arguments: positional
+and keyword forms bind to the same key, numbers compare as floats and dicts
+are frozen into sorted tuples. Calls whose arguments cannot be frozen (e.g.
+arrays) pass straight through and are counted as bypassed.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from numbers import Number
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Unfreezable(Exception):
+    pass
+
+
+def freeze(value: Any) -> Hashable:
+    """Normalize a value into a hashable key component."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, Number):
+        try:
+            return float(value)  # type: ignore[arg-type]
+        except Exception as e:
+            raise _Unfreezable(str(e)) from e
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    if getattr(value, "ndim", None) == 0 and hasattr(value, "item"):
+        return freeze(value.item())
+    try:
+        hash(value)
+    except TypeError as e:
+        raise _Unfreezable(str(e)) from e
+    return value
+
+
+def memoize(
+    func: Optional[Callable[..., Any]] = None,
+    *,
+    maxsize: int = 4096,
+    key: Optional[Callable[..., Hashable]] = None,
+) -> Any:
+    """Bounded-LRU memoization decorator with ``cache_info()``/``cache_clear()``.
+
+    Usable as ``@memoize`` or ``memoize(maxsize=..., key=...)(fn)``. ``key``
+    receives the bound arguments (defaults applied) as keyword arguments and
+    may drop inputs the function provably ignores; its result is frozen.
+    """
+
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        sig = inspect.signature(fn)
+        cache: OrderedDict[Hashable, Any] = OrderedDict()
+        lock = threading.Lock()
+        stats = {"hits": 0, "misses": 0, "bypassed": 0}
+        limit = max(0, int(maxsize))
+
+        def make_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if key is not None:
+                return freeze(key(**bound.arguments))
+            return freeze(tuple(bound.arguments.items()))
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                k = make_key(args, kwargs)
+            except _Unfreezable:
+                with lock:
+                    stats["bypassed"] += 1
+                return fn(*args, **kwargs)
+            with lock:
+                if k in cache:
+                    stats["hits"] += 1
+                    cache.move_to_end(k)
+                    return cache[k]
+                stats["misses"] += 1
+            value = fn(*args, **kwargs)
+            if limit:
+                with lock:
+                    cache[k] = value
+                    cache.move_to_end(k)
+                    while len(cache) > limit:
+                        cache.popitem(last=False)
+            return value
+
+        def cache_info() -> Dict[str, int]:
+            with lock:
+                return {**stats, "maxsize": limit, "currsize": len(cache)}
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+                for name in stats:
+                    stats[name] = 0
+
+        wrapper.cache_info = cache_info  # type: ignore[attr-defined]
+        wrapper.cache_clear = cache_clear  # type: ignore[attr-defined]
+        wrapper.__wrapped__ = fn  # type: ignore[attr-defined]
+        return wrapper
+
+    if func is not None:
+        return decorate(func)
+    return decorate
@@ -5,11 +5,29 @@ from typing import Any, Dict, Optional, Tuple
 
 import numpy as np
 
+from .evalcache import persistent
+from .memo import memoize
+from .workspace import central_diff_into, get_workspace
 
-def _grad(field: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+
+def _grad(
+    field: np.ndarray,
+    out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Periodic central-difference gradient (d/dx along axis 1, d/dy along axis 0).
+
+    Pass ``out`` to write into preallocated buffers instead of allocating.
+    """
     f = np.asarray(field, dtype=float)
-    dfx = 0.5 * (np.roll(f, -1, axis=1) - np.roll(f, 1, axis=1))
-    dfy = 0.5 * (np.roll(f, -1, axis=0) - np.roll(f, 1, axis=0))
+    if f.ndim < 2:
+        dfx = 0.5 * (np.roll(f, -1, axis=1) - np.roll(f, 1, axis=1))
+        dfy = 0.5 * (np.roll(f, -1, axis=0) - np.roll(f, 1, axis=0))
+        return dfx, dfy
+    dfx, dfy = out if out is not None else (np.empty_like(f), np.empty_like(f))
+    central_diff_into(f, 1, dfx)
+    dfx *= 0.5
+    central_diff_into(f, 0, dfy)
+    dfy *= 0.5
     return dfx, dfy
 
 
@@ -24,8 +42,14 @@ def compute_gamma(rho: np.ndarray, p: np.ndarray, eps: float = 1e-12) -> np.ndar
     rho_arr = np.asarray(rho, dtype=float)
     if (rho_arr < 0).any():
         raise ValueError("rho must be non-negative")
-    drx, dry = _grad(rho_arr)
-    dpx, dpy = _grad(p)
+    p_arr = np.asarray(p, dtype=float)
+    if rho_arr.ndim >= 2 and p_arr.shape == rho_arr.shape:
+        ws = get_workspace(rho_arr.shape, float, "periodic")
+        drx, dry = _grad(rho_arr, out=(ws.scratch("g0"), ws.scratch("g1")))
+        dpx, dpy = _grad(p_arr, out=(ws.scratch("g2"), ws.scratch("g3")))
+    else:
+        drx, dry = _grad(rho_arr)
+        dpx, dpy = _grad(p_arr)
     cross = dpx * dry - dpy * drx
     denom = np.maximum(eps, rho_arr ** 2)
     return np.abs(cross) / denom
@@ -67,6 +91,13 @@ def confinement_efficiency_estimator(xi: float, b_field_ripple_pct: float) -> fl
     return float(np.clip(base - ripple_pen - xi_pen, 0.0, 1.0))
 
 
+def confinement_efficiency_vec(xi: np.ndarray, b_field_ripple_pct: np.ndarray) -> np.ndarray:
+    """Array form of ``confinement_efficiency_estimator``."""
+    ripple_pen = 2.0 * np.maximum(0.0, np.asarray(b_field_ripple_pct, dtype=float))
+    xi_pen = 0.01 * np.tanh(np.abs(np.asarray(xi, dtype=float)) / 5.0)
+    return np.clip(0.96 - ripple_pen - xi_pen, 0.0, 1.0)
+
+
 def antiproton_yield_estimator(
     n_cm3: float,
     Te_eV: float,
@@ -110,6 +141,48 @@ def antiproton_yield_estimator(
     return max(0.0, k0 * n * (T ** alpha))
 
 
+def antiproton_yield_vec(
+    n_cm3: np.ndarray,
+    Te_eV: np.ndarray,
+    params: Optional[Dict[str, Any]] = None,
+) -> np.ndarray:
+    """Array form of ``antiproton_yield_estimator`` (same models, elementwise).
+
+    Results agree with the scalar form to within an ulp (Python's ``**`` goes
+    through libm ``pow``, which rounds differently from NumPy's power).
+    """
+    p = params or {}
+    model = str(p.get("model", "legacy"))
+    n = np.maximum(0.0, np.asarray(n_cm3, dtype=float))
+    T = np.maximum(1e-12, np.asarray(Te_eV, dtype=float))
+    if model == "physics":
+        sigma_pp = float(p.get("sigma_pp", 1e-28))
+        v_rel = float(p.get("v_rel", 0.1 * 3.0e10))
+        return np.broadcast_to(sigma_pp * (n ** 2) * v_rel, np.broadcast(n, T).shape).copy()
+    k0 = float(p.get("k0", p.get("sigma0", 1e-12)))
+    alpha = float(p.get("alpha_T", 0.25))
+    if model == "threshold":
+        excess = np.maximum(0.0, T - float(p.get("E_th", 0.0)))
+        return np.maximum(0.0, k0 * n * (excess ** alpha))
+    return np.maximum(0.0, k0 * n * (T ** alpha))
+
+
+def _yield_memo_key(n_cm3: float, Te_eV: float, params: Optional[Dict[str, Any]]) -> Any:
+    # The physics model ignores Te, so sweeps over T share one cache entry per density.
+    p = params or {}
+    if str(p.get("model", "legacy")) == "physics":
+        return (n_cm3, None, p)
+    return (n_cm3, Te_eV, p)
+
+
+# Opt-in memoized variant for sweep grids; see reactor.memo.
+antiproton_yield_cached = memoize(maxsize=65536, key=_yield_memo_key)(antiproton_yield_estimator)
+# Shared on-disk variant; active only when $REACTOR_EVAL_CACHE is set (see reactor.evalcache).
+antiproton_yield_persistent = persistent("metrics.antiproton_yield_estimator", key=_yield_memo_key)(
+    antiproton_yield_estimator
+)
+
+
 def pulsed_yield_enhancement(yield_base: float, I_beam: float = 1e6, tau_pulse: float = 1e-9) -> float:
     """Apply a pulsed-beam enhancement to a base yield.
 
@@ -134,6 +207,12 @@ def total_fom(yield_rate: float, E_total_J: float) -> float:
     return float(yield_rate) / (Ej * 1e8)
 
 
+def total_fom_vec(yield_rate: np.ndarray, E_total_J: np.ndarray) -> np.ndarray:
+    """Array form of ``total_fom``."""
+    Ej = np.maximum(1e-30, np.asarray(E_total_J, dtype=float))
+    return np.asarray(yield_rate, dtype=float) / (Ej * 1e8)
+
+
 def log_yield(n_e_cm3: float, Te_eV: float, path: str = "progress.ndjson") -> None:
     """Compute and append a yield_calculated event to NDJSON log."""
     from .logging_utils import append_event
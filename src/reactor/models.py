@@ -4,6 +4,8 @@ from typing import Dict, Optional
 
 import numpy as np
 
+from .workspace import central_diff_into, get_workspace, jacobi_multiplier, roll_into
+
 
 def bennett_profile(n0: float, xi: float, r: np.ndarray) -> np.ndarray:
     """n(r) = n0 * (1 + xi^2 * r^2)^(-2)."""
@@ -13,13 +15,50 @@ def bennett_profile(n0: float, xi: float, r: np.ndarray) -> np.ndarray:
 
 def vorticity_evolution(omega: np.ndarray, psi: np.ndarray, nu: float, dt: float,
                         forcing: Optional[np.ndarray]) -> np.ndarray:
-    """Small stable update: dt*rhs with u = perp(grad psi)."""
+    """Small stable update: dt*rhs with u = perp(grad psi).
+
+    Periodic stencils are evaluated into cached per-shape scratch buffers
+    (see ``reactor.workspace``); only the returned field is allocated.
+    """
     w = np.asarray(omega, dtype=float)
+    psi = np.asarray(psi, dtype=float)
+    if w.ndim < 2 or psi.shape != w.shape:
+        return _vorticity_evolution_roll(w, psi, nu, dt, forcing)
+    ws = get_workspace(w.shape, float, "periodic")
+    ux, uy, tmp = ws.scratch("v0"), ws.scratch("v1"), ws.scratch("v2")
     # velocity from streamfunction: u = (d_y psi, -d_x psi)
+    central_diff_into(psi, 0, ux)
+    ux *= 0.5
+    central_diff_into(psi, 1, uy)
+    uy *= -0.5
+    # advection u . grad(omega), accumulated in ux
+    central_diff_into(w, 1, tmp)
+    tmp *= 0.5
+    ux *= tmp
+    central_diff_into(w, 0, tmp)
+    tmp *= 0.5
+    uy *= tmp
+    ux += uy
+    # 5-point Laplacian, accumulated in uy
+    lap = roll_into(w, 1, 0, uy)
+    lap += roll_into(w, -1, 0, tmp)
+    lap += roll_into(w, 1, 1, tmp)
+    lap += roll_into(w, -1, 1, tmp)
+    lap -= np.multiply(w, 4.0, out=tmp)
+    # rhs = -adv + nu * lap
+    rhs = np.negative(ux, out=ux)
+    lap *= nu
+    rhs += lap
+    if forcing is not None:
+        rhs = rhs + forcing
+    return w + dt * rhs
+
+
+def _vorticity_evolution_roll(w: np.ndarray, psi: np.ndarray, nu: float, dt: float,
+                              forcing: Optional[np.ndarray]) -> np.ndarray:
     dpsi_dx = np.roll(psi, -1, axis=1) - np.roll(psi, 1, axis=1)
     dpsi_dy = np.roll(psi, -1, axis=0) - np.roll(psi, 1, axis=0)
     ux, uy = dpsi_dy * 0.5, -dpsi_dx * 0.5
-    # gradients of omega
     dw_dx = np.roll(w, -1, axis=1) - np.roll(w, 1, axis=1)
     dw_dy = np.roll(w, -1, axis=0) - np.roll(w, 1, axis=0)
     adv = ux * (0.5 * dw_dx) + uy * (0.5 * dw_dy)
@@ -31,7 +70,26 @@ def vorticity_evolution(omega: np.ndarray, psi: np.ndarray, nu: float, dt: float
 
 
 def drift_poisson_step(omega: np.ndarray, max_iter: int = 20) -> np.ndarray:
-    """Solve -Laplace(psi) = omega with Jacobi iterations. Returns psi."""
+    """Solve -Laplace(psi) = omega with Jacobi iterations. Returns psi.
+
+    On the periodic grid the Jacobi sweeps from psi=0 are linear and
+    diagonal in Fourier space, so the result of ``max_iter`` sweeps is applied
+    in one rfft2 round trip with a multiplier cached per (shape, max_iter).
+    """
+    w = np.asarray(omega)
+    if w.ndim < 2 or np.iscomplexobj(w) or int(max_iter) <= 0:
+        return _drift_poisson_jacobi(w, max_iter)
+    w = w.astype(float, copy=False)
+    ws = get_workspace(w.shape[:2], float, "periodic")
+    mult = jacobi_multiplier(ws, int(max_iter))
+    if w.ndim > 2:
+        mult = mult.reshape(mult.shape + (1,) * (w.ndim - 2))
+    spec = np.fft.rfft2(w, axes=(0, 1))
+    spec *= mult
+    return np.fft.irfft2(spec, s=w.shape[:2], axes=(0, 1))
+
+
+def _drift_poisson_jacobi(omega: np.ndarray, max_iter: int) -> np.ndarray:
     psi = np.zeros_like(omega, dtype=float)
     for _ in range(max_iter):
         psi = 0.25 * (
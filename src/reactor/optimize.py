@@ -0,0 +1,325 @@
+"""Gradient-free maximization of sweep objectives under Thresholds constraints.
+
+Problems are stated the way the sweep/UQ engines state them: named parameter
+bounds (optionally log-scaled) and a columnar ``fn(cols) -> {outputs}`` that
+evaluates a whole candidate population at once with the vectorized
+estimators. Constraints map a column (input or output) to ``(">=" | "<=", value)``;
+``threshold_constraints`` derives them from ``Thresholds`` for the columns a
+problem actually has. Candidates are ranked feasible-first, then by objective,
+and infeasible ones by their relative constraint violation.
+
+Methods: ``"cmaes"`` (population-based, one batch per generation),
+``"nelder-mead"`` (bounded simplex) and ``"bo"`` (GP + expected improvement,
+using ``reactor.surrogate.GaussianProcess``).
+
+Example::
+
+    res = maximize(fn, {"n_e": (1e19, 1e21), "T_e": (5, 50)}, objective="fom",
+                   constraints=threshold_constraints(Thresholds(), ["n_e", "fom"]),
+                   log_params=["n_e"], budget=300)
+    res.best, res.n_evals
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .thresholds import Thresholds
+
+Columns = Dict[str, np.ndarray]
+ObjectiveFn = Callable[[Columns], Dict[str, Any]]
+Constraints = Dict[str, Tuple[str, float]]
+
+METHODS = ("cmaes", "nelder-mead", "bo")
+
+# column name -> (op, Thresholds field) for the conventional sweep column names
+_THRESHOLD_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "n_e": (">=", "density_min_cm3"),
+    "gamma": (">=", "gamma_min"),
+    "eta": (">=", "confinement_min"),
+    "B": (">=", "b_field_min_T"),
+    "ripple": ("<=", "b_ripple_max_pct"),
+    "energy_per_pbar": ("<=", "energy_per_pbar_max_J"),
+    "fom": (">=", "fom_min"),
+}
+
+
+def threshold_constraints(th: Optional[Thresholds] = None, columns: Optional[Iterable[str]] = None) -> Constraints:
+    """Constraints implied by ``th`` for the given column names (all known columns by default)."""
+    th = th or Thresholds()
+    cols = set(_THRESHOLD_COLUMNS) if columns is None else set(columns)
+    return {c: (op, float(getattr(th, name))) for c, (op, name) in _THRESHOLD_COLUMNS.items() if c in cols}
+
+
+@dataclass
+class OptimizeResult:
+    method: str
+    best: Dict[str, Any]
+    best_value: float
+    feasible: bool
+    n_evals: int
+    history: Columns = field(repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "best": self.best,
+            "best_value": self.best_value,
+            "feasible": self.feasible,
+            "n_evals": self.n_evals,
+        }
+
+
+class _Problem:
+    def __init__(
+        self,
+        fn: ObjectiveFn,
+        bounds: Dict[str, Tuple[float, float]],
+        objective: str,
+        constraints: Constraints,
+        log_params: Sequence[str],
+        log_objective: bool,
+        budget: int,
+    ) -> None:
+        self.fn = fn
+        self.names = list(bounds)
+        self.objective = objective
+        self.constraints = dict(constraints)
+        for c, (op, _) in self.constraints.items():
+            if op not in (">=", "<="):
+                raise ValueError(f"constraint on {c!r} must use '>=' or '<=', got {op!r}")
+        self.log_params = set(log_params)
+        self.log_objective = bool(log_objective)
+        self.budget = int(budget)
+        lo, hi = [], []
+        for k in self.names:
+            a, b = (float(v) for v in bounds[k])
+            if k in self.log_params:
+                a, b = np.log10(a), np.log10(b)
+            lo.append(a)
+            hi.append(b)
+        self.lo, self.hi = np.array(lo), np.array(hi)
+        self.parts: List[Columns] = []
+        self.n_evals = 0
+
+    @property
+    def remaining(self) -> int:
+        return self.budget - self.n_evals
+
+    def to_columns(self, U: np.ndarray) -> Columns:
+        X = self.lo + (self.hi - self.lo) * np.clip(U, 0.0, 1.0)
+        return {k: (np.power(10.0, X[:, j]) if k in self.log_params else X[:, j]) for j, k in enumerate(self.names)}
+
+    def evaluate(self, U: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Evaluate unit-cube rows; returns (value, feasible, violation)."""
+        U = np.atleast_2d(U)[: max(0, self.remaining)]
+        cols = self.to_columns(U)
+        out = self.fn(cols)
+        n = len(U)
+        allc = dict(cols)
+        for k, v in out.items():
+            allc[k] = np.broadcast_to(np.asarray(v), (n,)).copy()
+        f = np.asarray(allc[self.objective], dtype=float)
+        value = np.log10(np.maximum(f, 1e-300)) if self.log_objective else f
+        viol = np.zeros(n)
+        for c, (op, thr) in self.constraints.items():
+            if c not in allc:
+                continue
+            v = np.asarray(allc[c], dtype=float)
+            gap = (thr - v) if op == ">=" else (v - thr)
+            viol += np.maximum(0.0, gap) / max(abs(thr), 1e-300)
+        viol = np.where(np.isnan(value), np.inf, viol)
+        feas = viol == 0.0
+        allc["value"], allc["feasible"], allc["violation"] = value, feas, viol
+        self.parts.append(allc)
+        self.n_evals += n
+        return value, feas, viol
+
+    def history(self) -> Columns:
+        if not self.parts:
+            return {}
+        return {k: np.concatenate([p[k] for p in self.parts]) for k in self.parts[0]}
+
+
+def _rank_keys(value: np.ndarray, feas: np.ndarray, viol: np.ndarray) -> np.ndarray:
+    """Indices best-first: feasible by value desc, then infeasible by violation asc."""
+    return np.lexsort((np.where(feas, -value, viol), ~feas))
+
+
+def _scalar(value: np.ndarray, feas: np.ndarray, viol: np.ndarray) -> np.ndarray:
+    """One number per candidate preserving the ranking, for NM/BO (larger is better)."""
+    base = float(np.min(value[feas])) if feas.any() else 0.0
+    return np.where(feas, value, base - 1.0 - np.minimum(viol, 1e6))
+
+
+def _reflect(U: np.ndarray) -> np.ndarray:
+    """Fold unbounded coordinates back into [0, 1] (mirror at the faces)."""
+    return 1.0 - np.abs(1.0 - np.mod(U, 2.0))
+
+
+def _cmaes(p: _Problem, rng: np.random.Generator, popsize: Optional[int], sigma0: float) -> None:
+    d = len(p.names)
+    lam = int(popsize or 4 + int(3 * np.log(d)))
+    mu = lam // 2
+    w = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+    w /= w.sum()
+    mueff = 1.0 / np.sum(w ** 2)
+    cc = (4 + mueff / d) / (d + 4 + 2 * mueff / d)
+    cs = (mueff + 2) / (d + mueff + 5)
+    c1 = 2 / ((d + 1.3) ** 2 + mueff)
+    cmu = min(1 - c1, 2 * (mueff - 2 + 1 / mueff) / ((d + 2) ** 2 + mueff))
+    damps = 1 + 2 * max(0.0, np.sqrt((mueff - 1) / (d + 1)) - 1) + cs
+    chi = np.sqrt(d) * (1 - 1 / (4 * d) + 1 / (21 * d * d))
+    m = rng.random(d)
+    sigma = float(sigma0)
+    C = np.eye(d)
+    pc, ps = np.zeros(d), np.zeros(d)
+    g = 0
+    while p.remaining > 0 and sigma > 1e-12:
+        vals, B = np.linalg.eigh(C)
+        D = np.sqrt(np.maximum(vals, 1e-20))
+        Z = rng.standard_normal((lam, d))
+        Y = Z @ (B * D).T
+        X = m + sigma * Y
+        # the search distribution is unbounded; candidates are mirrored into the box
+        value, feas, viol = p.evaluate(_reflect(X))
+        if len(value) < lam:
+            break
+        order = _rank_keys(value, feas, viol)[:mu]
+        y_w = w @ Y[order]
+        m = m + sigma * y_w
+        C_inv_sqrt = (B / D) @ B.T
+        ps = (1 - cs) * ps + np.sqrt(cs * (2 - cs) * mueff) * (C_inv_sqrt @ y_w)
+        g += 1
+        hsig = np.linalg.norm(ps) / np.sqrt(1 - (1 - cs) ** (2 * g)) / chi < 1.4 + 2 / (d + 1)
+        pc = (1 - cc) * pc + hsig * np.sqrt(cc * (2 - cc) * mueff) * y_w
+        Yo = Y[order]
+        C = ((1 - c1 - cmu) * C + c1 * (np.outer(pc, pc) + (1 - hsig) * cc * (2 - cc) * C)
+             + cmu * (Yo.T * w) @ Yo)
+        C = (C + C.T) / 2
+        sigma *= np.exp((cs / damps) * (np.linalg.norm(ps) / chi - 1))
+
+
+def _nelder_mead(p: _Problem, rng: np.random.Generator, step: float) -> None:
+    d = len(p.names)
+    x0 = 0.25 + 0.5 * rng.random(d)
+    S = np.vstack([x0, np.clip(x0 + float(step) * np.eye(d), 0, 1)])
+    fs = _scalar(*p.evaluate(S))
+    S = S[: len(fs)]
+
+    def f(x: np.ndarray) -> float:
+        r = p.evaluate(np.clip(x, 0, 1)[None, :])
+        return float(_scalar(*r)[0]) if len(r[0]) else -np.inf
+
+    while p.remaining > 0 and len(fs) == d + 1:
+        order = np.argsort(-fs)
+        S, fs = S[order], fs[order]
+        if np.max(np.abs(S - S[0])) < 1e-9:
+            break
+        c = S[:-1].mean(axis=0)
+        xr = c + (c - S[-1])
+        fr = f(xr)
+        if fr > fs[0]:
+            xe = c + 2 * (c - S[-1])
+            fe = f(xe)
+            S[-1], fs[-1] = (xe, fe) if fe > fr else (xr, fr)
+        elif fr > fs[-2]:
+            S[-1], fs[-1] = xr, fr
+        else:
+            xc = c + 0.5 * (S[-1] - c) if fr <= fs[-1] else c + 0.5 * (xr - c)
+            fc = f(xc)
+            if fc > max(fr, fs[-1]):
+                S[-1], fs[-1] = xc, fc
+            else:
+                S[1:] = S[0] + 0.5 * (S[1:] - S[0])
+                res = p.evaluate(np.clip(S[1:], 0, 1))
+                if len(res[0]) < d:
+                    break
+                fs[1:] = _scalar(*res)
+        S = np.clip(S, 0, 1)
+
+
+def _expected_improvement(mu: np.ndarray, sd: np.ndarray, best: float) -> np.ndarray:
+    from math import erf, sqrt
+
+    z = (mu - best) / np.maximum(sd, 1e-12)
+    cdf = 0.5 * (1 + np.vectorize(erf)(z / sqrt(2)))
+    pdf = np.exp(-0.5 * z * z) / np.sqrt(2 * np.pi)
+    return np.where(sd > 1e-12, (mu - best) * cdf + sd * pdf, np.maximum(mu - best, 0.0))
+
+
+def _bayes_opt(p: _Problem, rng: np.random.Generator, n_init: Optional[int], batch: int, seed: int) -> None:
+    from .surrogate import GaussianProcess
+    from .uq import latin_hypercube, sobol_points
+
+    d = len(p.names)
+    n0 = int(n_init or max(2 * d + 2, 8))
+    U = latin_hypercube(n0, d, rng)
+    vals = [p.evaluate(U)]
+    X = [U[: len(vals[0][0])]]
+    unit = {f"x{j}": (0.0, 1.0) for j in range(d)}
+    it = 0
+    gp: Optional[GaussianProcess] = None
+    while p.remaining > 0:
+        Xa = np.concatenate(X)
+        value = np.concatenate([v[0] for v in vals])
+        feas = np.concatenate([v[1] for v in vals])
+        viol = np.concatenate([v[2] for v in vals])
+        s = _scalar(value, feas, viol)
+        # re-tune kernel hyperparameters every few rounds; reuse them in between
+        if gp is None or it % 5 == 0:
+            gp = GaussianProcess(unit).fit(Xa, s)
+        else:
+            gp = GaussianProcess(unit, length_scale=gp.length_scale, noise=gp.noise).fit(Xa, s)
+        cand = sobol_points(2048, d, seed=seed + it)
+        mu, sd = gp.predict(cand, return_std=True)
+        ei = _expected_improvement(mu, sd, float(np.max(s)))
+        q = min(int(batch), p.remaining)
+        pick = cand[np.argsort(-ei)[:q]]
+        res = p.evaluate(pick)
+        vals.append(res)
+        X.append(pick[: len(res[0])])
+        it += 1
+
+
+def maximize(
+    fn: ObjectiveFn,
+    bounds: Dict[str, Tuple[float, float]],
+    objective: str = "fom",
+    constraints: Optional[Constraints] = None,
+    method: str = "cmaes",
+    budget: int = 300,
+    seed: int = 0,
+    log_params: Sequence[str] = (),
+    log_objective: bool = False,
+    popsize: Optional[int] = None,
+    sigma0: float = 0.3,
+    step: float = 0.25,
+    n_init: Optional[int] = None,
+    batch: int = 4,
+) -> OptimizeResult:
+    """Maximize ``fn(cols)[objective]`` over ``bounds`` within ``budget`` evaluations.
+
+    ``fn`` is called with columns for a whole candidate batch (a CMA-ES
+    generation, the initial simplex, a BO batch of ``batch`` points), so
+    vectorized estimators evaluate populations in one call. ``log_objective``
+    optimizes log10 of a positive objective (FOM spans decades).
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}; expected one of {METHODS}")
+    p = _Problem(fn, bounds, objective, constraints or {}, log_params, log_objective, budget)
+    rng = np.random.default_rng(int(seed))
+    if method == "cmaes":
+        _cmaes(p, rng, popsize, sigma0)
+    elif method == "nelder-mead":
+        _nelder_mead(p, rng, step)
+    else:
+        _bayes_opt(p, rng, n_init, batch, int(seed))
+    hist = p.history()
+    i = int(_rank_keys(hist["value"], hist["feasible"], hist["violation"])[0])
+    best = {k: np.asarray(v)[i].item() for k, v in hist.items() if k not in ("value", "violation")}
+    f = float(hist[objective][i])
+    return OptimizeResult(method, best, f, bool(hist["feasible"][i]), p.n_evals, hist)
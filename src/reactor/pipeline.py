@@ -0,0 +1,250 @@
+"""In-process stage pipelines: demo -> feasibility -> KPI -> gate -> report.
+
+A ``Pipeline`` is a small DAG of named stages. Each stage is a function of one
+context dict that holds the run parameters plus the result of every upstream
+stage (keyed by stage name), so stages hand each other in-memory objects
+instead of intermediate JSON files. Artifacts are written only for the stages
+named in ``artifacts`` (path templates formatted with the run parameters).
+
+``run_batch`` executes many independent runs, in order, through a
+ProcessPoolExecutor with bounded in-flight work (as ``sweep.map_points``).
+Inputs shared by every run (UQ summary, cost model, anomaly counts) are
+loaded once by the caller and passed as ``shared``; per-run values such as
+the metrics dict never go through a shared file.
+
+Example::
+
+    runs = [{"run_id": f"{i:03d}", "seed": 123 + i, "metrics": {"energy_budget_J": eb}}
+            for i, eb in enumerate(budgets)]
+    for rec in run_batch(runs, shared={"uq": uq, "cost_model": cost},
+                         artifacts={"kpi": "artifacts/production_kpi_{run_id}.json"}):
+        print(rec["report"])
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .reports import feasibility_report, gate_reports, production_kpi
+
+StageFn = Callable[[Dict[str, Any]], Any]
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: StageFn
+    deps: Tuple[str, ...] = ()
+
+
+class Pipeline:
+    """Stages run in a dependency-respecting order (declaration order among ready stages)."""
+
+    def __init__(self, stages: Sequence[Stage]) -> None:
+        self.stages: Dict[str, Stage] = {}
+        for st in stages:
+            if st.name in self.stages:
+                raise ValueError(f"duplicate stage {st.name!r}")
+            self.stages[st.name] = st
+        for st in stages:
+            missing = [d for d in st.deps if d not in self.stages]
+            if missing:
+                raise ValueError(f"stage {st.name!r} depends on unknown stage(s) {missing}")
+        order: List[str] = []
+        done: set = set()
+        pending = list(self.stages)
+        while pending:
+            ready = [n for n in pending if all(d in done for d in self.stages[n].deps)]
+            if not ready:
+                raise ValueError(f"dependency cycle among stages {pending}")
+            order.append(ready[0])
+            done.add(ready[0])
+            pending.remove(ready[0])
+        self.order: Tuple[str, ...] = tuple(order)
+
+    def upstream(self, names: Sequence[str]) -> Tuple[str, ...]:
+        """``names`` plus every stage they depend on, in run order."""
+        need = set()
+        todo = list(names)
+        while todo:
+            n = todo.pop()
+            if n not in self.stages:
+                raise KeyError(f"unknown stage {n!r}")
+            if n not in need:
+                need.add(n)
+                todo.extend(self.stages[n].deps)
+        return tuple(n for n in self.order if n in need)
+
+    def run(
+        self,
+        params: Mapping[str, Any],
+        artifacts: Optional[Mapping[str, str]] = None,
+        until: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """Run the stages (only those ``until`` needs, if given) and return ``{stage: result}``."""
+        ctx: Dict[str, Any] = dict(params)
+        results: Dict[str, Any] = {}
+        for name in self.upstream(until) if until else self.order:
+            ctx[name] = results[name] = self.stages[name].fn(ctx)
+            if artifacts and name in artifacts:
+                write_json(str(artifacts[name]).format(**params), results[name])
+        return results
+
+
+def write_json(path: str, data: Any) -> None:
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=lambda o: np.asarray(o).tolist())
+
+
+# --- KPI stages ------------------------------------------------------------------
+
+DEMO_FEASIBILITY = {
+    "gamma_series": "[150,150,150,150,150]",
+    "dt": 0.002,
+    "b_series": "[5,5,5,5]",
+    "E_mag": "[0,1e20,1e20,1e20]",
+    "yield_model": "threshold",
+    "n_cm3": 1e20,
+    "Te_eV": 10.0,
+    "bennett_n0": 1e20,
+    "bennett_xi": 2.0,
+    "bennett_B": 5.0,
+    "bennett_ripple": 5e-4,
+}
+
+
+def demo_stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Step a Reactor as ``demo_runner.py`` does; the timeline is written only if ``timeline_log`` is set.
+
+    Params: ``scenario`` (Scenario, dict or JSON path), ``steps`` (10), ``dt`` (0.002),
+    ``seed`` (123), ``timeline_log``, ``timeline_budget`` (10).
+    """
+    from .config import as_scenario
+    from .core import Reactor
+    from .energy import EnergyLedger
+    from .random_utils import set_seed
+
+    sc = as_scenario(ctx.get("scenario"))
+    seed = int(ctx.get("seed", 123))
+    dt = float(ctx.get("dt", 0.002))
+    steps = int(ctx.get("steps", 10))
+    set_seed(seed)
+    R = Reactor(**sc.reactor_kwargs(timeline_log_path=ctx.get("timeline_log"),
+                                    timeline_budget=int(ctx.get("timeline_budget", 10))), enforce_density=False)
+    ledger = EnergyLedger()
+    for _ in range(steps):
+        R.step(dt=dt)
+        ledger.add_power_sample(1e6, dt)
+    return {"steps": steps, "dt": dt, "seed": seed, "energy_J": ledger.total_energy(),
+            "timeline": ctx.get("timeline_log")}
+
+
+def feasibility_stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """``feasibility_report(**feasibility_args)`` (default: the batch demo inputs)."""
+    return feasibility_report(**ctx.get("feasibility_args", DEMO_FEASIBILITY))
+
+
+def kpi_stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Production KPI from the feasibility result and this run's ``metrics``.
+
+    With ``kpi_drop_fom`` the report's FOM is withheld so the KPI falls back to
+    the cost model and energy budget (the batch KPI trend does this).
+    """
+    feas = ctx["feasibility"]
+    if ctx.get("kpi_drop_fom"):
+        feas = {k: v for k, v in feas.items() if k not in ("fom", "fom_details")}
+    return production_kpi(feas, ctx.get("metrics") or {}, ctx.get("uq") or {}, ctx.get("cost_model") or {},
+                          ctx.get("anomaly_counts"))
+
+
+def gate_stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Metrics gate on the feasibility result (``require_yield``, ``scenario`` as in metrics_gate.py)."""
+    (ok,), (reasons,) = gate_reports([ctx["feasibility"]], ctx.get("metrics") or {},
+                                     bool(ctx.get("require_yield", False)), ctx.get("scenario_name"))
+    return {"gate": "feasibility", "ok": ok, "reasons": reasons}
+
+
+def report_stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """One summary row per run."""
+    kpi, gate = ctx["kpi"], ctx["gate"]
+    return {
+        "run_id": ctx.get("run_id"),
+        "energy_budget_J": kpi.get("energy_budget_J"),
+        "stable": kpi["stable"],
+        "fom": kpi["fom"],
+        "gate_ok": gate["ok"],
+        "reasons": gate["reasons"],
+        "demo_energy_J": (ctx.get("demo") or {}).get("energy_J"),
+    }
+
+
+KPI_PIPELINE = Pipeline([
+    Stage("demo", demo_stage),
+    Stage("feasibility", feasibility_stage),
+    Stage("kpi", kpi_stage, ("feasibility",)),
+    Stage("gate", gate_stage, ("feasibility",)),
+    Stage("report", report_stage, ("demo", "kpi", "gate")),
+])
+
+
+# --- batches -----------------------------------------------------------------------
+
+def _run_chunk(
+    pipeline: Pipeline,
+    runs: Sequence[Mapping[str, Any]],
+    shared: Mapping[str, Any],
+    artifacts: Optional[Mapping[str, str]],
+    until: Optional[Sequence[str]],
+) -> List[Dict[str, Any]]:
+    return [pipeline.run({**shared, **r}, artifacts, until) for r in runs]
+
+
+def run_batch(
+    runs: Sequence[Mapping[str, Any]],
+    pipeline: Optional[Pipeline] = None,
+    shared: Optional[Mapping[str, Any]] = None,
+    artifacts: Optional[Mapping[str, str]] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 8,
+    max_pending: Optional[int] = None,
+    until: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``pipeline.run`` results for every run, in input order.
+
+    Each run's parameters are ``{**shared, **run}``. Chunks of ``chunk_size``
+    runs go to worker processes (``workers`` default os.cpu_count(); ``<= 1``
+    runs inline), at most ``max_pending`` chunks in flight (default 2x
+    workers). Stage functions must be module-level for the process pool.
+    """
+    pipeline = pipeline or KPI_PIPELINE
+    shared = dict(shared or {})
+    runs = list(runs)
+    step = max(1, int(chunk_size))
+    chunks = (runs[a:a + step] for a in range(0, len(runs), step))
+    n_workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if n_workers <= 1 or len(runs) <= step:
+        for ch in chunks:
+            yield from _run_chunk(pipeline, ch, shared, artifacts, until)
+        return
+    limit = max(1, int(max_pending or 2 * n_workers))
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        pending: Deque[Future] = deque()
+        for ch in chunks:
+            pending.append(ex.submit(_run_chunk, pipeline, ch, shared, artifacts, until))
+            if len(pending) >= limit:
+                break
+        while pending:
+            done = pending.popleft().result()
+            nxt = next(chunks, None)
+            if nxt is not None:
+                pending.append(ex.submit(_run_chunk, pipeline, nxt, shared, artifacts, until))
+            yield from done
@@ -0,0 +1,165 @@
+"""Adaptive quadtree refinement of 2-D parameter envelopes.
+
+Instead of a dense uniform n x T grid, start from a coarse grid of cells and
+split (recursively, up to ``max_depth``) only cells where a threshold contour
+crosses (corner values straddle ``level``) or where the value spread across the
+cell is a large fraction of the global spread. Corners live on an integer
+lattice at the finest resolution, so shared corners are evaluated once and
+every level is evaluated as one vectorized batch.
+
+Example::
+
+    r = refine_envelope(fom_vec, (1e19, 1e21), (5.0, 50.0), level=0.1, log_x=True)
+    r.x, r.y, r.f        # refined point set
+    r.contour            # (m, 2) points on f == level
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+VecFn = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass
+class Refinement:
+    x: np.ndarray
+    y: np.ndarray
+    f: np.ndarray
+    cells: np.ndarray  # leaf cells as rows (x0, x1, y0, y1)
+    contour: np.ndarray  # (m, 2) points where f crosses level along leaf edges
+    level: Optional[float]
+    depth: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "n_points": int(self.x.size),
+            "n_cells": int(len(self.cells)),
+            "depth": int(self.depth),
+            "level": self.level,
+            "contour": self.contour.tolist(),
+        }
+
+
+def refine_envelope(
+    fn: VecFn,
+    x_range: Tuple[float, float],
+    y_range: Tuple[float, float],
+    level: Optional[float] = None,
+    coarse: int = 8,
+    max_depth: int = 6,
+    grad_tol: float = 0.1,
+    log_x: bool = False,
+    log_y: bool = False,
+    log_f: bool = False,
+    max_points: Optional[int] = None,
+) -> Refinement:
+    """Evaluate ``fn(x, y)`` (vectorized) on an adaptively refined grid.
+
+    A cell is split when ``level`` lies between its corner values, or when its
+    corner spread exceeds ``grad_tol`` times the spread of all values seen so
+    far (``log_f`` measures spread in log10|f|). Refinement stops at
+    ``max_depth`` halvings of the ``coarse`` x ``coarse`` starting cells or once
+    ``max_points`` evaluations have been made.
+    """
+    n0 = max(1, int(coarse))
+    depth = max(0, int(max_depth))
+    S = 1 << depth
+    N = n0 * S
+
+    def axis(lo: float, hi: float, log: bool) -> Callable[[np.ndarray], np.ndarray]:
+        a, b = (np.log10(lo), np.log10(hi)) if log else (float(lo), float(hi))
+
+        def to(i: np.ndarray) -> np.ndarray:
+            u = a + (b - a) * (np.asarray(i, dtype=float) / N)
+            return np.power(10.0, u) if log else u
+        return to
+
+    to_x = axis(*x_range, log_x)
+    to_y = axis(*y_range, log_y)
+    values: Dict[Tuple[int, int], float] = {}
+
+    def evaluate(ij: np.ndarray) -> None:
+        if ij.size == 0:
+            return
+        ij = np.unique(ij, axis=0)
+        new = np.array([k for k in map(tuple, ij.tolist()) if k not in values], dtype=np.int64).reshape(-1, 2)
+        if max_points is not None:
+            new = new[: max(0, int(max_points) - len(values))]
+        if new.size == 0:
+            return
+        f = np.asarray(fn(to_x(new[:, 0]), to_y(new[:, 1])), dtype=float).reshape(-1)
+        values.update(zip(map(tuple, new.tolist()), f.tolist(), strict=True))
+
+    def tf(v: np.ndarray) -> np.ndarray:
+        return np.log10(np.maximum(np.abs(v), 1e-300)) if log_f else v
+
+    # cells as rows (i, j, size) on the finest lattice
+    g = np.arange(n0, dtype=np.int64) * S
+    cells = np.stack([np.repeat(g, n0), np.tile(g, n0), np.full(n0 * n0, S, dtype=np.int64)], axis=1)
+    leaves: List[np.ndarray] = []
+    d = 0
+    while True:
+        i, j, s = cells[:, 0], cells[:, 1], cells[:, 2]
+        corners = np.stack([np.stack([i, j], 1), np.stack([i + s, j], 1),
+                            np.stack([i, j + s], 1), np.stack([i + s, j + s], 1)], 1)
+        evaluate(corners.reshape(-1, 2))
+        known = np.array([[k in values for k in map(tuple, c.tolist())] for c in corners], dtype=bool)
+        ok = known.all(axis=1)
+        cv = np.array([[values.get(k, np.nan) for k in map(tuple, c.tolist())] for c in corners], dtype=float)
+        split = np.zeros(len(cells), dtype=bool)
+        if d < depth and ok.any() and (max_points is None or len(values) < int(max_points)):
+            lo, hi = np.nanmin(cv, axis=1), np.nanmax(cv, axis=1)
+            if level is not None:
+                split |= (lo < float(level)) & (hi >= float(level))
+            allv = tf(np.fromiter(values.values(), dtype=float))
+            span = float(np.nanmax(allv) - np.nanmin(allv)) if allv.size else 0.0
+            if span > 0.0 and grad_tol > 0.0:
+                tcv = tf(cv)
+                split |= (np.nanmax(tcv, axis=1) - np.nanmin(tcv, axis=1)) > float(grad_tol) * span
+            split &= ok
+        leaves.append(cells[~split & ok])
+        if not split.any():
+            break
+        parents = cells[split]
+        h = parents[:, 2] // 2
+        pi, pj = parents[:, 0], parents[:, 1]
+        cells = np.concatenate([
+            np.stack([pi, pj, h], 1), np.stack([pi + h, pj, h], 1),
+            np.stack([pi, pj + h, h], 1), np.stack([pi + h, pj + h, h], 1),
+        ])
+        d += 1
+
+    leaf = np.concatenate(leaves) if leaves else np.empty((0, 3), dtype=np.int64)
+    keys = np.array(sorted(values), dtype=np.int64).reshape(-1, 2)
+    f_all = np.array([values[k] for k in map(tuple, keys.tolist())], dtype=float)
+    contour = _contour(leaf, values, level, to_x, to_y) if level is not None else np.empty((0, 2))
+    boxes = np.stack([to_x(leaf[:, 0]), to_x(leaf[:, 0] + leaf[:, 2]),
+                      to_y(leaf[:, 1]), to_y(leaf[:, 1] + leaf[:, 2])], 1) if len(leaf) else np.empty((0, 4))
+    return Refinement(to_x(keys[:, 0]), to_y(keys[:, 1]), f_all, boxes, contour, level, d)
+
+
+def _contour(
+    leaf: np.ndarray,
+    values: Dict[Tuple[int, int], float],
+    level: float,
+    to_x: Callable[[np.ndarray], np.ndarray],
+    to_y: Callable[[np.ndarray], np.ndarray],
+) -> np.ndarray:
+    """Linear-interpolated crossings of ``level`` along leaf-cell edges (lattice coords)."""
+    pts = set()
+    for i, j, s in leaf.tolist():
+        c = [(i, j), (i + s, j), (i + s, j + s), (i, j + s)]
+        for a, b in zip(c, c[1:] + c[:1], strict=True):
+            fa, fb = values[a], values[b]
+            if (fa < level) == (fb < level) or fa == fb:
+                continue
+            t = (level - fa) / (fb - fa)
+            pts.add((a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1])))
+    if not pts:
+        return np.empty((0, 2))
+    p = np.array(sorted(pts), dtype=float)
+    return np.stack([to_x(p[:, 0]), to_y(p[:, 1])], 1)
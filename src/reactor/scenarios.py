@@ -0,0 +1,249 @@
+"""Batched scenario runs: scenario files x seeds across a pool of worker processes.
+
+Each job (one scenario file, one seed) steps a ``Reactor`` as ``reactor demo``
+does, in its own process with an optional address-space limit
+(``max_mem_mb``, via ``resource.RLIMIT_AS`` where available) and wall-clock
+``timeout``; at most ``workers`` jobs run at once. A job that overruns is
+terminated and reported with status ``timeout``; ``memory`` and ``error``
+mark jobs that raised; a scenario file that fails validation yields
+``error`` rows without starting a process. Every job logs to its own
+timeline file under ``timeline_dir`` (``<job_id>.ndjson``, truncated first),
+so runs never interleave events.
+
+Results come back as one columnar table (``reactor.sweep`` style dict of
+arrays, one row per job in input order) ready for ``write_columns``.
+
+Example::
+
+    jobs = scenario_jobs(["examples/*.json"], seeds=[1, 2, 3])
+    cols = run_scenarios(jobs, workers=8, timeout=600, max_mem_mb=2048, timeline_dir="artifacts/timelines")
+    write_columns([cols], csv_path="artifacts/scenario_results.csv")
+"""
+
+from __future__ import annotations
+
+import glob
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .sweep import Columns
+
+STATUSES = ("ok", "timeout", "memory", "error")
+_FLOAT_COLS = ("dt", "elapsed_s", "wmax_final", "wmax_mean", "confinement_efficiency", "b_mean_T", "b_ripple",
+               "energy_J")
+_INT_COLS = ("seed", "steps", "events_ok", "events_fail")
+
+
+def scenario_jobs(
+    patterns: Sequence[str],
+    seeds: Sequence[int] = (123,),
+    steps: Optional[int] = None,
+    dt: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Jobs for every scenario file matching ``patterns`` (sorted, de-duplicated) times every seed.
+
+    Each file is validated once here; jobs carry the parsed ``Scenario``, or the
+    validation message under ``invalid`` (``run_scenarios`` reports those as
+    ``error`` rows). ``job_id`` is ``<name>_s<seed>``; when two files share a
+    basename, ``<name>`` gets a short hash of the file's absolute path.
+    """
+    from .config import load_scenario
+
+    paths: List[str] = []
+    for pat in patterns:
+        hits = sorted(glob.glob(pat)) or ([pat] if os.path.exists(pat) else [])
+        paths.extend(p for p in hits if p not in paths)
+    if not paths:
+        raise ValueError(f"no scenario files match {list(patterns)}")
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    jobs = []
+    for p, name in zip(paths, names, strict=True):
+        stem = name
+        if names.count(name) > 1:
+            stem = f"{name}-{hashlib.sha1(os.path.abspath(p).encode()).hexdigest()[:8]}"
+        try:
+            sc, invalid = load_scenario(p), ""
+        except (OSError, ValueError) as e:
+            sc, invalid = None, f"{type(e).__name__}: {e}"
+        for s in seeds:
+            job = {"job_id": f"{stem}_s{int(s)}", "scenario": p, "config": sc, "name": name, "seed": int(s),
+                   "steps": steps, "dt": dt}
+            if invalid:
+                job["invalid"] = invalid
+            jobs.append(job)
+    return jobs
+
+
+def run_scenario(job: Dict[str, Any], timeline_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Run one job in this process; returns its result row (without ``status``)."""
+    from .analysis_fields import b_field_rms_fluctuation
+    from .analysis_stat import OnlineStats
+    from .config import as_scenario
+    from .core import Reactor
+    from .energy import EnergyLedger
+    from .metrics import confinement_efficiency_estimator
+    from .random_utils import set_seed
+
+    sc = as_scenario(job.get("config") or job["scenario"])
+    steps = int(job.get("steps") or sc.steps or 10)
+    dt = float(job.get("dt") or sc.dt or 1e-3)
+    seed = int(job["seed"])
+    timeline = None
+    if timeline_dir:
+        os.makedirs(timeline_dir, exist_ok=True)
+        timeline = os.path.join(timeline_dir, f"{job['job_id']}.ndjson")
+        open(timeline, "w").close()
+    set_seed(seed)
+    b_arr = sc.b_array()
+    wmax = OnlineStats()
+    R = Reactor(**sc.reactor_kwargs(timeline_log_path=timeline, b_series=b_arr), enforce_density=False,
+                online_stats=wmax)
+    ledger = EnergyLedger()
+    t0 = time.perf_counter()
+    for _ in range(steps):
+        R.step(dt=dt)
+        ledger.add_power_sample(1e6, dt)
+    elapsed = time.perf_counter() - t0
+    counts = {"ok": 0, "fail": 0}
+    if timeline and os.path.exists(timeline):
+        with open(timeline, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    st = json.loads(line).get("status")
+                    if st in counts:
+                        counts[st] += 1
+    return {
+        "steps": steps,
+        "dt": dt,
+        "elapsed_s": elapsed,
+        "wmax_final": float(np.max(np.abs(R.omega))),
+        "wmax_mean": float(wmax.mean) if wmax.count else float("nan"),
+        "confinement_efficiency": float(confinement_efficiency_estimator(sc.xi, sc.b_field_ripple_pct)),
+        "b_mean_T": float(np.mean(b_arr)) if b_arr is not None and b_arr.size else float("nan"),
+        "b_ripple": float(b_field_rms_fluctuation(b_arr)) if b_arr is not None and b_arr.size else float("nan"),
+        "energy_J": ledger.total_energy(),
+        "events_ok": counts["ok"],
+        "events_fail": counts["fail"],
+        "timeline": timeline or "",
+    }
+
+
+def _limit_memory(max_mem_mb: Optional[float]) -> None:
+    if not max_mem_mb:
+        return
+    try:
+        import resource
+    except ImportError:  # pragma: no cover (non-POSIX)
+        return
+    limit = int(float(max_mem_mb) * 1024 * 1024)
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _job_main(job: Dict[str, Any], conn: Any, timeline_dir: Optional[str], max_mem_mb: Optional[float]) -> None:
+    try:
+        _limit_memory(max_mem_mb)
+        conn.send(("ok", run_scenario(job, timeline_dir), ""))
+    except MemoryError as e:
+        conn.send(("memory", {}, f"MemoryError: {e}"))
+    except BaseException as e:
+        conn.send(("error", {}, f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_scenarios(
+    jobs: Sequence[Dict[str, Any]],
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    max_mem_mb: Optional[float] = None,
+    timeline_dir: Optional[str] = None,
+    progress: Optional[Any] = None,
+) -> Columns:
+    """Run ``jobs`` with at most ``workers`` (default os.cpu_count()) processes; one table row per job.
+
+    ``progress(row)`` is called as each job finishes (completion order).
+    """
+    ctx = mp.get_context()
+    limit = max(1, int(workers or os.cpu_count() or 1))
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    queue = list(enumerate(jobs))[::-1]
+    running: Dict[Any, Any] = {}  # reader -> (index, process, deadline)
+
+    def finish(i: int, status: str, result: Dict[str, Any], error: str) -> None:
+        job = jobs[i]
+        row = {"job_id": job["job_id"], "scenario": job["name"], "seed": job["seed"], "status": status,
+               "error": error, **result}
+        rows[i] = row
+        if progress is not None:
+            progress(row)
+
+    while queue or running:
+        while queue and len(running) < limit:
+            i, job = queue.pop()
+            if job.get("invalid"):
+                finish(i, "error", {}, job["invalid"])
+                continue
+            r, w = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_job_main, args=(job, w, timeline_dir, max_mem_mb), daemon=True)
+            proc.start()
+            w.close()
+            running[r] = (i, proc, time.monotonic() + float(timeout) if timeout else None)
+        if not running:
+            continue
+        deadlines = [d for _, _, d in running.values() if d is not None]
+        wait_s = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        ready = wait(list(running), timeout=wait_s)
+        for r in ready:
+            i, proc, _ = running.pop(r)
+            try:
+                status, result, error = r.recv()
+            except EOFError:
+                status, result, error = "error", {}, "worker exited without a result"
+            r.close()
+            proc.join()
+            if status == "error" and proc.exitcode and proc.exitcode < 0:
+                error = f"{error} (signal {-proc.exitcode})"
+            finish(i, status, result, error)
+        now = time.monotonic()
+        for r, (i, proc, deadline) in list(running.items()):
+            if deadline is not None and now >= deadline:
+                proc.terminate()
+                proc.join()
+                r.close()
+                del running[r]
+                finish(i, "timeout", {}, f"exceeded {timeout}s")
+    return results_table([row for row in rows if row is not None])
+
+
+def results_table(rows: Sequence[Dict[str, Any]]) -> Columns:
+    """Stack result rows into columns; numbers missing for failed jobs become NaN (ints: -1)."""
+    cols: Columns = {}
+    for k in ("job_id", "scenario", "status", "error", "timeline"):
+        cols[k] = np.array([str(r.get(k, "")) for r in rows], dtype=object)
+    for k in _INT_COLS:
+        cols[k] = np.array([int(r.get(k, -1)) for r in rows], dtype=np.int64)
+    for k in _FLOAT_COLS:
+        cols[k] = np.array([float(r.get(k, np.nan)) for r in rows], dtype=float)
+    return cols
+
+
+def summarize(cols: Columns) -> Dict[str, Any]:
+    """Job counts by status, total and max elapsed time."""
+    status = cols["status"].tolist()
+    el = cols["elapsed_s"]
+    return {
+        "n_jobs": len(status),
+        **{s: status.count(s) for s in STATUSES},
+        "elapsed_s_total": float(np.nansum(el)) if el.size else 0.0,
+        "elapsed_s_max": float(np.nanmax(el)) if el.size and np.isfinite(el).any() else 0.0,
+    }
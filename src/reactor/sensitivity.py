@@ -0,0 +1,184 @@
+"""Global sensitivity analysis: Sobol indices (Saltelli scheme) and Morris screening.
+
+Both methods build their whole design up front and evaluate it through a
+columnar ``eval_fn(cols) -> {outputs}`` (the ``run_uq_vectorized`` contract),
+in blocks of ``batch_size`` rows. Sobol indices cost N*(d+2) evaluations,
+Morris r*(d+1). Bootstrap intervals resample the evaluated rows, so they
+need no extra model calls.
+
+Example::
+
+    s = sobol_indices(eval_vec, {"n_e": (1e19, 1e21), "T_e": (5, 15), "E_total": (1e10, 1e12)},
+                      outputs=["fom"], n=4096, log_params=["n_e", "E_total"])
+    s["fom"]["ST"]        # {"n_e": ..., "T_e": ..., "E_total": ...}
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .uq import iter_design, scale_design
+
+EvalFn = Callable[[Dict[str, np.ndarray]], Dict[str, Any]]
+
+
+def _evaluate(
+    eval_fn: EvalFn,
+    U: np.ndarray,
+    param_ranges: Dict[str, Tuple[float, float]],
+    log_params: Sequence[str],
+    outputs: Sequence[str],
+    batch_size: int,
+) -> Dict[str, np.ndarray]:
+    parts: Dict[str, list] = {k: [] for k in outputs}
+    step = max(1, int(batch_size))
+    for a in range(0, len(U), step):
+        blk = U[a:a + step]
+        out = eval_fn(scale_design(blk, param_ranges, log_params))
+        for k in outputs:
+            parts[k].append(np.broadcast_to(np.asarray(out[k], dtype=float), (len(blk),)))
+    return {k: np.concatenate(v) if v else np.empty(0) for k, v in parts.items()}
+
+
+def _outputs(outputs: Union[str, Sequence[str]]) -> Sequence[str]:
+    return [outputs] if isinstance(outputs, str) else list(outputs)
+
+
+def _interval(boot: np.ndarray, conf: float) -> np.ndarray:
+    a = (1.0 - float(conf)) / 2.0
+    return np.quantile(boot, [a, 1.0 - a], axis=0).T
+
+
+def _saltelli(fA: np.ndarray, fB: np.ndarray, fAB: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """First/total-order estimators (Saltelli 2010, Jansen); leading axes broadcast over bootstrap draws."""
+    var = np.var(np.concatenate([fA, fB], axis=-1), axis=-1)
+    var = np.where(var > 0, var, np.nan)
+    S1 = np.mean(fB[..., None, :] * (fAB - fA[..., None, :]), axis=-1) / var[..., None]
+    ST = 0.5 * np.mean((fA[..., None, :] - fAB) ** 2, axis=-1) / var[..., None]
+    return S1, ST
+
+
+def sobol_indices(
+    eval_fn: EvalFn,
+    param_ranges: Dict[str, Tuple[float, float]],
+    outputs: Union[str, Sequence[str]] = "fom",
+    n: int = 1024,
+    seed: int = 0,
+    method: str = "sobol",
+    log_params: Sequence[str] = (),
+    n_boot: int = 200,
+    conf: float = 0.95,
+    batch_size: int = 65536,
+) -> Dict[str, Any]:
+    """First-order (S1) and total-order (ST) Sobol indices for each output.
+
+    Two independent N x d matrices A and B come from one 2d-dimensional design
+    (``method`` as in ``iter_design``); AB_i is A with column i from B. Output
+    variance is taken over A and B together. ``*_conf`` holds the ``conf``
+    percentile bootstrap interval from ``n_boot`` row resamples.
+    """
+    names = list(param_ranges)
+    d = len(names)
+    N = int(n)
+    outs = _outputs(outputs)
+    AB2 = next(iter_design(N, 2 * d, method, seed, N))
+    A, B = AB2[:, :d], AB2[:, d:]
+    blocks = [A, B]
+    for i in range(d):
+        Ai = A.copy()
+        Ai[:, i] = B[:, i]
+        blocks.append(Ai)
+    Y = _evaluate(eval_fn, np.concatenate(blocks), param_ranges, log_params, outs, batch_size)
+    rng = np.random.default_rng(int(seed))
+    idx = rng.integers(0, N, size=(int(n_boot), N)) if n_boot else None
+    result: Dict[str, Any] = {"n": N, "n_evals": N * (d + 2), "method": method}
+    for k in outs:
+        y = Y[k].reshape(d + 2, N)
+        fA, fB, fAB = y[0], y[1], y[2:]
+        S1, ST = _saltelli(fA, fB, fAB)
+        entry: Dict[str, Any] = {"S1": dict(zip(names, S1.tolist(), strict=True)),
+                                 "ST": dict(zip(names, ST.tolist(), strict=True))}
+        if idx is not None:
+            bS1, bST = _saltelli(fA[idx], fB[idx], fAB[:, idx].transpose(1, 0, 2))
+            entry["S1_conf"] = dict(zip(names, _interval(bS1, conf).tolist(), strict=True))
+            entry["ST_conf"] = dict(zip(names, _interval(bST, conf).tolist(), strict=True))
+        result[k] = entry
+    return result
+
+
+def morris_trajectories(r: int, d: int, levels: int = 4, seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """r one-at-a-time trajectories on a ``levels``-point grid of the unit cube.
+
+    Returns (X, order, step): X is (r, d+1, d); between rows k and k+1 of a
+    trajectory only parameter ``order[:, k]`` moves, by ``step[:, k]`` (+/-delta,
+    delta = levels / (2 (levels - 1))).
+    """
+    p = int(levels)
+    if p < 2 or p % 2:
+        raise ValueError(f"levels must be an even integer >= 2, got {levels!r}")
+    r, d = int(r), int(d)
+    rng = np.random.default_rng(int(seed))
+    delta = p / (2.0 * (p - 1))
+    sign = rng.choice([-1.0, 1.0], size=(r, d))
+    # base points leave room for a +delta step; descending trajectories start delta higher
+    x0 = rng.integers(0, p // 2, size=(r, d)) / (p - 1) + delta * (sign < 0)
+    order = np.argsort(rng.random((r, d)), axis=1)
+    step = np.take_along_axis(sign, order, axis=1) * delta
+    moves = np.zeros((r, d, d))
+    moves[np.arange(r)[:, None], np.arange(d)[None, :], order] = step
+    X = np.concatenate([x0[:, None, :], x0[:, None, :] + np.cumsum(moves, axis=1)], axis=1)
+    return X, order, step
+
+
+def morris_screening(
+    eval_fn: EvalFn,
+    param_ranges: Dict[str, Tuple[float, float]],
+    outputs: Union[str, Sequence[str]] = "fom",
+    r: int = 50,
+    levels: int = 4,
+    seed: int = 0,
+    log_params: Sequence[str] = (),
+    n_boot: int = 200,
+    conf: float = 0.95,
+    batch_size: int = 65536,
+) -> Dict[str, Any]:
+    """Morris elementary-effect statistics (mu, mu_star, sigma) for each output.
+
+    Effects are per unit of the normalized parameter range (log10 range for
+    ``log_params``), so they compare across parameters. ``mu_star_conf`` is a
+    bootstrap interval over trajectories.
+    """
+    names = list(param_ranges)
+    d = len(names)
+    outs = _outputs(outputs)
+    X, order, step = morris_trajectories(r, d, levels, seed)
+    Y = _evaluate(eval_fn, X.reshape(-1, d), param_ranges, log_params, outs, batch_size)
+    rng = np.random.default_rng(int(seed) + 1)
+    idx = rng.integers(0, int(r), size=(int(n_boot), int(r))) if n_boot else None
+    result: Dict[str, Any] = {"r": int(r), "levels": int(levels), "n_evals": int(r) * (d + 1)}
+    for k in outs:
+        y = Y[k].reshape(int(r), d + 1)
+        ee_steps = np.diff(y, axis=1) / step
+        EE = np.empty_like(ee_steps)
+        np.put_along_axis(EE, order, ee_steps, axis=1)  # columns back in parameter order
+        mu_star = np.abs(EE).mean(axis=0)
+        entry: Dict[str, Any] = {
+            "mu": dict(zip(names, EE.mean(axis=0).tolist(), strict=True)),
+            "mu_star": dict(zip(names, mu_star.tolist(), strict=True)),
+            "sigma": dict(zip(names, EE.std(axis=0, ddof=1).tolist() if r > 1 else [0.0] * d, strict=True)),
+        }
+        if idx is not None:
+            boot = np.abs(EE[idx]).mean(axis=1)
+            entry["mu_star_conf"] = dict(zip(names, _interval(boot, conf).tolist(), strict=True))
+        result[k] = entry
+    return result
+
+
+def rank_parameters(result: Dict[str, Any], output: str, key: Optional[str] = None) -> Sequence[str]:
+    """Parameter names ordered by decreasing ``key`` (ST for Sobol results, mu_star for Morris)."""
+    entry = result[output]
+    key = key or ("ST" if "ST" in entry else "mu_star")
+    vals = entry[key]
+    return sorted(vals, key=lambda k: -np.nan_to_num(vals[k], nan=-np.inf))
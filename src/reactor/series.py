@@ -0,0 +1,224 @@
+"""Time-series inputs for feasibility gating: inline JSON, binary files and chunked text.
+
+A series spec is one of:
+
+- an inline JSON array (``"[150, 150, 120]"``), as the CLIs always accepted;
+- ``.npy`` (memory-mapped), ``.npz`` (``file.npz:name`` selects a member,
+  default the first);
+- raw little-endian floats: ``.f32``/``.f64``, or ``.bin``/``.raw`` with an
+  optional dtype suffix (``file.bin:float32``; default float64), memory-mapped;
+- ``.json`` (one array), ``.ndjson``/``.jsonl`` (one number, array or object
+  per line) and ``.csv`` (``file.csv:column``; default the first column),
+  read in chunks.
+
+``iter_series`` yields float64 chunks of at most ``chunk_size`` samples, so
+gates can be evaluated with ``OnlineStats`` in memory bounded by one chunk.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .analysis_fields import estimate_density_from_em
+from .analysis_stat import OnlineStats
+from .gates import evaluate_gates, feasibility_gates
+from .thresholds import Thresholds
+
+DEFAULT_CHUNK = 1 << 20
+RAW_DTYPES = {".f32": "float32", ".f64": "float64", ".bin": "float64", ".raw": "float64"}
+TEXT_SUFFIXES = (".json", ".ndjson", ".jsonl", ".csv")
+
+
+def _split_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """Split ``path:option`` when ``path`` exists (and the whole spec does not)."""
+    if os.path.exists(spec) or ":" not in spec:
+        return spec, None
+    path, opt = spec.rsplit(":", 1)
+    return (path, opt) if os.path.exists(path) else (spec, None)
+
+
+def load_series(spec: Optional[str], dtype: Optional[str] = None) -> Optional[np.ndarray]:
+    """Whole series as an array; binary files come back memory-mapped (read-only)."""
+    if spec is None or spec == "":
+        return None
+    text = spec.lstrip()
+    if text.startswith("["):
+        return np.array(json.loads(text), dtype=float)
+    path, opt = _split_spec(spec)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        return np.load(path, mmap_mode="r")
+    if ext == ".npz":
+        # members are compressed/zipped; np.load reads them lazily one at a time
+        with np.load(path) as z:
+            return np.asarray(z[opt or z.files[0]])
+    if ext in RAW_DTYPES:
+        dt = np.dtype(opt or dtype or RAW_DTYPES[ext]).newbyteorder("<")
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dt)
+        return np.memmap(path, dtype=dt, mode="r")
+    if ext in TEXT_SUFFIXES:
+        chunks = list(iter_series(spec))
+        return np.concatenate(chunks) if chunks else np.empty(0)
+    known = [".npy", ".npz", *RAW_DTYPES, *TEXT_SUFFIXES]
+    raise ValueError(f"unrecognized series spec {spec!r}: expected a JSON array or a file ending in one of {known}")
+
+
+def _ndjson_values(line: str, column: Optional[str]) -> List[float]:
+    v = json.loads(line)
+    if isinstance(v, dict):
+        v = v[column] if column else next(iter(v.values()))
+    return [float(x) for x in v] if isinstance(v, list) else [float(v)]
+
+
+def _iter_text(path: str, ext: str, column: Optional[str], chunk_size: int) -> Iterator[np.ndarray]:
+    buf: List[float] = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if ext == ".json":
+            yield np.asarray(json.load(f), dtype=float).ravel()
+            return
+        if ext == ".csv":
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            try:
+                first = [float(header[0])] if column is None else None
+            except ValueError:
+                first = None
+            if first is not None:
+                buf.extend(first)
+                col = 0
+            else:
+                names = [h.strip() for h in header]
+                col = names.index(column) if column else 0
+            rows = (r[col] for r in reader if r)
+        else:
+            rows = (x for line in f if line.strip() for x in _ndjson_values(line, column))
+        for x in rows:
+            buf.append(float(x))
+            if len(buf) >= chunk_size:
+                yield np.asarray(buf, dtype=float)
+                buf = []
+    if buf:
+        yield np.asarray(buf, dtype=float)
+
+
+def iter_series(
+    spec: Optional[str], chunk_size: int = DEFAULT_CHUNK, dtype: Optional[str] = None
+) -> Iterator[np.ndarray]:
+    """Yield float64 chunks of the series ``spec`` (nothing for an empty/None spec)."""
+    if spec is None or spec == "":
+        return
+    step = max(1, int(chunk_size))
+    path, opt = (None, None) if spec.lstrip().startswith("[") else _split_spec(spec)
+    ext = os.path.splitext(path)[1].lower() if path else ""
+    if ext in TEXT_SUFFIXES:
+        yield from _iter_text(path, ext, opt, step)
+        return
+    arr = load_series(spec, dtype=dtype)
+    flat = arr.reshape(-1)
+    for a in range(0, flat.size, step):
+        # slicing a memmap only touches the pages of this chunk
+        yield np.asarray(flat[a:a + step], dtype=float)
+
+
+@dataclass
+class SeriesGates:
+    """Streaming evaluation of the gamma-duration, B-field and density gates."""
+
+    gamma_ok: bool = False
+    b_ok: bool = False
+    dens_ok: bool = False
+    gamma_stats: Dict[str, Any] = field(default_factory=dict)
+    b_stats: Dict[str, Any] = field(default_factory=dict)
+    density_stats: Dict[str, Any] = field(default_factory=dict)
+    gamma: Optional[OnlineStats] = None
+    E_sum: Optional[float] = None
+    gamma_longest_run: Optional[int] = None
+
+    def summary(self) -> Dict[str, float]:
+        """Run-level columns for ``reactor.gates.feasibility_gates`` (NaN where a series was absent)."""
+        nan = float("nan")
+        return {
+            "gamma_longest_run": nan if self.gamma_longest_run is None else float(self.gamma_longest_run),
+            "dt": float(self.gamma_stats.get("dt", nan)),
+            "b_mean_T": float(self.b_stats.get("b_mean_T", nan)),
+            "b_rms_fraction": float(self.b_stats.get("b_rms_fraction", nan)),
+            "ne_max_cm3": float(self.density_stats.get("ne_max_cm3", nan)),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "gamma_ok": bool(self.gamma_ok),
+            "b_ok": bool(self.b_ok),
+            "dens_ok": bool(self.dens_ok),
+            "gamma_stats": self.gamma_stats,
+            "b_stats": self.b_stats,
+            "density_stats": self.density_stats,
+        }
+
+
+def evaluate_series_gates(
+    gamma_series: Optional[str] = None,
+    b_series: Optional[str] = None,
+    E_mag: Optional[str] = None,
+    dt: float = 1e-3,
+    gamma_threshold: float = 140.0,
+    gamma_duration: float = 0.01,
+    density_threshold: float = 1e20,
+    b_ripple_max: float = 0.01,
+    b_min: float = 5.0,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> SeriesGates:
+    """Evaluate the feasibility gates over series specs one chunk at a time.
+
+    Each series is reduced to run-level summaries with ``OnlineStats`` (Γ run
+    lengths carry across chunks), then decided by ``reactor.gates``: Γ >=
+    ``gamma_threshold`` for ceil(gamma_duration / dt) consecutive samples, B
+    mean >= ``b_min`` with std/mean <= ``b_ripple_max``, and max density
+    estimated from |E| >= ``density_threshold``.
+    """
+    out = SeriesGates()
+    g = OnlineStats([float(gamma_threshold)])
+    for ch in iter_series(gamma_series, chunk_size):
+        g.update_many(ch)
+    if g.count:
+        out.gamma = g
+        out.gamma_longest_run = g.longest_run(float(gamma_threshold))
+        out.gamma_stats = {
+            "gamma_min": float(g.min),
+            "gamma_max": float(g.max),
+            "gamma_mean": float(g.mean),
+            "gamma_variance": float(g.variance),
+            "dt": dt,
+        }
+    b = OnlineStats()
+    for ch in iter_series(b_series, chunk_size):
+        b.update_many(ch)
+    if b.count:
+        out.b_stats = {"b_mean_T": float(b.mean), "b_rms_fraction": float(b.ripple())}
+    ne_max, E_sum, n_E = -np.inf, 0.0, 0
+    for ch in iter_series(E_mag, chunk_size):
+        if ch.size == 0:
+            continue
+        ne_max = max(ne_max, float(np.max(estimate_density_from_em(ch, gamma=1.0, Emin=0.0, ne_min=0.0))))
+        E_sum += float(np.sum(ch))
+        n_E += ch.size
+    if n_E:
+        out.density_stats = {"ne_max_cm3": ne_max}
+        out.E_sum = E_sum
+    th = replace(Thresholds(), gamma_min=float(gamma_threshold), gamma_duration_s=float(gamma_duration),
+                 density_min_cm3=float(density_threshold), b_ripple_max_pct=float(b_ripple_max),
+                 b_field_min_T=float(b_min))
+    res = evaluate_gates(out.summary(), [gt for gt in feasibility_gates(th) if gt.required])
+    out.gamma_ok = bool(res.column("gamma_ok")[0])
+    out.b_ok = bool(res.column("b_mean_ok")[0] and res.column("b_ripple_ok")[0])
+    out.dens_ok = bool(res.column("dens_ok")[0])
+    return out
@@ -0,0 +1,402 @@
+"""Long-lived local gate/KPI service with a thin client.
+
+Scripts that run feasibility -> KPI -> gate once per scenario pay
+interpreter start-up, NumPy import and JSON file round-trips on every step.
+The service keeps ``reactor`` imported and metrics/threshold/cost-model files
+loaded (re-read only when their mtime changes), and answers requests over a
+local socket.
+
+Protocol: one JSON object per line in each direction on a Unix socket (or
+TCP on 127.0.0.1). A request is ``{"op": ..., "params": {...}, "id": ...}``;
+the reply is ``{"id": ..., "ok": true, "result": ...}`` or
+``{"id": ..., "ok": false, "error": "..."}``. A connection may carry any
+number of requests.
+
+The service has no authentication, so TCP is refused on anything but a
+loopback host, and file arguments (series files included) must resolve
+inside the service root (``--root``, default its working directory).
+``ServiceClient`` makes relative path arguments absolute against the
+caller's working directory before sending them.
+
+Ops: ``ping``, ``feasibility`` (``reports.feasibility_report`` keyword
+arguments), ``gate`` (feasibility reports against metrics, as
+``metrics_gate.py``), ``gates`` (``reactor.gates`` over run columns), ``kpi``
+(as ``production_kpi.py``), ``stats`` and ``shutdown``. Report/metrics
+arguments accept either a dict or a file path; ``out`` writes the result.
+
+Example::
+
+    python -m reactor.service --address /tmp/reactor.sock &
+    with ServiceClient("/tmp/reactor.sock") as c:
+        rep = c.call("feasibility", gamma_series="[150,150]", dt=0.002, out="feas.json")
+"""
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import replace
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from .gates import evaluate_gates, feasibility_gates
+from .reports import count_anomalies, feasibility_report, gate_reports, production_kpi
+from .thresholds import Thresholds
+
+ENV_ADDRESS = "REACTOR_SERVICE"
+Address = Union[str, Tuple[str, int]]
+
+# Request parameters that name files (a string value is a path, anything else is inline data)
+PATH_PARAMS = ("out", "report", "reports", "metrics", "feasibility", "uq", "cost_model", "anomalies_ndjson")
+# Series specs (``reactor.series``): inline JSON arrays, or a file path with an optional ``:member``/``:column``
+SERIES_PARAMS = ("gamma_series", "b_series", "E_mag")
+
+
+class ServiceError(RuntimeError):
+    """Raised by ``ServiceClient.call`` when the service reports an error."""
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address: str) -> Tuple[int, Address]:
+    """``host:port`` / ``tcp:host:port`` -> TCP, anything else (``unix:path`` or a path) -> Unix socket.
+
+    Raises ValueError for a TCP host that is not loopback.
+    """
+    a = str(address)
+    if a.startswith("unix:"):
+        return socket.AF_UNIX, a[5:]
+    if a.startswith("tcp:"):
+        a = a[4:]
+    host, sep, port = a.rpartition(":")
+    if sep and port.isdigit() and "/" not in a:
+        host = host or "127.0.0.1"
+        if not _is_loopback(host):
+            raise ValueError(f"refusing TCP host {host!r}: the service only listens on loopback addresses")
+        return socket.AF_INET, (host, int(port))
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError(f"Unix sockets are unavailable here; use host:port instead of {address!r}")
+    return socket.AF_UNIX, a
+
+
+def _dumps(obj: Any) -> bytes:
+    return (json.dumps(obj, default=lambda o: np.asarray(o).tolist()) + "\n").encode("utf-8")
+
+
+class GateService:
+    """Request dispatcher with warm file state; usable directly without a socket.
+
+    Relative paths resolve against ``root`` (default: the current directory) and
+    paths outside it are refused with PermissionError.
+    """
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = os.path.realpath(root or os.getcwd())
+        self._files: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.ops: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "ping": self._ping,
+            "feasibility": self._feasibility,
+            "gate": self._gate,
+            "gates": self._gates,
+            "kpi": self._kpi,
+            "stats": self._stats,
+        }
+
+    def path(self, value: str) -> str:
+        """``value`` resolved against the service root; PermissionError when it lies outside."""
+        p = os.path.realpath(os.path.join(self.root, os.fspath(value)))
+        if os.path.commonpath([self.root, p]) != self.root:
+            raise PermissionError(f"{value!r} is outside the service root {self.root}")
+        return p
+
+    def series(self, spec: Any) -> Any:
+        """Series spec with its file part resolved by ``path``; inline arrays pass through."""
+        if not isinstance(spec, str) or not spec.strip() or spec.lstrip().startswith("["):
+            return spec
+        path, opt = spec, None
+        if ":" in spec and not os.path.exists(os.path.join(self.root, spec)):
+            head, tail = spec.rsplit(":", 1)
+            if os.path.exists(os.path.join(self.root, head)):
+                path, opt = head, tail
+        full = self.path(path)
+        return full if opt is None else f"{full}:{opt}"
+
+    def load_json(self, path: str, default: Any = None) -> Any:
+        """JSON file contents, cached until the file's mtime or size changes; ``default`` when unreadable."""
+        path = self.path(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return default
+        with self._lock:
+            hit = self._files.get(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.loads(f.read().strip())
+        except Exception:
+            return default
+        with self._lock:
+            self._files[path] = (stamp, data)
+        return data
+
+    def _doc(self, value: Any, default: Any = None) -> Any:
+        return self.load_json(value, default) if isinstance(value, str) else (default if value is None else value)
+
+    def _thresholds(self, params: Dict[str, Any]) -> Thresholds:
+        th = Thresholds()
+        data = self._doc(params.get("metrics"), {}) or {}
+        data = {**data, **(params.get("thresholds") or {})}
+        known = {k: float(v) for k, v in data.items() if k in vars(th)}
+        return replace(th, **known) if known else th
+
+    def _write(self, params: Dict[str, Any], result: Any) -> Any:
+        out = params.get("out")
+        if out:
+            out = self.path(out)
+            parent = os.path.dirname(os.path.abspath(out))
+            os.makedirs(parent, exist_ok=True)
+            with open(out, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, default=lambda o: np.asarray(o).tolist())
+        return result
+
+    def _ping(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            from reactor import __version__
+            version = str(__version__)
+        except Exception:
+            version = "unknown"
+        return {"pid": os.getpid(), "version": version, "uptime_s": time.time() - self.started}
+
+    def _stats(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"requests": self.requests, "errors": self.errors, "cached_files": sorted(self._files),
+                "uptime_s": time.time() - self.started}
+
+    def _feasibility(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        kw = {k: v for k, v in params.items() if k not in ("out", "metrics", "thresholds")}
+        for k in SERIES_PARAMS:
+            if isinstance(kw.get(k), (list, tuple)):
+                kw[k] = json.dumps(list(kw[k]))
+            elif k in kw:
+                kw[k] = self.series(kw[k])
+        if "metrics" in params or "thresholds" in params:
+            kw["thresholds"] = self._thresholds(params)
+        return self._write(params, feasibility_report(**kw))
+
+    def _gate(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        reports = params.get("reports")
+        if reports is None:
+            reports = [params.get("report", "feasibility_gates_report.json")]
+        docs = [self._doc(r) for r in reports]
+        metrics = self._doc(params.get("metrics", "metrics.json"))
+        for name, doc in [("metrics", metrics), *zip(map(str, reports), docs, strict=True)]:
+            if not isinstance(doc, dict):
+                raise ValueError(f"{name} load failed")
+        ok, reasons = gate_reports(docs, metrics, bool(params.get("require_yield", False)), params.get("scenario"))
+        return {"gate": "feasibility", "ok": all(ok), "results": [{"ok": o, "reasons": r} for o, r in
+                                                                   zip(ok, reasons, strict=True)]}
+
+    def _gates(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        th = self._thresholds(params)
+        res = evaluate_gates(params["columns"], feasibility_gates(th, yield_min=float(params.get("yield_min", 1e8))))
+        return self._write(params, {"summary": res.summary(), "rows": res.rows()})
+
+    def _kpi(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        feas = self._doc(params.get("feasibility", "feasibility_gates_report.json"), {}) or {}
+        mets = self._doc(params.get("metrics", "metrics.json"), {}) or {}
+        uq = self._doc(params.get("uq", "uq_optimized.json"), {}) or {}
+        cost = self._doc(params.get("cost_model", "configs/cost_model.json"), {}) or {}
+        counts = count_anomalies(self.path(params.get("anomalies_ndjson", "docs/timeline_anomalies.ndjson")))
+        return self._write(params, production_kpi(feas, mets, uq, cost, counts))
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        rid = request.get("id")
+        self.requests += 1
+        op = request.get("op")
+        fn = self.ops.get(op) if isinstance(op, str) else None
+        if fn is None:
+            self.errors += 1
+            return {"id": rid, "ok": False, "error": f"unknown op {op!r}; expected one of {sorted(self.ops)}"}
+        try:
+            return {"id": rid, "ok": True, "result": fn(dict(request.get("params") or {}))}
+        except Exception as e:
+            self.errors += 1
+            return {"id": rid, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        service: GateService = self.server.service  # type: ignore[attr-defined]
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                req = json.loads(line)
+            except ValueError as e:
+                self.wfile.write(_dumps({"id": None, "ok": False, "error": f"bad request: {e}"}))
+                continue
+            if req.get("op") == "shutdown":
+                self.wfile.write(_dumps({"id": req.get("id"), "ok": True, "result": "shutting down"}))
+                self.wfile.flush()
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            self.wfile.write(_dumps(service.handle(req)))
+            self.wfile.flush()
+
+
+def make_server(address: str, service: Optional[GateService] = None) -> socketserver.BaseServer:
+    """Bound (not yet serving) threaded server for ``address``; a stale Unix socket file is replaced."""
+    family, addr = parse_address(address)
+    if family == socket.AF_INET:
+        server: socketserver.BaseServer = socketserver.ThreadingTCPServer(addr, _Handler)
+    else:
+        if os.path.exists(addr):
+            os.unlink(addr)
+        server = socketserver.ThreadingUnixStreamServer(addr, _Handler)
+    server.daemon_threads = True  # type: ignore[attr-defined]
+    server.service = service or GateService()  # type: ignore[attr-defined]
+    return server
+
+
+def serve(address: str, service: Optional[GateService] = None) -> None:
+    """Serve until a ``shutdown`` request (or KeyboardInterrupt)."""
+    server = make_server(address, service)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        server.server_close()
+        family, addr = parse_address(address)
+        if family != socket.AF_INET and os.path.exists(addr):
+            os.unlink(addr)
+
+
+def _absolute(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_absolute(v) for v in value]
+    return os.path.abspath(value) if isinstance(value, (str, os.PathLike)) else value
+
+
+def _absolute_series(value: Any) -> Any:
+    if isinstance(value, str) and value.strip() and not value.lstrip().startswith("["):
+        return os.path.abspath(value)  # a ``:member`` suffix rides along unchanged
+    return value
+
+
+class ServiceClient:
+    """Blocking client holding one connection; ``call`` returns the result or raises ServiceError.
+
+    String values of ``PATH_PARAMS``, and ``SERIES_PARAMS`` that name files, are
+    sent as absolute paths, so they mean the same file to the service as to the caller.
+    """
+
+    def __init__(self, address: str, timeout: float = 60.0) -> None:
+        self.address = address
+        self.timeout = float(timeout)
+        self._sock: Optional[socket.socket] = None
+        self._rfile: Any = None
+        self._next_id = 0
+
+    def _connect(self) -> None:
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(addr)
+        self._sock, self._rfile = sock, sock.makefile("rb")
+
+    def call(self, op: str, **params: Any) -> Any:
+        if self._sock is None:
+            self._connect()
+        self._next_id += 1
+        assert self._sock is not None
+        params = {k: _absolute(v) if k in PATH_PARAMS else _absolute_series(v) if k in SERIES_PARAMS else v
+                  for k, v in params.items()}
+        self._sock.sendall(_dumps({"op": op, "params": params, "id": self._next_id}))
+        line = self._rfile.readline()
+        if not line:
+            self.close()
+            raise ServiceError(f"service at {self.address} closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise ServiceError(reply.get("error", "unknown error"))
+        return reply.get("result")
+
+    def close(self) -> None:
+        if self._rfile is not None:
+            self._rfile.close()
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._rfile = None
+
+    def __enter__(self) -> "ServiceClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def wait_ready(address: str, timeout: float = 15.0) -> bool:
+    """Poll ``ping`` until the service answers or ``timeout`` seconds pass."""
+    deadline = time.monotonic() + float(timeout)
+    while time.monotonic() < deadline:
+        try:
+            with ServiceClient(address, timeout=1.0) as c:
+                c.call("ping")
+            return True
+        except (OSError, ServiceError):
+            time.sleep(0.05)
+    return False
+
+
+def spawn(address: str, timeout: float = 15.0, root: Optional[str] = None) -> subprocess.Popen:
+    """Start ``python -m reactor.service`` (rooted at ``root``, default cwd) and wait until it answers."""
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    cmd = [sys.executable, "-m", "reactor.service", "--address", address, "--root", root or os.getcwd()]
+    proc = subprocess.Popen(cmd, env=env)
+    if not wait_ready(address, timeout):
+        proc.kill()
+        raise ServiceError(f"service at {address} did not start within {timeout}s")
+    return proc
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Serve feasibility/gate/KPI requests on a local socket")
+    ap.add_argument(
+        "--address",
+        default=os.environ.get(ENV_ADDRESS, "reactor.sock"),
+        help="Unix socket path (or unix:PATH), or host:port for TCP on a loopback host",
+    )
+    ap.add_argument("--root", default=None, help="Directory requests may read and write under (default: cwd)")
+    args = ap.parse_args()
+    service = GateService(args.root)
+    print(json.dumps({"serving": args.address, "root": service.root, "pid": os.getpid()}), flush=True)
+    serve(args.address, service)
+
+
+if __name__ == "__main__":
+    main()
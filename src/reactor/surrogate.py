@@ -0,0 +1,411 @@
+"""Cheap surrogates for expensive Reactor-driven evaluations (pure NumPy).
+
+Fit a polynomial chaos expansion (Legendre, total degree) or a Gaussian
+process (squared-exponential kernel) to a small design of real model runs,
+check it with k-fold cross-validation, then query it in place of the model.
+``FallbackModel`` wraps a fitted surrogate as a columnar ``eval_fn`` (usable by
+``reactor.sweep`` and ``reactor.uq.run_uq_vectorized``) that sends points whose
+predictive std exceeds a tolerance back to the real model. ``fallback_model``
+does both steps; ``uq_optimize.py --production --surrogate`` and
+``envelope_sweep.py --surrogate`` use it.
+
+Inputs are named columns (dicts of arrays, as in the sweep/UQ engines) or an
+(n, d) array in ``names`` order; inputs listed in ``log_params`` are modelled
+in log10 space, and ``log_y`` fits log10 of a positive output.
+
+Example::
+
+    sur, cv = fit_surrogate(model, {"n_e": (1e19, 1e21), "T_e": (5, 50)}, "fom",
+                            n_design=64, log_params=["n_e"], log_y=True)
+    run_uq_vectorized(10**6, 0, ranges, FallbackModel(sur, model, "fom", max_std=0.05))
+"""
+
+from __future__ import annotations
+
+import itertools
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+Columns = Dict[str, np.ndarray]
+ModelFn = Callable[[Columns], Dict[str, Any]]
+
+
+class _Surrogate(ABC):
+    """Shared input/output scaling; subclasses implement _fit/_predict on unit-cube inputs.
+
+    An unfitted surrogate predicts 0 with infinite std, so ``FallbackModel``
+    sends every point to the real model.
+    """
+
+    def __init__(
+        self,
+        bounds: Dict[str, Tuple[float, float]],
+        log_params: Sequence[str] = (),
+        log_y: bool = False,
+    ) -> None:
+        self.names = list(bounds)
+        self.log_params = tuple(log_params)
+        self.log_y = bool(log_y)
+        lo, hi = [], []
+        for k in self.names:
+            a, b = (float(v) for v in bounds[k])
+            if k in self.log_params:
+                a, b = np.log10(a), np.log10(b)
+            lo.append(a)
+            hi.append(b)
+        self._lo = np.array(lo)
+        self._span = np.where(np.array(hi) > self._lo, np.array(hi) - self._lo, 1.0)
+        self._y_mu = 0.0
+        self._y_sd = 1.0
+        self.X_train = np.empty((0, len(self.names)))
+        self.y_train = np.empty(0)
+
+    @property
+    def n_train(self) -> int:
+        return int(len(self.y_train))
+
+    def _matrix(self, X: Any) -> np.ndarray:
+        if isinstance(X, dict):
+            X = np.stack([np.asarray(X[k], dtype=float) for k in self.names], axis=1)
+        return np.atleast_2d(np.asarray(X, dtype=float))
+
+    def _unit(self, X: Any) -> np.ndarray:
+        X = self._matrix(X).copy()
+        for j, k in enumerate(self.names):
+            if k in self.log_params:
+                X[:, j] = np.log10(X[:, j])
+        return (X - self._lo) / self._span
+
+    def fit(self, X: Any, y: Any) -> "_Surrogate":
+        self.X_train = self._matrix(X).copy()
+        self.y_train = np.asarray(y, dtype=float).reshape(-1).copy()
+        U = self._unit(self.X_train)
+        t = self.y_train
+        if self.log_y:
+            t = np.log10(t)
+        self._y_mu = float(np.mean(t))
+        self._y_sd = float(np.std(t)) or 1.0
+        self._fit(U, (t - self._y_mu) / self._y_sd)
+        return self
+
+    def predict(self, X: Any, return_std: bool = False) -> Any:
+        """Mean prediction (and std in the fitted space, i.e. log10 units when ``log_y``)."""
+        U = self._unit(X)
+        if self.n_train == 0:
+            mu, sd = np.zeros(len(U)), np.full(len(U), np.inf)
+        else:
+            mu, sd = self._predict(U)
+        mu = mu * self._y_sd + self._y_mu
+        sd = sd * self._y_sd
+        if self.log_y:
+            mu = np.power(10.0, mu)
+        return (mu, sd) if return_std else mu
+
+    @abstractmethod
+    def _fit(self, U: np.ndarray, t: np.ndarray) -> None:
+        """Fit to unit-cube inputs ``U`` (n, d) and standardized targets ``t``."""
+
+    @abstractmethod
+    def _predict(self, U: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Standardized (mean, std) at unit-cube inputs ``U``."""
+
+
+def _legendre(z: np.ndarray, degree: int) -> np.ndarray:
+    """P_0..P_degree at z in [-1, 1], orthonormal under the uniform measure; shape (degree+1, *z.shape)."""
+    P = np.empty((degree + 1,) + z.shape)
+    P[0] = 1.0
+    if degree >= 1:
+        P[1] = z
+    for n in range(1, degree):
+        P[n + 1] = ((2 * n + 1) * z * P[n] - n * P[n - 1]) / (n + 1)
+    return P * np.sqrt(2 * np.arange(degree + 1) + 1.0).reshape((-1,) + (1,) * z.ndim)
+
+
+class PolynomialChaos(_Surrogate):
+    """Total-degree Legendre PCE fitted by (ridge) least squares.
+
+    Predictive std is the least-squares prediction standard error
+    (residual variance times phi^T (Phi^T Phi)^-1 phi). With no more design
+    points than basis terms the residual variance is undefined and the std
+    is infinite.
+    """
+
+    def __init__(
+        self,
+        bounds: Dict[str, Tuple[float, float]],
+        degree: int = 3,
+        log_params: Sequence[str] = (),
+        log_y: bool = False,
+        ridge: float = 1e-10,
+    ) -> None:
+        super().__init__(bounds, log_params, log_y)
+        self.degree = int(degree)
+        self.ridge = float(ridge)
+        d = len(self.names)
+        self.multi_indices = np.array(
+            [m for m in itertools.product(range(self.degree + 1), repeat=d) if sum(m) <= self.degree],
+            dtype=np.int64,
+        ).reshape(-1, d)
+        self.coef = np.zeros(len(self.multi_indices))
+        self._cov = np.zeros((len(self.coef), len(self.coef)))
+        self._determined = False
+
+    def _basis(self, U: np.ndarray) -> np.ndarray:
+        P = _legendre(2.0 * U - 1.0, self.degree)  # (degree+1, n, d)
+        Phi = np.ones((U.shape[0], len(self.multi_indices)))
+        for j in range(U.shape[1]):
+            Phi *= P[self.multi_indices[:, j], :, j].T
+        return Phi
+
+    def _fit(self, U: np.ndarray, t: np.ndarray) -> None:
+        Phi = self._basis(U)
+        n, m = Phi.shape
+        A = Phi.T @ Phi + self.ridge * np.eye(m)
+        A_inv = np.linalg.pinv(A)
+        self.coef = A_inv @ (Phi.T @ t)
+        self._determined = n > m
+        if self._determined:
+            rss = float(np.sum((Phi @ self.coef - t) ** 2))
+            self._cov = A_inv * (rss / (n - m))
+
+    def _predict(self, U: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        Phi = self._basis(U)
+        if not self._determined:
+            return Phi @ self.coef, np.full(len(U), np.inf)
+        var = np.einsum("ij,jk,ik->i", Phi, self._cov, Phi)
+        return Phi @ self.coef, np.sqrt(np.maximum(var, 0.0))
+
+    def sobol_indices(self) -> Dict[str, float]:
+        """First-order Sobol indices read off the coefficients (inputs uniform on their bounds)."""
+        c2 = self.coef ** 2
+        nonconst = self.multi_indices.sum(axis=1) > 0
+        total = float(np.sum(c2[nonconst])) or 1.0
+        out = {}
+        for j, k in enumerate(self.names):
+            only_j = (self.multi_indices[:, j] > 0) & (self.multi_indices.sum(axis=1) == self.multi_indices[:, j])
+            out[k] = float(np.sum(c2[only_j]) / total)
+        return out
+
+
+class GaussianProcess(_Surrogate):
+    """Zero-mean GP with an ARD squared-exponential kernel on unit-cube inputs.
+
+    Length scales and noise are chosen by maximizing the log marginal
+    likelihood over a log grid (isotropic), then one coordinate pass per input.
+    """
+
+    _SCALES = np.geomspace(0.03, 3.0, 13)
+    _NOISES = (1e-8, 1e-5, 1e-3, 1e-2)
+
+    def __init__(
+        self,
+        bounds: Dict[str, Tuple[float, float]],
+        log_params: Sequence[str] = (),
+        log_y: bool = False,
+        length_scale: Optional[Sequence[float]] = None,
+        noise: Optional[float] = None,
+    ) -> None:
+        super().__init__(bounds, log_params, log_y)
+        self.length_scale = None if length_scale is None else np.asarray(length_scale, dtype=float)
+        self.noise = noise
+        self._U = np.empty((0, len(self.names)))
+        self._alpha = np.empty(0)
+        self._L_inv = np.empty((0, 0))
+
+    @staticmethod
+    def _kernel(A: np.ndarray, B: np.ndarray, ls: np.ndarray) -> np.ndarray:
+        a, b = A / ls, B / ls
+        d2 = np.sum(a * a, 1)[:, None] + np.sum(b * b, 1)[None, :] - 2.0 * a @ b.T
+        return np.exp(-0.5 * np.maximum(d2, 0.0))
+
+    def _lml(self, U: np.ndarray, t: np.ndarray, ls: np.ndarray, noise: float) -> float:
+        K = self._kernel(U, U, ls) + noise * np.eye(len(t))
+        try:
+            L = np.linalg.cholesky(K)
+        except np.linalg.LinAlgError:
+            return -np.inf
+        z = np.linalg.solve(L, t)
+        return float(-0.5 * z @ z - np.sum(np.log(np.diag(L))))
+
+    def _fit(self, U: np.ndarray, t: np.ndarray) -> None:
+        d = U.shape[1]
+        if self.length_scale is not None and self.noise is not None:
+            ls, noise = np.broadcast_to(self.length_scale, (d,)).astype(float), float(self.noise)
+        else:
+            noises = self._NOISES if self.noise is None else (float(self.noise),)
+            best = max(((self._lml(U, t, np.full(d, s), nz), s, nz) for s in self._SCALES for nz in noises),
+                       key=lambda r: r[0])
+            ls, noise = np.full(d, best[1]), best[2]
+            for j in range(d):
+                cands = []
+                for f in (0.25, 0.5, 1.0, 2.0, 4.0, 8.0):
+                    trial = ls.copy()
+                    trial[j] = ls[j] * f
+                    cands.append((self._lml(U, t, trial, noise), trial))
+                ls = max(cands, key=lambda r: r[0])[1]
+        self.length_scale, self.noise = ls, noise
+        K = self._kernel(U, U, ls) + noise * np.eye(len(t))
+        L = np.linalg.cholesky(K)
+        self._L_inv = np.linalg.solve(L, np.eye(len(t)))
+        self._alpha = self._L_inv.T @ (self._L_inv @ t)
+        self._U = U
+
+    def _predict(self, U: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        Ks = self._kernel(U, self._U, np.asarray(self.length_scale))
+        v = self._L_inv @ Ks.T
+        var = 1.0 - np.sum(v * v, axis=0)
+        return Ks @ self._alpha, np.sqrt(np.maximum(var, 0.0))
+
+
+def _take_rows(X: Any, idx: np.ndarray) -> Any:
+    if isinstance(X, dict):
+        return {k: np.asarray(v)[idx] for k, v in X.items()}
+    return np.asarray(X)[idx]
+
+
+def cross_validate(
+    make: Callable[[], _Surrogate],
+    X: Any,
+    y: Any,
+    folds: int = 5,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """k-fold CV of a surrogate factory; errors are in the fitted space (log10 when ``log_y``)."""
+    y = np.asarray(y, dtype=float).reshape(-1)
+    n = len(y)
+    k = max(2, min(int(folds), n))
+    parts = np.array_split(np.random.default_rng(int(seed)).permutation(n), k)
+    pred = np.empty(n)
+    log_y = False
+    for test in parts:
+        train = np.setdiff1d(np.arange(n), test)
+        model = make().fit(_take_rows(X, train), y[train])
+        log_y = model.log_y
+        pred[test] = model.predict(_take_rows(X, test))
+    truth = np.log10(y) if log_y else y
+    est = np.log10(pred) if log_y else pred
+    err = est - truth
+    rmse = float(np.sqrt(np.mean(err ** 2)))
+    return {
+        "rmse": rmse,
+        "nrmse": rmse / (float(np.std(truth)) or 1.0),
+        "max_abs": float(np.max(np.abs(err))),
+        "folds": k,
+    }
+
+
+def fit_surrogate(
+    model: ModelFn,
+    param_ranges: Dict[str, Tuple[float, float]],
+    output: str,
+    kind: str = "gp",
+    n_design: int = 64,
+    seed: int = 0,
+    method: str = "lhs",
+    log_params: Sequence[str] = (),
+    log_y: bool = False,
+    folds: int = 5,
+    **options: Any,
+) -> Tuple[_Surrogate, Dict[str, float]]:
+    """Evaluate ``model`` (columnar) on an LHS/Sobol design, fit a surrogate for ``output``, return (surrogate, cv)."""
+    from .uq import iter_design, scale_design
+
+    U = np.concatenate(list(iter_design(n_design, len(param_ranges), method, seed)))
+    X = scale_design(U, param_ranges, log_params)
+    y = np.broadcast_to(np.asarray(model(X)[output], dtype=float), (len(U),))
+
+    def make() -> _Surrogate:
+        if kind == "gp":
+            return GaussianProcess(param_ranges, log_params, log_y, **options)
+        if kind == "pce":
+            return PolynomialChaos(param_ranges, log_params=log_params, log_y=log_y, **options)
+        raise ValueError(f"unknown surrogate kind {kind!r}; expected 'gp' or 'pce'")
+
+    cv = cross_validate(make, X, y, folds=folds, seed=seed)
+    return make().fit(X, y), cv
+
+
+class FallbackModel:
+    """Columnar eval_fn: surrogate where confident, the real ``model`` where predictive std > ``max_std``.
+
+    Returns ``{output: values, output + "_std": std, "surrogate": mask}``; fallback
+    rows get std 0. ``max_std`` is in the fitted space (log10 units when ``log_y``).
+    With ``refit_every`` > 0 the surrogate is refit on all real evaluations once
+    that many new fallback points have accumulated.
+    """
+
+    def __init__(
+        self,
+        surrogate: _Surrogate,
+        model: ModelFn,
+        output: str,
+        max_std: float,
+        refit_every: int = 0,
+    ) -> None:
+        self.surrogate = surrogate
+        self.model = model
+        self.output = output
+        self.max_std = float(max_std)
+        self.refit_every = int(refit_every)
+        self.n_surrogate = 0
+        self.n_model = 0
+        self._new_X: List[np.ndarray] = []
+        self._new_y: List[np.ndarray] = []
+
+    def __call__(self, cols: Columns) -> Dict[str, Any]:
+        mu, sd = self.surrogate.predict(cols, return_std=True)
+        mu = np.asarray(mu, dtype=float).copy()
+        sd = np.asarray(sd, dtype=float).copy()
+        bad = sd > self.max_std
+        if bad.any():
+            sub = {k: np.asarray(v)[bad] for k, v in cols.items()}
+            real = np.broadcast_to(np.asarray(self.model(sub)[self.output], dtype=float), (int(bad.sum()),))
+            mu[bad] = real
+            sd[bad] = 0.0
+            self._new_X.append(self.surrogate._matrix(sub))
+            self._new_y.append(real.copy())
+            if self.refit_every and sum(len(r) for r in self._new_y) >= self.refit_every:
+                self.refit()
+        self.n_model += int(bad.sum())
+        self.n_surrogate += int((~bad).sum())
+        return {self.output: mu, self.output + "_std": sd, "surrogate": ~bad}
+
+    def refit(self) -> None:
+        """Refit the surrogate on its training set plus all fallback evaluations so far."""
+        if not self._new_y:
+            return
+        s = self.surrogate
+        s.fit(np.concatenate([s.X_train] + self._new_X), np.concatenate([s.y_train] + self._new_y))
+        self._new_X, self._new_y = [], []
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.n_surrogate + self.n_model
+        return {
+            "surrogate": self.n_surrogate,
+            "model": self.n_model,
+            "surrogate_fraction": self.n_surrogate / total if total else 0.0,
+        }
+
+
+def fallback_model(
+    model: ModelFn,
+    param_ranges: Dict[str, Tuple[float, float]],
+    output: str,
+    max_std: float,
+    kind: str = "gp",
+    n_design: int = 64,
+    seed: int = 0,
+    log_params: Sequence[str] = (),
+    log_y: bool = False,
+    refit_every: int = 0,
+    **options: Any,
+) -> Tuple[FallbackModel, Dict[str, float]]:
+    """``fit_surrogate`` then wrap it in a ``FallbackModel``; returns (eval_fn, cv).
+
+    This is the hook the UQ and envelope scripts use for ``--surrogate``.
+    """
+    sur, cv = fit_surrogate(model, param_ranges, output, kind=kind, n_design=n_design, seed=seed,
+                            log_params=log_params, log_y=log_y, **options)
+    return FallbackModel(sur, model, output, max_std, refit_every=refit_every), cv
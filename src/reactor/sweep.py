@@ -0,0 +1,309 @@
+"""Vectorized cartesian-product sweeps with columnar, chunked results.
+
+A sweep is a list of named axes plus an ``evaluate`` callable that maps a
+dict of flat input columns to a dict of output columns. Points are enumerated
+in ``itertools.product`` order (last axis fastest) and materialized lazily in
+chunks, so very large grids never hold more than one chunk of inputs and
+outputs in memory. Writers stream chunks straight to CSV/JSON/JSONL.
+
+Example::
+
+    axes = [Axis.geomspace("n_e", 1e19, 1e21, 50), Axis.linspace("T_e", 5, 50, 50)]
+    cols = run_sweep(axes, lambda c: {"yield": antiproton_yield_vec(c["n_e"], c["T_e"])})
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+Columns = Dict[str, np.ndarray]
+EvalFn = Callable[[Columns], Dict[str, Any]]
+PointFn = Callable[[Dict[str, Any], np.random.Generator], Dict[str, Any]]
+
+DEFAULT_CHUNK = 1 << 16
+
+
+@dataclass(frozen=True)
+class Axis:
+    name: str
+    values: np.ndarray = field(compare=False)
+
+    @classmethod
+    def linspace(cls, name: str, start: float, stop: float, num: int) -> "Axis":
+        return cls(name, np.linspace(float(start), float(stop), int(num)))
+
+    @classmethod
+    def geomspace(cls, name: str, start: float, stop: float, num: int) -> "Axis":
+        return cls(name, np.geomspace(float(start), float(stop), int(num)))
+
+    @classmethod
+    def explicit(cls, name: str, values: Iterable[Any]) -> "Axis":
+        return cls(name, np.asarray(list(values)))
+
+    def __len__(self) -> int:
+        return int(np.asarray(self.values).size)
+
+
+def grid_shape(axes: Sequence[Axis]) -> tuple[int, ...]:
+    return tuple(len(a) for a in axes)
+
+
+def grid_size(axes: Sequence[Axis]) -> int:
+    return int(np.prod(grid_shape(axes), dtype=np.int64)) if axes else 0
+
+
+def points(axes: Sequence[Axis], start: int, stop: int) -> Columns:
+    """Input columns for flat point indices [start, stop) in product order."""
+    idx = np.arange(int(start), int(stop), dtype=np.int64)
+    if idx.size == 0:
+        return {a.name: np.asarray(a.values)[:0] for a in axes}
+    sub = np.unravel_index(idx, grid_shape(axes))
+    return {a.name: np.asarray(a.values)[i] for a, i in zip(axes, sub, strict=True)}
+
+
+def iter_points(
+    axes: Sequence[Axis],
+    chunk_size: int = DEFAULT_CHUNK,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[Columns]:
+    total = grid_size(axes) if stop is None else int(stop)
+    step = max(1, int(chunk_size))
+    for a in range(int(start), total, step):
+        yield points(axes, a, min(a + step, total))
+
+
+def evaluate_chunk(cols: Columns, evaluate: EvalFn) -> Columns:
+    """Merge evaluate(cols) into the input columns, broadcasting scalars to chunk length."""
+    n = len(next(iter(cols.values()))) if cols else 0
+    out: Columns = dict(cols)
+    for k, v in evaluate(cols).items():
+        arr = np.asarray(v)
+        out[k] = np.broadcast_to(arr, (n,)).copy() if arr.ndim == 0 else arr
+    return out
+
+
+def iter_sweep(
+    axes: Sequence[Axis],
+    evaluate: EvalFn,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> Iterator[Columns]:
+    """Yield evaluated columnar chunks; memory is bounded by ``chunk_size``."""
+    for cols in iter_points(axes, chunk_size):
+        yield evaluate_chunk(cols, evaluate)
+
+
+def concat_chunks(chunks: Iterable[Columns]) -> Columns:
+    parts: Dict[str, List[np.ndarray]] = {}
+    for ch in chunks:
+        for k, v in ch.items():
+            parts.setdefault(k, []).append(np.asarray(v))
+    return {k: np.concatenate(v) for k, v in parts.items()}
+
+
+def run_sweep(axes: Sequence[Axis], evaluate: EvalFn, chunk_size: int = DEFAULT_CHUNK) -> Columns:
+    """Evaluate the full grid and return a dict of equal-length arrays."""
+    return concat_chunks(iter_sweep(axes, evaluate, chunk_size))
+
+
+def filter_chunks(chunks: Iterable[Columns], predicate: Callable[[Columns], np.ndarray]) -> Iterator[Columns]:
+    """Keep rows where predicate(chunk) is True."""
+    for ch in chunks:
+        mask = np.asarray(predicate(ch), dtype=bool)
+        yield {k: np.asarray(v)[mask] for k, v in ch.items()}
+
+
+def to_structured(cols: Columns) -> np.ndarray:
+    """Columns -> NumPy structured array (one field per column)."""
+    names = list(cols)
+    arrays = [np.asarray(cols[k]) for k in names]
+    out = np.empty(len(arrays[0]) if arrays else 0, dtype=[(k, a.dtype) for k, a in zip(names, arrays, strict=True)])
+    for k, a in zip(names, arrays, strict=True):
+        out[k] = a
+    return out
+
+
+def iter_rows(chunk: Columns, fieldnames: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+    names = list(fieldnames or chunk)
+    lists = [np.asarray(chunk[k]).tolist() for k in names]
+    for vals in zip(*lists, strict=True):
+        yield dict(zip(names, vals, strict=True))
+
+
+# --- per-point parallel execution -------------------------------------------------
+
+def point_rng(seed: int, index: int) -> np.random.Generator:
+    """Independent RNG stream for one grid point, derived from (seed, flat index) only."""
+    return np.random.default_rng(np.random.SeedSequence(int(seed), spawn_key=(int(index),)))
+
+
+def _eval_points(axes: Sequence[Axis], fn: PointFn, seed: int, start: int, stop: int) -> Columns:
+    cols = points(axes, start, stop)
+    names = list(cols)
+    lists = [cols[k].tolist() for k in names]
+    outs: Dict[str, List[Any]] = {}
+    for j, vals in enumerate(zip(*lists, strict=True)):
+        res = fn(dict(zip(names, vals, strict=True)), point_rng(seed, start + j))
+        for k, v in res.items():
+            outs.setdefault(k, []).append(v)
+    for k, v in outs.items():
+        cols[k] = np.asarray(v)
+    return cols
+
+
+def map_points(
+    axes: Sequence[Axis],
+    fn: PointFn,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    start: int = 0,
+    stop: Optional[int] = None,
+    max_pending: Optional[int] = None,
+) -> Iterator[Columns]:
+    """Evaluate ``fn(point, rng)`` for every grid point, yielding columnar chunks in order.
+
+    For per-point work that cannot be vectorized (e.g. constructing and stepping a
+    Reactor). Shards of ``chunk_size`` points go to a ProcessPoolExecutor with at
+    most ``max_pending`` shards in flight (default 2x workers). Each point's RNG is
+    ``point_rng(seed, index)``, so results are bit-identical for any worker count.
+    ``fn`` must be picklable (a module-level function); ``workers <= 1`` runs inline.
+    """
+    total = grid_size(axes) if stop is None else int(stop)
+    step = max(1, int(chunk_size))
+    n_workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if n_workers <= 1 or total - int(start) <= step:
+        for a in range(int(start), total, step):
+            yield _eval_points(axes, fn, seed, a, min(a + step, total))
+        return
+    limit = max(1, int(max_pending or 2 * n_workers))
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        pending: Deque[Future] = deque()
+        it = ((a, min(a + step, total)) for a in range(int(start), total, step))
+        for a, b in it:
+            pending.append(ex.submit(_eval_points, axes, fn, seed, a, b))
+            if len(pending) >= limit:
+                break
+        while pending:
+            done = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(ex.submit(_eval_points, axes, fn, seed, nxt[0], nxt[1]))
+            yield done
+
+
+# --- streaming writers ----------------------------------------------------------
+
+class _Sink:
+    def __init__(self, target: str | IO[str]) -> None:
+        if isinstance(target, str):
+            self._f: IO[str] = open(target, "w", newline="", encoding="utf-8")
+            self._own = True
+        else:
+            self._f = target
+            self._own = False
+
+    def close(self) -> None:
+        if self._own:
+            self._f.close()
+
+
+class _CsvSink(_Sink):
+    def __init__(self, target: str | IO[str], fieldnames: Optional[Sequence[str]]) -> None:
+        super().__init__(target)
+        self._w = csv.writer(self._f)
+        self._names = list(fieldnames) if fieldnames else None
+        if self._names:
+            self._w.writerow(self._names)
+
+    def write(self, chunk: Columns) -> None:
+        if self._names is None:
+            self._names = list(chunk)
+            self._w.writerow(self._names)
+        lists = [np.asarray(chunk[k]).tolist() for k in self._names]
+        self._w.writerows(zip(*lists, strict=True))
+
+
+class _JsonlSink(_Sink):
+    def __init__(self, target: str | IO[str], fieldnames: Optional[Sequence[str]]) -> None:
+        super().__init__(target)
+        self._names = fieldnames
+
+    def write(self, chunk: Columns) -> None:
+        for r in iter_rows(chunk, self._names):
+            self._f.write(json.dumps(r) + "\n")
+
+
+class _JsonSink(_Sink):
+    """Writes {key: [rows...]} identically to json.dump(..., indent=indent)."""
+
+    def __init__(self, target: str | IO[str], fieldnames: Optional[Sequence[str]], key: str,
+                 indent: Optional[int]) -> None:
+        super().__init__(target)
+        self._names = fieldnames
+        self._indent = indent
+        self._first = True
+        self._key = json.dumps(key)
+        if indent is None:
+            self._f.write("{" + self._key + ": [")
+        else:
+            self._f.write("{\n" + " " * indent + self._key + ": [")
+
+    def write(self, chunk: Columns) -> None:
+        ind = self._indent
+        for r in iter_rows(chunk, self._names):
+            if ind is None:
+                self._f.write(("" if self._first else ", ") + json.dumps(r))
+            else:
+                pad = "\n" + " " * (2 * ind)
+                self._f.write(("" if self._first else ",") + pad + json.dumps(r, indent=ind).replace("\n", pad))
+            self._first = False
+
+    def close(self) -> None:
+        if self._indent is None:
+            self._f.write("]}")
+        elif self._first:
+            self._f.write("]\n}")
+        else:
+            self._f.write("\n" + " " * self._indent + "]\n}")
+        super().close()
+
+
+def write_columns(
+    chunks: Iterable[Columns],
+    csv_path: str | IO[str] | None = None,
+    jsonl_path: str | IO[str] | None = None,
+    json_path: str | IO[str] | None = None,
+    json_key: str = "rows",
+    json_indent: Optional[int] = None,
+    fieldnames: Optional[Sequence[str]] = None,
+) -> int:
+    """Stream columnar chunks to any of CSV/JSONL/JSON in a single pass; returns row count.
+
+    Targets may be paths or open text streams. The JSON form is ``{json_key: [rows]}``.
+    """
+    sinks: List[Any] = []
+    try:
+        if csv_path is not None:
+            sinks.append(_CsvSink(csv_path, fieldnames))
+        if jsonl_path is not None:
+            sinks.append(_JsonlSink(jsonl_path, fieldnames))
+        if json_path is not None:
+            sinks.append(_JsonSink(json_path, fieldnames, json_key, json_indent))
+        n = 0
+        for ch in chunks:
+            for s in sinks:
+                s.write(ch)
+            n += len(next(iter(ch.values()))) if ch else 0
+        return n
+    finally:
+        for s in sinks:
+            s.close()
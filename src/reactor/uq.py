@@ -1,8 +1,15 @@
 from __future__ import annotations
 
 import json
+import os
 import random
-from typing import Any, Callable, Dict, List, Tuple
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .analysis_stat import OnlineStats, QuantileSketch
 
 
 def sample_uniform(a: float, b: float, rng: random.Random) -> float:
@@ -26,3 +33,350 @@ def run_uq_sampling(n_samples: int, seed: int, param_ranges: Dict[str, Tuple[flo
 def save_results(path: str, payload: Dict[str, Any]) -> None:
     with open(path, "w", encoding="utf-8") as f:
         json.dump(payload, f, indent=2)
+
+
+# --- vectorized (quasi-)Monte Carlo --------------------------------------------
+
+# Joe & Kuo (2008) direction numbers for Sobol dimensions 2..21: (s, a, m_1..m_s)
+_SOBOL_DIRECTIONS: Tuple[Tuple[int, int, Tuple[int, ...]], ...] = (
+    (1, 0, (1,)), (2, 1, (1, 3)), (3, 1, (1, 3, 1)), (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)), (4, 4, (1, 3, 5, 13)), (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)), (5, 7, (1, 1, 7, 11, 19)), (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)), (5, 14, (1, 3, 5, 5, 31)), (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)), (6, 16, (1, 3, 1, 13, 27, 49)), (6, 19, (1, 1, 1, 15, 7, 5)),
+    (6, 22, (1, 3, 1, 15, 13, 25)), (6, 25, (1, 1, 5, 5, 19, 61)), (7, 1, (1, 3, 7, 11, 23, 15, 103)),
+    (7, 4, (1, 3, 7, 13, 13, 15, 69)),
+)
+_SOBOL_BITS = 32
+SOBOL_MAX_DIM = len(_SOBOL_DIRECTIONS) + 1
+QMC_METHODS = ("uniform", "lhs", "sobol")
+
+
+def _parity(x: np.ndarray) -> np.ndarray:
+    x = x.copy()
+    for s in (32, 16, 8, 4, 2, 1):
+        x ^= x >> np.uint64(s)
+    return x & np.uint64(1)
+
+
+def _sobol_directions(d: int, rng: Optional[np.random.Generator]) -> np.ndarray:
+    """(d, bits) direction integers; with ``rng``, linear-matrix scrambled (Matousek)."""
+    B = _SOBOL_BITS
+    m = np.zeros((d, B), dtype=np.uint64)
+    m[0] = 1
+    for j in range(1, d):
+        s, a, m0 = _SOBOL_DIRECTIONS[j - 1]
+        row = list(m0) + [0] * (B - s)
+        for k in range(s, B):
+            v = row[k - s] ^ (row[k - s] << s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    v ^= row[k - i] << i
+            row[k] = v
+        m[j] = row
+    shifts = np.arange(B - 1, -1, -1, dtype=np.uint64)
+    v = m << shifts[None, :]
+    if rng is None:
+        return v
+    # lower-triangular random bit matrix with unit diagonal, rows as MSB-first masks
+    out = np.zeros_like(v)
+    for j in range(d):
+        for r in range(B):
+            below = rng.integers(0, 1 << r, dtype=np.uint64) if r else np.uint64(0)
+            mask = (np.uint64(below) << np.uint64(B - r)) | (np.uint64(1) << np.uint64(B - 1 - r))
+            out[j] |= _parity(v[j] & mask) << np.uint64(B - 1 - r)
+    return out
+
+
+def sobol_points(n: int, d: int, seed: Optional[int] = None, start: int = 0, scramble: bool = True) -> np.ndarray:
+    """Points ``start .. start+n-1`` of a d-dimensional Sobol sequence in [0, 1).
+
+    Gray-code ordered and computed directly from the index, so consecutive
+    blocks of the same (seed, d) sequence can be drawn independently. With
+    ``scramble`` the sequence gets a seeded linear matrix scramble plus digital
+    shift; balance properties hold for blocks of 2^m points starting at 0.
+    """
+    d = int(d)
+    if not 1 <= d <= SOBOL_MAX_DIM:
+        raise ValueError(f"sobol_points supports 1..{SOBOL_MAX_DIM} dimensions, got {d}")
+    if int(start) + int(n) > (1 << _SOBOL_BITS):
+        raise ValueError("sobol_points is limited to 2**32 points")
+    rng = np.random.default_rng(seed) if scramble else None
+    v = _sobol_directions(d, rng)
+    shift = rng.integers(0, 1 << _SOBOL_BITS, size=d, dtype=np.uint64) if rng is not None else np.zeros(d, np.uint64)
+    idx = np.arange(int(start), int(start) + int(n), dtype=np.uint64)
+    gray = idx ^ (idx >> np.uint64(1))
+    x = np.broadcast_to(shift, (idx.size, d)).copy()
+    top = int(gray.max()).bit_length() if gray.size else 0
+    for k in range(top):
+        # all-ones where bit k of the Gray code is set, so the XOR needs no fancy indexing
+        mask = np.uint64(0) - ((gray >> np.uint64(k)) & np.uint64(1))
+        x ^= mask[:, None] & v[None, :, k]
+    return x.astype(float) / float(1 << _SOBOL_BITS)
+
+
+def latin_hypercube(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    """n x d Latin hypercube in [0, 1): one point per 1/n stratum in every dimension."""
+    n = int(n)
+    perms = np.argsort(rng.random((int(d), n)), axis=1).T
+    return (perms + rng.random((n, int(d)))) / n
+
+
+def iter_design(
+    n_samples: int,
+    d: int,
+    method: str = "sobol",
+    seed: int = 0,
+    batch_size: int = 65536,
+) -> Iterator[np.ndarray]:
+    """Yield (batch, d) blocks of a unit-cube design; the concatenation does not depend on batch_size."""
+    n = int(n_samples)
+    step = max(1, int(batch_size))
+    if method == "uniform":
+        rng = np.random.default_rng(int(seed))
+        for a in range(0, n, step):
+            yield rng.random((min(step, n - a), int(d)))
+    elif method == "lhs":
+        U = latin_hypercube(n, d, np.random.default_rng(int(seed)))
+        for a in range(0, n, step):
+            yield U[a:a + step]
+    elif method == "sobol":
+        for a in range(0, n, step):
+            yield sobol_points(min(step, n - a), d, seed=int(seed), start=a)
+    else:
+        raise ValueError(f"unknown sampling method {method!r}; expected one of {QMC_METHODS}")
+
+
+def scale_design(
+    U: np.ndarray,
+    param_ranges: Dict[str, Tuple[float, float]],
+    log_params: Sequence[str] = (),
+) -> Dict[str, np.ndarray]:
+    """Map unit-cube columns onto named ranges (log-uniform for names in ``log_params``)."""
+    cols: Dict[str, np.ndarray] = {}
+    for j, (k, (a, b)) in enumerate(param_ranges.items()):
+        u = U[:, j]
+        if k in log_params:
+            la, lb = np.log10(float(a)), np.log10(float(b))
+            cols[k] = np.power(10.0, la + (lb - la) * u)
+        else:
+            cols[k] = float(a) + (float(b) - float(a)) * u
+    return cols
+
+
+class UQAggregate:
+    """Mergeable per-output UQ summary: moments, quantile sketch and exceedance counts.
+
+    Nothing per-sample is stored. ``exceed`` maps an output name to thresholds v
+    for which P(output >= v) is tracked.
+    """
+
+    def __init__(self, exceed: Optional[Dict[str, Any]] = None, sketch_k: int = 512, seed: int = 0) -> None:
+        self.exceed = {k: tuple(float(t) for t in np.atleast_1d(v)) for k, v in (exceed or {}).items()}
+        self.sketch_k = int(sketch_k)
+        self.seed = int(seed)
+        self.stats: Dict[str, OnlineStats] = {}
+        self.sketches: Dict[str, QuantileSketch] = {}
+
+    def update(self, outputs: Dict[str, Any], n: int) -> None:
+        for k, v in outputs.items():
+            arr = np.broadcast_to(np.asarray(v, dtype=float), (int(n),))
+            if k not in self.stats:
+                self.stats[k] = OnlineStats(self.exceed.get(k, ()))
+                self.sketches[k] = QuantileSketch(self.sketch_k, seed=self.seed)
+            self.stats[k].update_many(arr)
+            self.sketches[k].update_many(arr)
+
+    def merge(self, other: "UQAggregate") -> "UQAggregate":
+        for k, st in other.stats.items():
+            if k in self.stats:
+                self.stats[k].merge(st)
+                self.sketches[k].merge(other.sketches[k])
+            else:
+                self.stats[k] = OnlineStats(st.thresholds).merge(st)
+                self.sketches[k] = QuantileSketch(other.sketches[k].k).merge(other.sketches[k])
+        return self
+
+    @property
+    def n(self) -> int:
+        return max((s.count for s in self.stats.values()), default=0)
+
+    def halfwidth(self, key: str, z: float = 1.96) -> float:
+        """Normal-approximation CI half-width of the mean of ``key``."""
+        st = self.stats[key]
+        return float(z) * st.std / np.sqrt(st.count) if st.count else float("inf")
+
+    def exceed_halfwidth(self, key: str, threshold: float, z: float = 1.96) -> float:
+        st = self.stats[key]
+        if not st.count:
+            return float("inf")
+        p = st.exceed_fraction(threshold)
+        return float(z) * float(np.sqrt(p * (1.0 - p) / st.count))
+
+    def as_dict(self, quantiles: Sequence[float] = (0.05, 0.5, 0.95), z: float = 1.96) -> Dict[str, Any]:
+        qs = [float(q) for q in quantiles]
+        return {
+            "means": {k: s.mean for k, s in self.stats.items()},
+            "std": {k: s.std for k, s in self.stats.items()},
+            "min": {k: s.min for k, s in self.stats.items()},
+            "max": {k: s.max for k, s in self.stats.items()},
+            "ci_halfwidth": {k: self.halfwidth(k, z) for k in self.stats},
+            "quantiles": {
+                k: dict(zip((str(q) for q in qs), np.asarray(sk.quantile(qs)).tolist(), strict=True))
+                for k, sk in self.sketches.items()
+            },
+            "exceedance": {
+                k: {str(t): {"p": self.stats[k].exceed_fraction(t), "ci_halfwidth": self.exceed_halfwidth(k, t, z)}
+                    for t in ts}
+                for k, ts in self.exceed.items() if k in self.stats
+            },
+        }
+
+
+def run_uq_vectorized(
+    n_samples: int,
+    seed: int,
+    param_ranges: Dict[str, Tuple[float, float]],
+    eval_fn: Callable[[Dict[str, np.ndarray]], Dict[str, Any]],
+    method: str = "sobol",
+    log_params: Sequence[str] = (),
+    batch_size: int = 65536,
+    exceed: Optional[Dict[str, Any]] = None,
+    quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    atol: Optional[float] = None,
+    rtol: Optional[float] = None,
+    exceed_atol: Optional[float] = None,
+    stop_on: Optional[Sequence[str]] = None,
+    min_samples: int = 1024,
+    z: float = 1.96,
+) -> Dict[str, Any]:
+    """Columnar counterpart of ``run_uq_sampling`` for large sample counts.
+
+    ``eval_fn`` receives a dict of parameter arrays for a whole batch and returns
+    a dict of output arrays (or scalars). Per-sample results are not kept; outputs
+    are folded into a UQAggregate, so memory is bounded by ``batch_size``.
+
+    With ``atol``/``rtol`` (and optionally ``exceed_atol``) sampling stops after
+    the first batch, past ``min_samples``, where every output in ``stop_on``
+    (default: all) has a mean CI half-width <= max(atol, rtol*|mean|) and every
+    tracked exceedance probability has half-width <= ``exceed_atol``.
+    ``n_samples`` is then an upper bound. The half-width uses the iid
+    variance, which is conservative for LHS/Sobol designs.
+    """
+    agg = UQAggregate(exceed, seed=int(seed))
+    check = atol is not None or rtol is not None or exceed_atol is not None
+    converged = False
+    for U in iter_design(n_samples, len(param_ranges), method, seed, batch_size):
+        cols = scale_design(U, param_ranges, log_params)
+        agg.update(eval_fn(cols), len(U))
+        if check and agg.n >= int(min_samples):
+            converged = _uq_converged(agg, stop_on, atol, rtol, exceed_atol, z)
+            if converged:
+                break
+    out: Dict[str, Any] = {"n_samples": agg.n, "max_samples": int(n_samples), "method": method}
+    out.update(agg.as_dict(quantiles, z))
+    out["converged"] = converged if check else None
+    return out
+
+
+def _uq_converged(
+    agg: UQAggregate,
+    stop_on: Optional[Sequence[str]],
+    atol: Optional[float],
+    rtol: Optional[float],
+    exceed_atol: Optional[float],
+    z: float,
+) -> bool:
+    for k in (stop_on if stop_on is not None else list(agg.stats)):
+        if atol is None and rtol is None:
+            break
+        tol = max(float(atol or 0.0), float(rtol or 0.0) * abs(agg.stats[k].mean))
+        if agg.halfwidth(k, z) > tol:
+            return False
+    if exceed_atol is not None:
+        for k, ts in agg.exceed.items():
+            if k in agg.stats and any(agg.exceed_halfwidth(k, t, z) > float(exceed_atol) for t in ts):
+                return False
+    return True
+
+
+# --- parallel per-sample evaluation ---------------------------------------------
+
+def _uq_batch(
+    eval_fn: Callable[[Dict[str, float]], Dict[str, float]],
+    seq: np.random.SeedSequence,
+    param_ranges: Dict[str, Tuple[float, float]],
+    n: int,
+) -> Tuple[List[Dict[str, float]], List[Dict[str, float]]]:
+    rng = np.random.default_rng(seq)
+    keys = list(param_ranges)
+    lo = np.array([float(param_ranges[k][0]) for k in keys])
+    hi = np.array([float(param_ranges[k][1]) for k in keys])
+    params = [dict(zip(keys, row, strict=True)) for row in rng.uniform(lo, hi, size=(int(n), len(keys))).tolist()]
+    return params, [eval_fn(p) for p in params]
+
+
+def run_uq_parallel(
+    n_samples: int,
+    seed: int,
+    param_ranges: Dict[str, Tuple[float, float]],
+    eval_fn: Callable[[Dict[str, float]], Dict[str, float]],
+    workers: Optional[int] = 1,
+    batch_size: int = 64,
+    return_columns: bool = False,
+) -> Dict[str, Any]:
+    """``run_uq_sampling`` with batches of samples optionally dispatched to a process pool.
+
+    Batch ``b`` draws its parameters from ``SeedSequence(seed).spawn(n_batches)[b]``,
+    so output is identical for any worker count given the same ``seed`` and
+    ``batch_size``. The stream differs from ``run_uq_sampling``'s
+    ``random.Random``. The default ``workers=1`` runs inline and accepts any
+    callable; ``workers > 1`` (``None``: os.cpu_count()) needs a picklable,
+    module-level ``eval_fn`` and raises TypeError otherwise. With
+    ``return_columns`` the payload also carries ``params`` and ``columns``:
+    dicts of NumPy arrays in sample order.
+    """
+    n = int(n_samples)
+    step = max(1, int(batch_size))
+    sizes = [min(step, n - a) for a in range(0, n, step)]
+    seqs = np.random.SeedSequence(int(seed)).spawn(len(sizes))
+    n_workers = (os.cpu_count() or 1) if workers is None else int(workers)
+    if n_workers > 1 and len(sizes) > 1:
+        import pickle
+
+        try:
+            pickle.dumps(eval_fn)
+        except Exception as e:
+            raise TypeError(
+                f"eval_fn {eval_fn!r} cannot be sent to worker processes ({e}); "
+                "use a module-level function or workers=1"
+            ) from e
+    params: List[Dict[str, float]] = []
+    results: List[Dict[str, float]] = []
+    if n_workers <= 1 or len(sizes) <= 1:
+        for seq, m in zip(seqs, sizes, strict=True):
+            p, r = _uq_batch(eval_fn, seq, param_ranges, m)
+            params.extend(p)
+            results.extend(r)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as ex:
+            pending: Deque[Future] = deque()
+            jobs = iter(zip(seqs, sizes, strict=True))
+            for seq, m in jobs:
+                pending.append(ex.submit(_uq_batch, eval_fn, seq, param_ranges, m))
+                if len(pending) >= 2 * n_workers:
+                    break
+            while pending:
+                p, r = pending.popleft().result()
+                params.extend(p)
+                results.extend(r)
+                nxt = next(jobs, None)
+                if nxt is not None:
+                    pending.append(ex.submit(_uq_batch, eval_fn, nxt[0], param_ranges, nxt[1]))
+    keys = results[0].keys() if results else []
+    means = {k: sum(r[k] for r in results) / len(results) for k in keys} if results else {}
+    out: Dict[str, Any] = {"n_samples": n_samples, "means": means, "results": results}
+    if return_columns:
+        out["params"] = {k: np.asarray([p[k] for p in params]) for k in param_ranges}
+        out["columns"] = {k: np.asarray([r[k] for r in results]) for k in keys}
+    return out
@@ -0,0 +1,228 @@
+"""Shape-keyed workspace cache for the grid kernels in models/metrics.
+
+A Workspace holds everything that depends only on (shape, dtype, boundary
+condition): scratch buffers, wavenumber tables, Laplacian eigenvalues and
+spectral solve multipliers. Workspaces live in a module-level LRU registry
+bounded by entry count and bytes held, so ensemble and sweep runs that touch
+a few grid shapes many times reuse them instead of rebuilding per call.
+
+Tables are shared and read-only. Scratch buffers are per thread and must not
+escape the kernel that requested them.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import numpy as np
+
+WorkspaceKey = Tuple[Tuple[int, ...], str, str]
+
+
+class Workspace:
+    def __init__(self, shape: Tuple[int, ...], dtype: Any = float, bc: str = "periodic") -> None:
+        self.shape = tuple(int(s) for s in shape)
+        self.dtype = np.dtype(dtype)
+        self.bc = str(bc)
+        self._arrays: Dict[Hashable, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self._owner: WorkspaceCache | None = None
+
+    @property
+    def key(self) -> WorkspaceKey:
+        return (self.shape, self.dtype.str, self.bc)
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(a.nbytes for a in self._arrays.values()))
+
+    def _store(self, name: Hashable, arr: np.ndarray) -> np.ndarray:
+        with self._lock:
+            prev = self._arrays.get(name)
+            if prev is not None:
+                return prev
+            self._arrays[name] = arr
+        if self._owner is not None:
+            self._owner._account(self, arr.nbytes)
+        return arr
+
+    def scratch(self, name: str, shape: Tuple[int, ...] | None = None) -> np.ndarray:
+        """Uninitialized per-thread buffer (default: the workspace shape/dtype)."""
+        key = ("scratch", name, threading.get_ident())
+        buf = self._arrays.get(key)
+        if buf is None:
+            buf = self._store(key, np.empty(self.shape if shape is None else shape, dtype=self.dtype))
+        return buf
+
+    def table(self, name: Hashable, build: Callable[[], np.ndarray]) -> np.ndarray:
+        """Read-only array computed once by ``build`` and shared across threads."""
+        arr = self._arrays.get(("table", name))
+        if arr is None:
+            arr = np.asarray(build())
+            arr.setflags(write=False)
+            arr = self._store(("table", name), arr)
+        return arr
+
+
+class WorkspaceCache:
+    """LRU registry of Workspaces with entry and memory caps plus hit/miss counters."""
+
+    def __init__(self, max_entries: int = 32, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self._entries: OrderedDict[WorkspaceKey, Workspace] = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_held = 0
+
+    def get(self, shape: Tuple[int, ...], dtype: Any = float, bc: str = "periodic") -> Workspace:
+        key: WorkspaceKey = (tuple(int(s) for s in shape), np.dtype(dtype).str, str(bc))
+        with self._lock:
+            ws = self._entries.get(key)
+            if ws is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return ws
+            self.misses += 1
+            ws = Workspace(key[0], dtype, bc)
+            ws._owner = self
+            self._entries[key] = ws
+            self._evict()
+            return ws
+
+    def _account(self, ws: Workspace, nbytes: int) -> None:
+        with self._lock:
+            if self._entries.get(ws.key) is ws:
+                self.bytes_held += int(nbytes)
+                self._evict()
+
+    def _evict(self) -> None:
+        # never evict the most recently used entry, even if it alone exceeds the cap
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.bytes_held > self.max_bytes
+        ):
+            _, old = self._entries.popitem(last=False)
+            old._owner = None
+            self.bytes_held -= old.nbytes
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for ws in self._entries.values():
+                ws._owner = None
+            self._entries.clear()
+            self.bytes_held = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes_held": self.bytes_held,
+            }
+
+
+_CACHE = WorkspaceCache()
+
+
+def get_workspace(shape: Tuple[int, ...], dtype: Any = float, bc: str = "periodic") -> Workspace:
+    return _CACHE.get(shape, dtype, bc)
+
+
+def workspace_stats() -> Dict[str, int]:
+    return _CACHE.stats()
+
+
+def clear_workspaces() -> None:
+    _CACHE.clear()
+
+
+def configure_workspaces(max_entries: int | None = None, max_bytes: int | None = None) -> None:
+    """Adjust the module-level cache caps (evicts immediately if over)."""
+    with _CACHE._lock:
+        if max_entries is not None:
+            _CACHE.max_entries = int(max_entries)
+        if max_bytes is not None:
+            _CACHE.max_bytes = int(max_bytes)
+        _CACHE._evict()
+
+
+# --- periodic stencil helpers -------------------------------------------------
+
+def roll_into(f: np.ndarray, shift: int, axis: int, out: np.ndarray) -> np.ndarray:
+    """out = np.roll(f, shift, axis) without allocating (shift must be +1 or -1)."""
+    n = f.shape[axis]
+    if n < 2:
+        out[...] = f
+        return out
+    lo = [slice(None)] * f.ndim
+    hi = [slice(None)] * f.ndim
+    if shift == 1:
+        lo[axis], hi[axis] = slice(1, None), slice(None, -1)
+        out[tuple(lo)] = f[tuple(hi)]
+        lo[axis], hi[axis] = slice(0, 1), slice(-1, None)
+    else:
+        lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+        out[tuple(lo)] = f[tuple(hi)]
+        lo[axis], hi[axis] = slice(-1, None), slice(0, 1)
+    out[tuple(lo)] = f[tuple(hi)]
+    return out
+
+
+def central_diff_into(f: np.ndarray, axis: int, out: np.ndarray) -> np.ndarray:
+    """out = roll(f, -1, axis) - roll(f, 1, axis) (periodic, unscaled)."""
+    n = f.shape[axis]
+    if n < 3:
+        out[...] = np.roll(f, -1, axis=axis) - np.roll(f, 1, axis=axis)
+        return out
+    sl = [slice(None)] * f.ndim
+
+    def at(s: slice) -> Tuple[slice, ...]:
+        sl[axis] = s
+        return tuple(sl)
+
+    np.subtract(f[at(slice(2, None))], f[at(slice(None, -2))], out=out[at(slice(1, -1))])
+    np.subtract(f[at(slice(1, 2))], f[at(slice(-1, None))], out=out[at(slice(0, 1))])
+    np.subtract(f[at(slice(0, 1))], f[at(slice(-2, -1))], out=out[at(slice(-1, None))])
+    return out
+
+
+# --- spectral tables ------------------------------------------------------------
+
+def wavenumbers(ws: Workspace) -> Tuple[np.ndarray, np.ndarray]:
+    """Angular grid wavenumbers (radians/sample) for an rfft2 over axes (0, 1)."""
+    n0, n1 = ws.shape[0], ws.shape[1]
+    ky = ws.table("ky", lambda: 2.0 * np.pi * np.fft.fftfreq(n0)[:, None])
+    kx = ws.table("kx", lambda: 2.0 * np.pi * np.fft.rfftfreq(n1)[None, :])
+    return kx, ky
+
+
+def laplacian_eigenvalues(ws: Workspace) -> np.ndarray:
+    """Eigenvalues of the periodic 5-point Laplacian on the rfft2 half-spectrum."""
+    def build() -> np.ndarray:
+        kx, ky = wavenumbers(ws)
+        return 2.0 * np.cos(kx) + 2.0 * np.cos(ky) - 4.0
+    return ws.table("lap_eig", build)
+
+
+def jacobi_multiplier(ws: Workspace, n_iter: int) -> np.ndarray:
+    """Spectral transfer function of n_iter periodic Jacobi sweeps for -Laplace(psi) = omega.
+
+    Starting from psi=0, psi_{k+1} = (S psi_k + omega) / 4 with S the 4-neighbour
+    sum (eigenvalue s = lap + 4), so psi_n = omega/4 * sum_{j<n} (s/4)^j.
+    """
+    n = int(n_iter)
+
+    def build() -> np.ndarray:
+        r = (laplacian_eigenvalues(ws) + 4.0) / 4.0
+        geo = np.full(r.shape, float(n))
+        neq = ~np.isclose(r, 1.0, rtol=0.0, atol=1e-14)
+        geo[neq] = (1.0 - r[neq] ** n) / (1.0 - r[neq])
+        return 0.25 * geo
+    return ws.table(("jacobi", n), build)
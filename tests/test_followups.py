@@ -733,6 +733,7 @@ def test_hardware_runner_dry_run(tmp_path):
 
 
 def test_envelope_and_ablation(tmp_path):
+    import json as _json
     import os as _os
     import subprocess
     import sys as _sys
@@ -745,6 +746,11 @@ def test_envelope_and_ablation(tmp_path):
         assert res.returncode == 0
         assert _pl.Path("operating_envelope.json").exists()
         assert _pl.Path("operating_envelope.csv").exists()
+        res = subprocess.run([_sys.executable, str(envs), "--adaptive", "--coarse", "4", "--max-depth", "2",
+                              "--out-json", "adaptive.json"], capture_output=True)
+        assert res.returncode == 0
+        payload = _json.loads(_pl.Path("adaptive.json").read_text())
+        assert payload["n_points"] == len(payload["grid"]) == payload["adaptive"]["n_points"]
         # ablation
         abl = _pl.Path(cwd) / "scripts" / "ablation_ripple.py"
         res2 = subprocess.run([_sys.executable, str(abl), "--n", "1000"], capture_output=True)
@@ -771,3 +777,944 @@ def test_hardware_runner_simulated(tmp_path):
         assert js["ok"] is True and js["steps"] >= 1
     finally:
         _os.chdir(cwd)
+
+
+def test_online_stats_matches_batch_and_merges():
+    from reactor.analysis_stat import OnlineStats
+    from reactor.metrics import stability_duration
+    rng = np.random.default_rng(5)
+    series = 150.0 + rng.normal(0, 8.0, 5000)
+    ref = OnlineStats(thresholds=[140.0], window=64)
+    for x in series:
+        ref.update(x)
+    assert ref.count == series.size
+    assert np.isclose(ref.mean, np.mean(series)) and np.isclose(ref.variance, np.var(series))
+    assert ref.min == series.min() and ref.max == series.max()
+    # shards fed in chunks and merged in order agree with the sample-by-sample stream
+    shards = [OnlineStats.from_series(c, thresholds=[140.0], window=64) for c in np.array_split(series, 7)]
+    merged = OnlineStats(thresholds=[140.0], window=64)
+    for s in shards:
+        merged.merge(s)
+    assert np.isclose(merged.variance, ref.variance)
+    assert merged.exceed_count(140.0) == int(np.sum(series >= 140.0)) == ref.exceed_count(140.0)
+    assert merged.longest_run(140.0) == ref.longest_run(140.0)
+    assert np.isclose(merged.rolling_ripple(), np.std(series[-64:]) / np.mean(series[-64:]))
+    # the longest run agrees with the duration gate
+    dt = 1e-3
+    needed = merged.longest_run(140.0)
+    assert stability_duration(series, dt, 140.0, (needed - 0.5) * dt) is True
+    assert stability_duration(series, dt, 140.0, (needed + 0.5) * dt) is False
+
+
+def test_reactor_feeds_online_stats():
+    from reactor.analysis_stat import OnlineStats
+    stats = OnlineStats(thresholds=[0.5])
+    R = Reactor(grid=(16, 16), online_stats=stats)
+    for _ in range(3):
+        R.step(dt=1e-3)
+    assert stats.count == 3 and stats.max <= 1.0
+
+
+def test_workspace_cache_reuse_and_eviction():
+    from reactor.models import _drift_poisson_jacobi, drift_poisson_step
+    from reactor.workspace import WorkspaceCache, get_workspace, jacobi_multiplier, workspace_stats
+    omega = np.zeros((24, 20))
+    omega[12, 10] = 1.0
+    omega[3, 17] = -0.5
+    # spectral application of the cached Jacobi multiplier matches the iterative sweeps
+    assert np.allclose(drift_poisson_step(omega, max_iter=7), _drift_poisson_jacobi(omega, 7), atol=1e-12)
+    before = workspace_stats()
+    drift_poisson_step(omega, max_iter=7)
+    after = workspace_stats()
+    assert after["hits"] == before["hits"] + 1 and after["misses"] == before["misses"]
+    assert jacobi_multiplier(get_workspace((24, 20)), 7).flags.writeable is False
+    # LRU eviction under a byte cap keeps the most recently used shape
+    cache = WorkspaceCache(max_entries=8, max_bytes=3500)
+    a = cache.get((16, 16))
+    a.scratch("buf")  # 2048 bytes
+    b = cache.get((8, 8))
+    b.scratch("buf")  # 512 bytes
+    cache.get((16, 16))
+    cache.get((12, 12)).scratch("buf")  # 1152 bytes -> over cap, evict LRU (8, 8)
+    st = cache.stats()
+    assert st["evictions"] == 1 and st["entries"] == 2 and st["bytes_held"] <= 3500
+    assert cache.get((16, 16)) is a
+
+
+def test_memoize_normalizes_keys_and_bounds_size():
+    from reactor.analysis_confinement import bennett_confinement_check_cached
+    from reactor.memo import memoize
+    from reactor.metrics import antiproton_yield_cached
+    calls = []
+
+    @memoize(maxsize=2)
+    def f(a, b=1.0, params=None):
+        calls.append(a)
+        return a * b
+
+    assert f(2, 3.0) == f(a=2.0, b=3, params=None) == 6.0
+    assert f(1, params={"x": 1, "y": [1, 2]}) == f(1, params={"y": (1, 2), "x": 1.0})
+    assert len(calls) == 2
+    f(3)
+    f(4)  # evicts LRU
+    assert f.cache_info()["currsize"] == 2
+    f(np.ones(2))  # arrays are not cacheable and bypass the cache
+    assert f.cache_info()["bypassed"] == 1
+    # physics yield ignores Te, so a T sweep at fixed density is one evaluation
+    antiproton_yield_cached.cache_clear()
+    ys = {antiproton_yield_cached(1e20, T, {"model": "physics"}) for T in (5.0, 10.0, 20.0)}
+    assert ys == {antiproton_yield_estimator(1e20, 5.0, {"model": "physics"})}
+    info = antiproton_yield_cached.cache_info()
+    assert info["misses"] == 1 and info["hits"] == 2
+    assert antiproton_yield_cached(1e20, 5.0, {"model": "legacy"}) != antiproton_yield_cached(1e20, 10.0, {"model": "legacy"})
+    assert bennett_confinement_check_cached(1e20, 2.0, 5.5, 5e-4) is bennett_confinement_check(1e20, 2.0, 5.5, 5e-4)
+
+
+def test_sweep_engine_chunks_match_product_loops(tmp_path):
+    import io
+    import itertools
+    import json as _json
+
+    from reactor.analysis_confinement import bennett_confinement_check_vec
+    from reactor.sweep import Axis, grid_size, iter_sweep, run_sweep, to_structured, write_columns
+    axes = [
+        Axis.geomspace("n_e", 1e19, 1e21, 3),
+        Axis.explicit("xi", [1.0, 2.0, 4.0]),
+        Axis.linspace("B", 4.5, 5.5, 3),
+    ]
+
+    def ev(c):
+        return {
+            "yield": c["n_e"] ** 2,
+            "eta": bennett_confinement_check_vec(c["n_e"], c["xi"], c["B"], 5e-4),
+        }
+
+    cols = run_sweep(axes, ev, chunk_size=5)
+    assert grid_size(axes) == 27 and len(cols["eta"]) == 27
+    for i, (n, xi, B) in enumerate(itertools.product(*(a.values for a in axes))):
+        assert (cols["n_e"][i], cols["xi"][i], cols["B"][i]) == (n, xi, B)
+        assert bool(cols["eta"][i]) is bennett_confinement_check(n, xi, B, 5e-4)
+    assert to_structured(cols)["eta"].dtype == bool
+    # streamed JSON/JSONL equal json.dumps of the row dicts; chunking does not change output
+    buf, lines = io.StringIO(), io.StringIO()
+    n = write_columns(iter_sweep(axes, ev, chunk_size=4), json_path=buf, json_indent=2, jsonl_path=lines,
+                      csv_path=str(tmp_path / "s.csv"))
+    rows = _json.loads(buf.getvalue())["rows"]
+    assert n == 27 and rows == [_json.loads(x) for x in lines.getvalue().splitlines()]
+    assert buf.getvalue() == _json.dumps({"rows": rows}, indent=2)
+    assert (tmp_path / "s.csv").read_text().splitlines()[0] == "n_e,xi,B,yield,eta"
+
+
+def test_map_points_is_worker_count_invariant():
+    from reactor.core import dynamic_ripple_point
+    from reactor.sweep import Axis, concat_chunks, map_points, point_rng
+    axes = [Axis.explicit("B", [5.0]), Axis.explicit("alpha", [0.0, 0.01]), Axis.explicit("t", [0.01, 1.0, 10.0])]
+    serial = concat_chunks(map_points(axes, dynamic_ripple_point, seed=7, workers=1, chunk_size=4))
+    pooled = concat_chunks(map_points(axes, dynamic_ripple_point, seed=7, workers=2, chunk_size=2, max_pending=1))
+    assert list(serial) == ["B", "alpha", "t", "ripple_initial", "ripple_dynamic"]
+    for k in serial:
+        assert np.array_equal(serial[k], pooled[k])
+    # each point's stream depends only on (seed, index)
+    again = dynamic_ripple_point({"B": 5.0, "alpha": 0.01, "t": 10.0}, point_rng(7, 5))
+    assert again["ripple_dynamic"] == pooled["ripple_dynamic"][5]
+    assert np.all(serial["ripple_dynamic"] <= serial["ripple_initial"])
+
+
+def test_sweep_store_resumes_and_refuses_mismatched_manifest(tmp_path):
+    from reactor.checkpoint import SweepStore
+    from reactor.sweep import Axis, concat_chunks, run_sweep
+    axes = [Axis.geomspace("n_e", 1e19, 1e21, 5), Axis.explicit("xi", [1.0, 2.0, 4.0])]
+    calls = []
+
+    def ev(c):
+        calls.append(len(c["n_e"]))
+        return {"y": c["n_e"] * c["xi"], "ok": c["xi"] > 1.5}
+
+    root = str(tmp_path / "ckpt")
+    store = SweepStore(root, axes, chunk_size=4, seed=1, meta={"mode": "t"})
+    it = store.run_sweep(ev)
+    next(it), next(it)  # "crash" after two chunks
+    assert store.progress() == {"chunks_done": 2, "chunks_total": 4}
+    calls.clear()
+    concat = concat_chunks(SweepStore(root, axes, chunk_size=4, seed=1, meta={"mode": "t"}).run_sweep(ev))
+    assert calls == [4, 3]  # only the missing chunks are evaluated
+    expected = run_sweep(axes, ev)
+    assert list(concat) == ["n_e", "xi", "y", "ok"]
+    for k in expected:
+        assert np.array_equal(concat[k], expected[k]) and concat[k].dtype == expected[k].dtype
+    with pytest.raises(ValueError, match="seed"):
+        SweepStore(root, axes, chunk_size=4, seed=2, meta={"mode": "t"})
+    assert SweepStore(root, axes, chunk_size=4, seed=2, meta={"mode": "t"}, reset=True).progress()["chunks_done"] == 0
+    # editing the evaluating code (not just bumping the package version) invalidates the store
+    script = tmp_path / "sweep_script.py"
+    script.write_text("from reactor.thresholds import Thresholds\nK = 1.0\n")
+    SweepStore(str(tmp_path / "c2"), axes, chunk_size=4, code=[str(script)])
+    assert SweepStore(str(tmp_path / "c2"), axes, chunk_size=4, code=[str(script)]).progress()["chunks_done"] == 0
+    script.write_text("from reactor.thresholds import Thresholds\nK = 2.0\n")
+    with pytest.raises(ValueError, match="code"):
+        SweepStore(str(tmp_path / "c2"), axes, chunk_size=4, code=[str(script)])
+    from reactor.build import module_deps
+    from reactor.checkpoint import code_hash
+    assert any(f.endswith("thresholds.py") for f in module_deps(str(script))) and code_hash() != code_hash([str(script)])
+
+
+def test_eval_cache_shares_entries_and_evicts_by_size(tmp_path, monkeypatch):
+    from reactor.evalcache import EvalCache, cached_eval, default_cache, persistent
+    from reactor.sweep import Axis, points
+    calls = []
+
+    def est(n, T, params=None):
+        calls.append((n, T))
+        return n * T
+
+    path = str(tmp_path / "c.sqlite")
+    fn = persistent("est", cache=EvalCache(path))(est)
+    assert fn(2, 3.0) == fn(2.0, T=3, params=None) == 6.0 and len(calls) == 1
+    # a second handle (e.g. another script/process) sees the same entries; a new version does not
+    assert persistent("est", cache=EvalCache(path))(est)(2.0, 3.0) == 6.0 and len(calls) == 1
+    persistent("est", cache=EvalCache(path, version="other"))(est)(2.0, 3.0)
+    assert len(calls) == 2
+
+    cols = points([Axis.geomspace("n_e", 1e19, 1e21, 7), Axis.explicit("T_e", [5.0, 10.0])], 0, 14)
+    n_eval = []
+
+    def ev(c):
+        n_eval.append(1)
+        return {"y": c["n_e"] * c["T_e"], "ok": c["T_e"] > 7}
+
+    monkeypatch.setenv("REACTOR_EVAL_CACHE", str(tmp_path / "env.sqlite"))
+    cached = cached_eval("ev", ev)
+    first, second = cached(cols), cached(dict(cols))
+    assert len(n_eval) == 1 and default_cache().stats()["hits"] == 1
+    assert np.array_equal(first["y"], second["y"]) and second["ok"].dtype == bool
+
+    small = EvalCache(str(tmp_path / "small.sqlite"), max_bytes=2000)
+    for i in range(40):
+        small.put(small.key("k", i), {"i": i, "pad": "x" * 100})
+    st = small.stats()
+    assert st["bytes"] <= 2000 and st["evictions"] > 0
+    assert small.get(small.key("k", 39)) == {"i": 39, "pad": "x" * 100} and small.get(small.key("k", 0)) is None
+    # buffered hit times still steer eviction: a recently read entry outlives newer unread ones
+    keep = small.key("k", 30)
+    assert small.get(keep) is not None
+    for i in range(40, 52):
+        small.put(small.key("k", i), {"i": i, "pad": "x" * 100})
+    assert small.get(keep) is not None and small.get(small.key("k", 31)) is None
+    small.put(small.key("k", 51), {"i": 51})  # a replace adjusts the running total, not adds to it
+    assert small._total == small.stats()["bytes"] <= 2000
+    # below the cap, neither hits nor inserts scan the table
+    big = EvalCache(str(tmp_path / "big.sqlite"))
+    sql = []
+    big._db.set_trace_callback(sql.append)
+    for i in range(50):
+        big.put(big.key("k", i), i)
+    assert not [q for q in sql if "SUM(size)" in q and "WHERE" not in q]
+    sql.clear()
+    assert all(big.get(big.key("k", i)) == i for i in range(50))
+    assert all(q.startswith("SELECT") for q in sql)  # hit times wait for the next write
+    big.close()
+    assert EvalCache(str(tmp_path / "big.sqlite"))._db.execute("SELECT MIN(used) FROM entries").fetchone()[0] > 0
+
+
+def test_refine_envelope_concentrates_points_on_contour():
+    from reactor.refine import refine_envelope
+    calls = []
+
+    def f(x, y):
+        calls.append(len(x))
+        return x ** 2 + y ** 2
+
+    r = refine_envelope(f, (-1.0, 1.0), (-1.0, 1.0), level=0.25, coarse=4, max_depth=5, grad_tol=0.0)
+    assert r.depth == 5 and len(calls) == 6  # one vectorized batch per level
+    assert r.x.size == len(set(zip(r.x.tolist(), r.y.tolist(), strict=True))) < 129 ** 2 // 10
+    assert np.allclose(r.f, r.x ** 2 + r.y ** 2)
+    assert len(r.contour) > 50 and np.abs(np.hypot(r.contour[:, 0], r.contour[:, 1]) - 0.5).max() < 1e-3
+    # smallest leaves hug the contour, far-field leaves stay coarse
+    size = r.cells[:, 1] - r.cells[:, 0]
+    mid = np.hypot((r.cells[:, 0] + r.cells[:, 1]) / 2, (r.cells[:, 2] + r.cells[:, 3]) / 2)
+    assert np.abs(mid[size == size.min()] - 0.5).max() < 0.05 and size.max() == 0.5
+    assert refine_envelope(f, (-1.0, 1.0), (-1.0, 1.0), level=0.25, max_points=100).x.size == 100
+    assert r.as_dict()["n_points"] == r.x.size
+
+
+def test_streaming_topk_and_pareto_match_full_sort():
+    from reactor.frontier import ParetoFront, TopK, nondominated, tap
+    rng = np.random.default_rng(5)
+    n = 3000
+    cols = {"fom": np.round(rng.random(n), 2), "yield": rng.random(n), "E": rng.random(n), "id": np.arange(n)}
+    chunks = [{k: v[a:a + 257] for k, v in cols.items()} for a in range(0, n, 257)]
+    top, front = TopK(25, "fom"), ParetoFront({"fom": "max", "yield": "max", "E": "min"})
+    assert sum(len(c["id"]) for c in tap(chunks, top, front)) == n
+    rows = [dict(zip(cols, vals, strict=True)) for vals in zip(*(v.tolist() for v in cols.values()), strict=True)]
+    assert top.rows() == sorted(rows, key=lambda r: r["fom"], reverse=True)[:25]  # ties keep stream order
+    by_rows = TopK(25, "fom")
+    by_rows.update_rows(rows, batch=100)
+    assert by_rows.rows() == top.rows() and TopK(0).rows() == []
+    F = np.stack([cols["fom"], cols["yield"], -cols["E"]], 1)
+    brute = ~np.array([np.any(np.all(F >= f, 1) & np.any(F > f, 1)) for f in F])
+    assert np.array_equal(nondominated(F), brute)
+    assert front.columns()["id"].tolist() == np.flatnonzero(brute).tolist() and front.n_seen == n
+    with pytest.raises(ValueError):
+        ParetoFront({"fom": "up"})
+
+
+def test_qmc_designs_are_stratified_and_batch_invariant():
+    from reactor.uq import SOBOL_MAX_DIM, iter_design, latin_hypercube, run_uq_vectorized, sobol_points
+    assert np.array_equal(sobol_points(8, 3, scramble=False)[4:], [[0.375, 0.375, 0.625], [0.875, 0.875, 0.125],
+                                                                   [0.625, 0.125, 0.875], [0.125, 0.625, 0.375]])
+    X = sobol_points(1024, SOBOL_MAX_DIM, seed=4)
+    assert all(np.unique(np.floor(X[:, j] * 1024)).size == 1024 for j in range(SOBOL_MAX_DIM))
+    assert np.array_equal(sobol_points(50, 4, seed=1, start=30), sobol_points(80, 4, seed=1)[30:])
+    L = latin_hypercube(100, 3, np.random.default_rng(0))
+    assert all(np.unique(np.floor(L[:, j] * 100)).size == 100 for j in range(3))
+    for m in ("uniform", "lhs", "sobol"):
+        blocks = np.concatenate(list(iter_design(1000, 2, m, seed=7, batch_size=300)))
+        assert np.array_equal(blocks, np.concatenate(list(iter_design(1000, 2, m, seed=7, batch_size=1000))))
+    with pytest.raises(ValueError):
+        sobol_points(4, SOBOL_MAX_DIM + 1)
+    ranges = {"a": (0.0, 1.0), "n": (1e19, 1e21)}
+    out = run_uq_vectorized(1 << 14, 0, ranges, lambda c: {"y": c["a"] * 2.0, "ln": np.log10(c["n"])},
+                            log_params=["n"], batch_size=5000)
+    assert out["n_samples"] == 1 << 14 and out["method"] == "sobol"
+    assert abs(out["means"]["y"] - 1.0) < 1e-3 and abs(out["means"]["ln"] - 20.0) < 1e-3
+    assert 19.0 <= out["min"]["ln"] and out["max"]["ln"] < 21.0
+
+
+def _uq_eval(params):
+    return {"y": params["a"] * params["b"], "ok": params["a"] > 0.5}
+
+
+def test_run_uq_parallel_matches_serial_and_returns_columns():
+    from reactor.uq import run_uq_parallel
+    ranges = {"a": (0.0, 1.0), "b": (2.0, 3.0)}
+    serial = run_uq_parallel(203, 11, ranges, _uq_eval, workers=1, batch_size=16, return_columns=True)
+    pooled = run_uq_parallel(203, 11, ranges, _uq_eval, workers=3, batch_size=16, return_columns=True)
+    assert serial["results"] == pooled["results"] and serial["means"] == pooled["means"]
+    assert len(serial["results"]) == 203 and set(serial) == {"n_samples", "means", "results", "params", "columns"}
+    for k in ("a", "b"):
+        assert np.array_equal(serial["params"][k], pooled["params"][k])
+    assert np.allclose(serial["columns"]["y"], serial["params"]["a"] * serial["params"]["b"])
+    assert serial["columns"]["ok"].dtype == bool
+    assert run_uq_parallel(203, 12, ranges, _uq_eval, workers=1, batch_size=16)["results"] != serial["results"]
+    # closures run inline by default; a pool rejects them up front
+    assert run_uq_parallel(203, 11, ranges, lambda p: _uq_eval(p), batch_size=16)["results"] == serial["results"]
+    with pytest.raises(TypeError, match="workers=1"):
+        run_uq_parallel(203, 11, ranges, lambda p: _uq_eval(p), workers=2, batch_size=16)
+
+
+def test_quantile_sketch_and_streaming_uq_early_stop():
+    from reactor.analysis import QuantileSketch
+    from reactor.uq import UQAggregate, run_uq_vectorized
+    rng = np.random.default_rng(0)
+    x = rng.lognormal(size=200_000)
+    a, b = QuantileSketch(256), QuantileSketch(256, seed=1)
+    for lo in range(0, 100_000, 7_001):
+        a.update_many(x[lo:min(lo + 7_001, 100_000)])
+    b.update_many(x[100_000:])
+    a.merge(b)
+    qs = [0.05, 0.5, 0.95]
+    assert a.count == x.size and a.size < 3000
+    assert all(abs(np.mean(x <= e) - q) < 0.01 for e, q in zip(a.quantile(qs), qs, strict=True))
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+    ranges = {"u": (0.0, 1.0)}
+    full = run_uq_vectorized(1 << 16, 1, ranges, lambda c: {"u": c["u"]}, batch_size=4096, exceed={"u": [0.9]})
+    assert full["n_samples"] == 1 << 16 and full["converged"] is None
+    assert abs(full["exceedance"]["u"]["0.9"]["p"] - 0.1) < 1e-3 and abs(full["quantiles"]["u"]["0.5"] - 0.5) < 0.01
+    early = run_uq_vectorized(1 << 16, 1, ranges, lambda c: {"u": c["u"]}, batch_size=4096, atol=0.005)
+    assert early["converged"] is True and early["n_samples"] < 1 << 16 and early["ci_halfwidth"]["u"] <= 0.005
+    # shards merge to the same moments as one pass
+    p, q = UQAggregate({"u": 0.5}), UQAggregate({"u": 0.5})
+    p.update({"u": x[:1000]}, 1000)
+    q.update({"u": x[1000:3000]}, 2000)
+    whole = UQAggregate({"u": 0.5})
+    whole.update({"u": x[:3000]}, 3000)
+    assert p.merge(q).n == 3000 and np.isclose(p.stats["u"].mean, whole.stats["u"].mean)
+    assert p.stats["u"].exceed_count(0.5) == whole.stats["u"].exceed_count(0.5)
+
+
+def test_surrogates_fit_cross_validate_and_fall_back():
+    from reactor.surrogate import FallbackModel, GaussianProcess, PolynomialChaos, fit_surrogate
+    ranges = {"a": (0.0, 2.0), "b": (1e19, 1e21)}
+    calls = []
+
+    def model(c):
+        calls.append(len(c["a"]))
+        return {"y": 1.0 + c["a"] ** 2 + 0.5 * np.log10(c["b"])}
+
+    pce, cv = fit_surrogate(model, ranges, "y", kind="pce", n_design=30, log_params=["b"], degree=2)
+    assert cv["rmse"] < 1e-8 and cv["folds"] == 5 and isinstance(pce, PolynomialChaos)
+    idx = pce.sobol_indices()
+    assert idx["a"] > idx["b"] > 0 and abs(sum(idx.values()) - 1.0) < 1e-9  # additive: no interactions
+    probe = {"a": np.array([0.3, 1.7]), "b": np.array([3e19, 5e20])}
+    assert np.allclose(pce.predict(probe), model(probe)["y"])
+
+    gp = GaussianProcess(ranges, log_params=["b"]).fit(pce.X_train, pce.y_train)
+    mu, sd = gp.predict(pce.X_train, return_std=True)
+    assert np.allclose(mu, pce.y_train, atol=1e-3) and sd.max() < 1e-2
+    assert gp.n_train == 30
+
+    calls.clear()
+    fb = FallbackModel(gp, model, "y", max_std=0.0, refit_every=2)
+    out = fb({"a": np.array([1.0, 1.1]), "b": np.array([1e19, 2e19])})
+    assert calls == [2] and not out["surrogate"].any() and np.array_equal(out["y_std"], [0.0, 0.0])
+    assert gp.n_train == 32 and fb.stats()["model"] == 2  # refit on the fallback points
+    fb.max_std = np.inf
+    assert fb(probe)["surrogate"].all() and calls == [2] and fb.stats()["surrogate"] == 2
+
+    # unfitted or underdetermined (n <= basis terms) surrogates are never trusted
+    from reactor.surrogate import _Surrogate, fallback_model
+    with pytest.raises(TypeError):
+        _Surrogate(ranges)
+    assert np.isinf(PolynomialChaos(ranges, degree=2).predict(probe, return_std=True)[1]).all()
+    assert np.isinf(GaussianProcess(ranges).predict(probe, return_std=True)[1]).all()
+    few = PolynomialChaos(ranges, degree=2, log_params=["b"]).fit(pce.X_train[:6], pce.y_train[:6])
+    assert np.isinf(few.predict(probe, return_std=True)[1]).all()
+    calls.clear()
+    fb = FallbackModel(few, model, "y", max_std=1.0)
+    assert not fb(probe)["surrogate"].any() and calls == [2]
+    fb, cv = fallback_model(model, ranges, "y", max_std=1e-3, kind="pce", n_design=30, log_params=["b"], degree=2)
+    calls.clear()
+    assert fb(probe)["surrogate"].all() and not calls and cv["rmse"] < 1e-8
+
+
+def test_maximize_finds_optimum_and_respects_constraints():
+    from reactor.optimize import maximize, threshold_constraints
+
+    def fn(c):
+        x, y = c["x"], c["y"]
+        return {"f": -((x - 0.3) ** 2) - 4.0 * (y - 0.7) ** 2, "s": x + y}
+
+    bounds = {"x": (-2.0, 2.0), "y": (-2.0, 2.0)}
+    for method in ("cmaes", "nelder-mead", "bo"):
+        res = maximize(fn, bounds, objective="f", method=method, budget=150, seed=1)
+        assert res.n_evals <= 150 and res.feasible
+        assert abs(res.best["x"] - 0.3) < 0.05 and abs(res.best["y"] - 0.7) < 0.05, method
+        # x + y <= 0.5 moves the optimum onto the boundary; the best point must stay feasible
+        con = maximize(fn, bounds, objective="f", constraints={"s": ("<=", 0.5)}, method=method, budget=150, seed=1)
+        assert con.feasible and con.best["s"] <= 0.5 and con.best_value < res.best_value
+        assert len(con.history["f"]) == con.n_evals
+    assert threshold_constraints(columns=["n_e", "fom", "T_e"]) == {"n_e": (">=", 1e20), "fom": (">=", 0.1)}
+    with pytest.raises(ValueError):
+        maximize(fn, bounds, objective="f", method="grid")
+
+
+def test_sobol_and_morris_sensitivity_on_ishigami():
+    from reactor.sensitivity import morris_screening, morris_trajectories, rank_parameters, sobol_indices
+    calls = []
+
+    def ishigami(c):
+        calls.append(len(c["a"]))
+        return {"f": np.sin(c["a"]) + 7 * np.sin(c["b"]) ** 2 + 0.1 * c["c"] ** 4 * np.sin(c["a"])}
+
+    ranges = dict.fromkeys("abc", (-np.pi, np.pi))
+    s = sobol_indices(ishigami, ranges, "f", n=4096, batch_size=5000)
+    assert sum(calls) == s["n_evals"] == 4096 * 5 and max(calls) <= 5000
+    exact_s1, exact_st = [0.3139, 0.4424, 0.0], [0.5576, 0.4424, 0.2437]
+    assert np.allclose(list(s["f"]["S1"].values()), exact_s1, atol=0.03)
+    assert np.allclose(list(s["f"]["ST"].values()), exact_st, atol=0.03)
+    for k, (lo, hi) in s["f"]["ST_conf"].items():
+        assert lo <= s["f"]["ST"][k] <= hi
+    X, order, step = morris_trajectories(10, 3, levels=4, seed=2)
+    assert X.min() >= 0 and X.max() <= 1
+    assert np.all((np.abs(np.diff(X, axis=1)) > 0).sum(axis=2) == 1)  # one parameter per step
+    m = morris_screening(ishigami, {**ranges, "unused": (0.0, 1.0)}, "f", r=100, seed=2)
+    assert m["n_evals"] == 500 and rank_parameters(m, "f")[-1] == "unused"
+    assert m["f"]["mu_star"]["unused"] == 0.0 and min(m["f"]["mu_star"][k] for k in "abc") > 1.0
+    assert rank_parameters(s, "f") == ["a", "b", "c"]
+
+
+def test_series_files_stream_through_feasibility_gates(tmp_path, capsys):
+    import json as _json
+
+    from reactor.cli import build_parser
+    from reactor.series import evaluate_series_gates, iter_series, load_series
+    gamma = np.full(5000, 150.0)
+    gamma[1234] = 100.0  # breaks the run: longest stretch is 3765 samples
+    b = 5.0 + 0.01 * np.sin(np.arange(3000))
+    np.save(tmp_path / "g.npy", gamma)
+    gamma.astype(np.float32).tofile(tmp_path / "g.f32")
+    b.tofile(tmp_path / "b.bin")
+    np.savez(tmp_path / "s.npz", b=b, gamma=gamma)
+    (tmp_path / "g.ndjson").write_text("\n".join(_json.dumps({"t": i, "gamma": v}) for i, v in enumerate(gamma)))
+    (tmp_path / "b.csv").write_text("t,B\n" + "\n".join(f"{i},{v!r}" for i, v in enumerate(b.tolist())))
+    assert isinstance(load_series(str(tmp_path / "g.npy")), np.memmap)
+    assert np.array_equal(load_series(str(tmp_path / "b.bin:float64")), b)
+    assert [len(c) for c in iter_series(str(tmp_path / "g.ndjson:gamma"), chunk_size=2048)] == [2048, 2048, 904]
+
+    ref = evaluate_series_gates(_json.dumps(gamma.tolist()), _json.dumps(b.tolist()), "[0, 2e20]",
+                                dt=1e-3, gamma_duration=3.7)
+    assert ref.gamma_ok and ref.b_ok and ref.dens_ok and ref.gamma_stats["gamma_min"] == 100.0
+    for g_spec, b_spec in [("g.npy", "b.bin"), ("g.f32", "s.npz:b"), ("g.ndjson:gamma", "b.csv:B"), ("s.npz:gamma", "b.csv:B")]:
+        got = evaluate_series_gates(str(tmp_path / g_spec), str(tmp_path / b_spec), "[0, 2e20]",
+                                    dt=1e-3, gamma_duration=3.7, chunk_size=777)
+        assert got.as_dict()["gamma_ok"] and got.b_ok
+        assert got.gamma.longest_run(140.0) == 3765
+        assert np.isclose(got.b_stats["b_rms_fraction"], ref.b_stats["b_rms_fraction"], rtol=1e-9)
+    assert not evaluate_series_gates(str(tmp_path / "g.npy"), dt=1e-3, gamma_duration=3.8).gamma_ok
+
+    args = build_parser().parse_args(["feasibility", "--gamma-series", str(tmp_path / "g.npy"), "--b-series",
+                                      str(tmp_path / "b.csv:B"), "--E-mag", "[0, 2e20]", "--chunk-size", "1000"])
+    args.func(args)
+    out = _json.loads(capsys.readouterr().out)
+    assert out["stable"] is True and out["gamma_stats"]["gamma_max"] == 150.0
+
+
+def test_gate_engine_evaluates_run_batches():
+    from dataclasses import replace
+
+    from reactor.gates import (
+        compare_gate,
+        evaluate_gates,
+        evaluate_report,
+        feasibility_gates,
+        report_gates,
+        run_columns,
+    )
+    from reactor.thresholds import Thresholds
+    n = 10000
+    rng = np.random.default_rng(0)
+    cols = {
+        "gamma_longest_run": rng.integers(0, 20, n).astype(float),
+        "dt": np.full(n, 1e-3),
+        "b_mean_T": rng.uniform(4.5, 6.0, n),
+        "b_rms_fraction": rng.uniform(0.0, 0.02, n),
+        "ne_max_cm3": rng.uniform(5e19, 5e20, n),
+        "fom": np.where(rng.random(n) < 0.5, np.nan, rng.uniform(0.0, 0.2, n)),
+    }
+    res = evaluate_gates(cols, feasibility_gates(Thresholds()))
+    expect = ((cols["gamma_longest_run"] >= 10) & (cols["b_mean_T"] >= 5.0) & (cols["b_rms_fraction"] <= 0.01)
+              & (cols["ne_max_cm3"] >= 1e20) & (np.isnan(cols["fom"]) | (cols["fom"] >= 0.1)))
+    assert res.passed.shape == (n, 7) and np.array_equal(res.ok, expect)
+    assert not res.evaluated[:, res.names.index("bennett_ok")].any()  # optional and absent: skipped
+    i = int(np.flatnonzero(~expect)[0])
+    row = res.rows()[i]
+    assert row["ok"] is False and row["reasons"] and row["bennett_ok"] is None
+    assert res.summary()["n_ok"] == int(expect.sum())
+    # thresholds drive the gate set
+    loose = evaluate_gates(cols, feasibility_gates(replace(Thresholds(), gamma_duration_s=0.0, b_field_min_T=0.0)))
+    assert loose.column("gamma_ok").all() and loose.column("b_mean_ok").all()
+    # a required gate fails when its data is missing; a soft gate only reports
+    missing = evaluate_gates({"ne_max_cm3": [2e20]}, feasibility_gates())
+    assert not missing.ok[0] and missing.failed[0].tolist() == [True, True, True, False, False, False, False]
+    soft = evaluate_gates({"x": [0.0]}, [compare_gate("x", "x", ">=", 1.0, enforce=False)])
+    assert soft.ok[0] and soft.reasons() == [["x<1.0"]]
+    reports = [{"stable": True, "gamma_stats": {"gamma_max": 200}}, {"stable": False, "fom_details": {"fom": 0.05}},
+               {"stable": True, "gamma_stats": {}}, {"stable": True, "gamma_stats": {"gamma_min": 1.0}}]
+    rc = run_columns(reports)
+    assert np.isnan(rc["gamma_max"][2]) and rc["gamma_max"][3] == 0.0 and rc["fom"][1] == 0.05
+    rep = evaluate_gates(rc, report_gates(gamma_min=140, require_stable=False, fom_min=0.1))
+    assert rep.ok.tolist() == [True, False, True, False]
+    assert rep.reasons() == [[], ["unstable", "fom<0.1"], [], ["gamma_max<140"]]
+    # the scalar path agrees with the columnar one for every report gate set
+    reports += [{}, {"stable": True, "antiproton_yield_pass": True, "gamma_stats": {"gamma_max": float("nan")}},
+                {"stable": True, "gamma_stats": {"gamma_max": 139.0}, "fom": 0.2}]
+    for kw in ({}, {"gamma_min": 140.0}, {"require_yield": True}, {"require_stable": False, "fom_min": 0.1},
+               {"gamma_min": 140.0, "require_yield": True, "fom_min": 0.1}):
+        gates = report_gates(**kw)
+        res = evaluate_gates(run_columns(reports), gates)
+        assert [evaluate_report(r, gates) for r in reports] == list(zip(res.ok.tolist(), res.reasons(), strict=True))
+
+
+def test_gate_service_answers_over_a_local_socket(tmp_path, monkeypatch):
+    import json
+    import os
+    import threading
+
+    from reactor.reports import feasibility_report
+    from reactor.service import GateService, ServiceClient, ServiceError, make_server, parse_address
+    assert parse_address("localhost:8000")[1] == ("localhost", 8000) and parse_address(":8000")[1][0] == "127.0.0.1"
+    for host in ("0.0.0.0:8000", "tcp:10.1.2.3:8000", "example.org:80"):
+        with pytest.raises(ValueError):
+            parse_address(host)
+    svc = GateService(str(tmp_path))
+    outside = svc.handle({"op": "kpi", "params": {"metrics": {}, "uq": {}, "out": str(tmp_path.parent / "x.json")}})
+    assert outside["ok"] is False and "outside the service root" in outside["error"]
+    secret = tmp_path.parent / f"{tmp_path.name}-secret.npy"
+    np.save(secret, np.full(8, 150.0))
+    for spec in (str(secret), f"{secret}:x", os.path.relpath(secret, tmp_path)):
+        leak = svc.handle({"op": "feasibility", "params": {"gamma_series": spec, "dt": 0.002}})
+        assert leak["ok"] is False and "outside the service root" in leak["error"], spec
+    secret.unlink()
+    unknown = svc.handle({"op": "nope", "id": 1})
+    assert unknown["id"] == 1 and unknown["ok"] is False and "unknown op" in unknown["error"]
+    bad = svc.handle({"op": "gate", "params": {"reports": [str(tmp_path / "missing.json")], "metrics": {}}})
+    assert bad["ok"] is False and "load failed" in bad["error"]
+    metrics = tmp_path / "metrics.json"
+    metrics.write_text(json.dumps({"energy_budget_J": 1e7, "gamma_min": 140}))
+    kw = {"gamma_series": [150.0] * 6, "dt": 0.002, "b_series": "[5,5,5,5]", "E_mag": "[0,1e20,1e20]",
+          "yield_model": "threshold", "n_cm3": 1e20, "Te_eV": 10.0}
+    sock = str(tmp_path / "reactor.sock")
+    server = make_server(sock, svc)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    try:
+        with ServiceClient(sock, timeout=10) as c:
+            assert c.call("ping")["pid"] > 0
+            feas = tmp_path / "feas.json"
+            rep = c.call("feasibility", out=str(feas), **kw)
+            local = feasibility_report(**{**kw, "gamma_series": json.dumps(kw["gamma_series"])})
+            rep.pop("timestamp"), local.pop("timestamp")
+            assert rep == json.loads(json.dumps(local)) and rep["stable"] and feas.exists()
+            gate = c.call("gate", reports=[str(feas), {"stable": False}], metrics=str(metrics), require_yield=True)
+            assert gate["ok"] is False and [r["ok"] for r in gate["results"]] == [True, False]
+            kpi = c.call("kpi", feasibility=str(feas), metrics=str(metrics), uq={}, cost_model={},
+                         anomalies_ndjson=str(tmp_path / "none.ndjson"), out=str(tmp_path / "kpi.json"))
+            assert kpi["stable"] and kpi["energy_budget_J"] == 1e7 and (tmp_path / "kpi.json").exists()
+            # warm state: metrics re-read only when the file changes
+            metrics.write_text(json.dumps({"energy_budget_J": 2e7, "gamma_min": 140}))
+            assert c.call("kpi", feasibility=str(feas), metrics=str(metrics), uq={})["energy_budget_J"] == 2e7
+            gates = c.call("gates", columns={"gamma_longest_run": [10, 2], "dt": [1e-3, 1e-3], "b_mean_T": [5, 5],
+                                             "b_rms_fraction": [0, 0], "ne_max_cm3": [2e20, 2e20]})
+            assert [r["ok"] for r in gates["rows"]] == [True, False]
+            with pytest.raises(ServiceError):
+                c.call("feasibility", bogus=1)
+            # relative paths are the caller's, not the service's
+            sub = tmp_path / "sub"
+            sub.mkdir()
+            monkeypatch.chdir(sub)
+            c.call("kpi", feasibility=str(feas), metrics="../metrics.json", uq={}, out="rel.json")
+            assert (sub / "rel.json").exists()
+            (sub / "g.csv").write_text("gamma,b\n" + "150,5\n" * 6)
+            rel = c.call("feasibility", **{**kw, "gamma_series": "g.csv:gamma"})
+            assert rel["gamma_stats"]["gamma_max"] == 150.0
+            assert c.call("stats")["errors"] >= 3
+            assert c.call("shutdown") == "shutting down"
+    finally:
+        t.join(timeout=10)
+        server.server_close()
+    assert not t.is_alive()
+
+
+def test_pipeline_runs_kpi_chain_in_process(tmp_path):
+    from reactor.pipeline import KPI_PIPELINE, Pipeline, Stage, run_batch
+    from reactor.reports import feasibility_report, gate_reports, production_kpi
+    assert KPI_PIPELINE.order == ("demo", "feasibility", "kpi", "gate", "report")
+    assert KPI_PIPELINE.upstream(["gate"]) == ("feasibility", "gate")
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", len, ("b",)), Stage("b", len, ("a",))])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", len, ("missing",))])
+    runs = [{"run_id": f"r{i}", "seed": i, "steps": 2, "metrics": {"energy_budget_J": 1e7 + i}} for i in range(6)]
+    shared = {"kpi_drop_fom": True, "require_yield": True, "cost_model": {"price_per_antiproton": 1.0,
+                                                                          "energy_cost_per_J": 1e-7}}
+    art = {"kpi": str(tmp_path / "kpi_{run_id}.json")}
+    inline = list(run_batch(runs, shared=shared, artifacts=art, workers=1))
+    pooled = list(run_batch(runs, shared=shared, workers=2, chunk_size=2))
+    assert [r["report"] for r in inline] == [r["report"] for r in pooled]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"kpi_r{i}.json" for i in range(6)]
+    # same numbers as the standalone report builders fed through files
+    feas = feasibility_report(gamma_series="[150,150,150,150,150]", dt=0.002, b_series="[5,5,5,5]",
+                              E_mag="[0,1e20,1e20,1e20]", yield_model="threshold", n_cm3=1e20, Te_eV=10.0,
+                              bennett_n0=1e20, bennett_xi=2.0, bennett_B=5.0, bennett_ripple=5e-4)
+    nofom = {k: v for k, v in feas.items() if k != "fom"}
+    kpi = production_kpi(nofom, runs[3]["metrics"], {}, shared["cost_model"])
+    assert inline[3]["kpi"] == kpi and inline[3]["report"]["fom"] == pytest.approx(1.0 / (1e-7 * (1e7 + 3)))
+    assert inline[3]["gate"]["ok"] is gate_reports([feas], runs[3]["metrics"], True)[0][0] is True
+    only = KPI_PIPELINE.run({"metrics": {}}, until=["gate"])
+    assert set(only) == {"feasibility", "gate"}
+
+
+def test_incremental_build_rebuilds_only_stale_targets(tmp_path):
+    import os
+
+    from reactor.build import artifact_targets, build, module_deps, script_target
+    (tmp_path / "upper.py").write_text(
+        "import sys\nfrom reactor.thresholds import Thresholds\n"
+        "src, dst = sys.argv[1:3]\nif src == 'fail':\n    sys.exit(3)\n"
+        "open(dst, 'w').write(open(src).read().upper() + ' ' + ' '.join(sys.argv[3:]))\n")
+    (tmp_path / "in.txt").write_text("a")
+    deps = [os.path.basename(p) for p in module_deps(str(tmp_path / "upper.py"))]
+    assert {"upper.py", "__init__.py", "thresholds.py"} <= set(deps)
+
+    def targets(tag="x", fail=False):
+        return [
+            script_target("mid", "upper.py", ["in.txt", "out/mid.txt", tag], outputs=["out/mid.txt"],
+                          inputs=["in.txt"], root=str(tmp_path)),
+            script_target("top", "upper.py", ["out/mid.txt", "top.txt"], outputs=["top.txt"],
+                          inputs=["out/mid.txt"], root=str(tmp_path)),
+            script_target("side", "upper.py", ["fail" if fail else "in.txt", "side.txt"], outputs=["side.txt"],
+                          root=str(tmp_path)),
+        ]
+
+    def run(**kw):
+        return build(kw.pop("ts", None) or targets(), manifest="m.json", root=str(tmp_path), jobs=2, **kw)
+
+    assert run()["built"] == ["mid", "top", "side"]
+    assert (tmp_path / "top.txt").read_text() == "A X "
+    assert run()["fresh"] == ["mid", "top", "side"]
+    (tmp_path / "in.txt").write_text("b")
+    assert run(dry_run=True)["stale"] == ["mid", "top"]  # side does not declare in.txt
+    assert run()["built"] == ["mid", "top"] and (tmp_path / "top.txt").read_text() == "B X "
+    assert run(ts=targets(tag="y"))["built"] == ["mid", "top"]  # parameters are part of the key
+    (tmp_path / "top.txt").unlink()
+    assert run(ts=targets(tag="y"))["built"] == ["top"]
+    res = run(ts=targets(tag="z", fail=True), only=["top", "side"])
+    assert res["built"] == ["mid", "top"] and res["failed"] == ["side"]
+    assert run(ts=targets(tag="z", fail=True), dry_run=True)["stale"] == ["side"]  # failures are not recorded
+    with pytest.raises(ValueError):
+        build([script_target("a", "upper.py", outputs=["x"], inputs=["y"], root=str(tmp_path)),
+               script_target("b", "upper.py", outputs=["y"], inputs=["x"], root=str(tmp_path))], root=str(tmp_path))
+    names = [t.name for t in artifact_targets()]
+    assert len(names) == len(set(names)) and "dynamic_ripple_time_plot" in names
+    with pytest.raises(ValueError, match="output of both"):  # targets run in parallel; one writer per file
+        build([script_target("a", "upper.py", outputs=["x"], root=str(tmp_path)),
+               script_target("b", "upper.py", outputs=["./x"], root=str(tmp_path))], root=str(tmp_path))
+    assert build(artifact_targets(), root=str(tmp_path), dry_run=True)["stale"]
+    for t in artifact_targets():  # every file a command names is declared, so none goes stale unnoticed
+        named = [a for a in t.cmd[2:] if a.endswith((".json", ".md", ".csv", ".ndjson", ".png"))]
+        assert [f for f in named if f not in t.inputs + t.outputs] == [], t.name
+
+
+def test_run_scenarios_pool_limits_and_table(tmp_path):
+    import json
+
+    from reactor.scenarios import run_scenario, run_scenarios, scenario_jobs, summarize
+    (tmp_path / "a.json").write_text(json.dumps({"grid": [16, 16], "b_series": [5.0, 5.0]}))
+    (tmp_path / "big.json").write_text(json.dumps({"grid": [40000, 40000]}))
+    (tmp_path / "slow.json").write_text(json.dumps({"grid": [64, 64], "steps": 10 ** 7}))
+    jobs = scenario_jobs([str(tmp_path / "*.json")], seeds=[1, 2], steps=None)
+    assert [j["job_id"] for j in jobs] == ["a_s1", "a_s2", "big_s1", "big_s2", "slow_s1", "slow_s2"]
+    jobs = [dict(j, steps=5) if j["name"] == "a" else j for j in jobs]
+    cols = run_scenarios(jobs, workers=3, timeout=3.0, max_mem_mb=2048, timeline_dir=str(tmp_path / "tl"))
+    assert cols["status"].tolist() == ["ok", "ok", "memory", "memory", "timeout", "timeout"]
+    assert cols["steps"].tolist()[:2] == [5, 5] and np.isnan(cols["elapsed_s"][2])
+    assert summarize(cols)["ok"] == 2
+    # isolated timelines, identical to an in-process run of the same job
+    tl = (tmp_path / "tl" / "a_s1.ndjson").read_text().splitlines()
+    assert tl and cols["events_ok"][0] + cols["events_fail"][0] == len(tl)
+    row = run_scenario(jobs[0], str(tmp_path / "tl2"))
+    assert row["wmax_final"] == cols["wmax_final"][0] and row["b_mean_T"] == 5.0
+    # an invalid file fails its own rows only; same-named files in different directories get distinct ids
+    for d, doc in (("x", {"grid": [8, 8], "steps": 2}), ("y", {"grid": [8, 8], "steps": 2}), ("z", {"xi": -1})):
+        (tmp_path / d).mkdir()
+        (tmp_path / d / "s.json").write_text(json.dumps(doc))
+    (tmp_path / "z" / "t.json").write_text("{not json")
+    jobs = scenario_jobs([str(tmp_path / "[xyz]" / "*.json")], seeds=[1])
+    ids = [j["job_id"] for j in jobs]
+    assert len(set(ids)) == 4 and all(i.startswith("s-") for i in ids[:3]) and ids[3] == "t_s1"
+    cols = run_scenarios(jobs, workers=2, timeline_dir=str(tmp_path / "tl3"))
+    assert cols["status"].tolist() == ["ok", "ok", "error", "error"] and "xi=" in cols["error"][2]
+    assert len(list((tmp_path / "tl3").glob("*.ndjson"))) == 2
+    # the CLI checks --out before running anything: a new directory is created, an unknown extension refused
+    from reactor.cli import build_parser
+    base = ["run-scenarios", str(tmp_path / "x" / "s.json"), "--seeds", "1", "--workers", "1",
+            "--timeline-dir", str(tmp_path / "tl4")]
+    args = build_parser().parse_args([*base, "--out", str(tmp_path / "new" / "res.csv")])
+    args.func(args)
+    assert len((tmp_path / "new" / "res.csv").read_text().splitlines()) == 2
+    args = build_parser().parse_args([*base, "--out", str(tmp_path / "res.txt")])
+    with pytest.raises(SystemExit) as exc:
+        args.func(args)
+    assert exc.value.code == 2
+    assert (tmp_path / "tl4" / "s_s1.ndjson").stat().st_size > 0  # no job started: its timeline was not truncated
+
+
+def test_scenario_model_validation_cache_and_batches(tmp_path):
+    import glob
+    import json
+    import os
+
+    from reactor.config import Scenario, load_scenario, load_scenarios
+
+    sc = load_scenario("examples/scenario_production.json")
+    assert (sc.name, sc.n_cm3, sc.Te_eV, sc.B_T, sc.grid, sc.nu) == ("production", 1e21, 15.0, 5.0, (32, 32), 1e-3)
+    assert sc.extra == {"notes": "Production-oriented scenario with long run"}
+    assert Scenario.from_dict({"n_m3": 1e26}).n_cm3 == pytest.approx(1e20)
+    assert all(isinstance(load_scenario(p), Scenario) for p in glob.glob("examples/*.json"))
+    with pytest.raises(ValueError, match=r"in bad\.json: ") as exc:
+        Scenario.from_dict({"grid": [32], "xi": -1, "steps": 2.5}, source="bad.json")
+    assert all(k in str(exc.value) for k in ("grid=", "xi=", "steps="))
+
+    p = tmp_path / "s.json"
+    p.write_text(json.dumps({"grid": [16, 16], "b_series": [5, 5.1]}))
+    first = load_scenario(str(p))
+    assert load_scenario(str(p)) is first
+    p.write_text(json.dumps({"grid": [24, 24], "b_series": [5, 5.1]}))
+    os.utime(p, ns=(1, 1))
+    assert load_scenario(str(p)).grid == (24, 24)
+    kw = first.reactor_kwargs(timeline_log_path=None)
+    assert kw["grid"] == (16, 16) and kw["b_series"].tolist() == [5.0, 5.1]
+    Reactor(**kw).step(dt=1e-3)
+
+    (tmp_path / "v.jsonl").write_text('{"xi": 3.0}\n\n{"T_e": 8, "grid": [8, 8]}\n')
+    rows = load_scenarios(str(tmp_path / "v.jsonl"), base=first)
+    assert [(r.xi, r.grid, r.Te_eV) for r in rows] == [(3.0, (16, 16), None), (2.0, (8, 8), 8.0)]
+    (tmp_path / "v.csv").write_text('nu,grid,name\n0.01,,a\n,"[12, 12]",b\n')
+    rows = load_scenarios(str(tmp_path / "v.csv"))
+    assert [(r.nu, r.grid, r.name) for r in rows] == [(0.01, (32, 32), "a"), (1e-3, (12, 12), "b")]
+    (tmp_path / "bad.csv").write_text("nu\n-1\n")
+    with pytest.raises(ValueError, match="row 0"):
+        load_scenarios(str(tmp_path / "bad.csv"))
+
+
+_MODULES_AFTER = """
+import json, runpy, sys
+argv = json.loads(sys.argv[1])
+if argv is not None:
+    sys.argv = ["reactor", *argv]
+    try:
+        runpy.run_module("reactor.cli", run_name="__main__", alter_sys=True)
+    except SystemExit:
+        pass
+with open("modules.json", "w") as f:
+    json.dump(sorted(sys.modules), f)
+"""
+
+
+def _cli_modules(tmp_path, argv):
+    """Names in ``sys.modules`` after ``python -m reactor.cli *argv`` (``argv=None``: interpreter start-up only)."""
+    import json
+    import os
+    import pathlib
+    import subprocess
+
+    (tmp_path / "m.json").write_text(json.dumps({"gamma_min": 140.0}))
+    (tmp_path / "r.json").write_text(json.dumps({"stable": True, "gamma_stats": {"gamma_max": 200.0}}))
+    src = str(pathlib.Path(__file__).resolve().parents[1] / "src")
+    env = dict(os.environ, PYTHONPATH=src)
+    proc = subprocess.run([sys.executable, "-c", _MODULES_AFTER, json.dumps(argv)], cwd=tmp_path, env=env,
+                          capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    return set(json.loads((tmp_path / "modules.json").read_text()))
+
+
+# import budget: beyond these reactor modules, JSON subcommands may load only the standard library
+_JSON_CMD_MODULES = {"reactor", "reactor.cli", "reactor.gates", "reactor.thresholds", "reactor.analysis_econ"}
+
+
+@pytest.mark.parametrize("argv", [["gate", "--metrics", "m.json", "--report", "r.json"], ["econ", "--out", "e.json"]])
+def test_cli_json_subcommands_stay_under_import_budget(tmp_path, argv):
+    loaded = _cli_modules(tmp_path, argv) - _cli_modules(tmp_path, None)
+    ours = {m for m in loaded if m.split(".")[0] == "reactor"}
+    assert "reactor" in ours and ours - _JSON_CMD_MODULES == set()
+    third_party = sorted(m for m in loaded if m.split(".")[0] not in sys.stdlib_module_names | {"reactor"})
+    assert third_party == []
+
+
+def test_cli_batch_runs_scripts_and_builtins_in_one_process(tmp_path, monkeypatch, capsys):
+    import json
+
+    from reactor.cli import BUILTINS, run, run_batch, script_commands
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "b.json").write_text(json.dumps({"fom": 0.1, "stable": True}))
+    (tmp_path / "c.json").write_text(json.dumps({"fom": 0.25, "stable": True}))
+    (tmp_path / "r.json").write_text(json.dumps({"stable": True}))
+    (tmp_path / "m.json").write_text("{}")
+    cmds = script_commands()
+    assert cmds["kpi-diff"] == "kpi_diff" and "zen-publish-helper" not in cmds
+    assert all(run([b, "--help"]) == 0 for b in BUILTINS)
+    argv = list(sys.argv)
+    lines = [
+        "# KPI diff, twice: the script module is imported once",
+        "kpi-diff --baseline b.json --current c.json --out d1.json",
+        "reactor kpi-diff --baseline b.json --current c.json --out 'd 2.json'",
+        "econ --out e.json",
+        "gate --metrics m.json --report missing.json",
+        "gate --metrics m.json --report r.json",
+    ]
+    res = run_batch(lines, keep_going=True)
+    assert res == {"commands": 5, "failed": [5], "ok": False}
+    assert json.loads((tmp_path / "d 2.json").read_text())["fom"]["delta"] == pytest.approx(0.15)
+    assert (tmp_path / "e.json").exists() and sys.argv == argv
+    mod = sys.modules["scripts.kpi_diff"]
+    assert run_batch(lines, keep_going=False)["commands"] == 4
+    assert sys.modules["scripts.kpi_diff"] is mod
+    assert run(["kpi-diff", "--help"]) == 0 and run(["no-such-command"]) == 2
+    out = capsys.readouterr().out
+    assert out.count('"wrote": "d1.json"') == 2 and '{"gate": "feasibility", "ok": true}' in out
+
+
+def test_energy_ledger_power_series_and_vectorized_merge():
+    p = np.linspace(0.0, 100.0, 101)
+    a, b = EnergyLedger(series_resolution_s=None), EnergyLedger(series_resolution_s=None)
+    assert a.add_power_series("rf", p, 0.01) == pytest.approx(float(p.sum()) * 0.01)
+    for x in p:
+        b.add_channel_energy("rf", x, 0.01)
+    assert a.channels()["rf"] == pytest.approx(b.channels()["rf"]) and a.total_energy() == pytest.approx(b.total_energy())
+    ta, ea = a.channel_series("rf")
+    tb, eb = b.channel_series("rf")
+    assert ta.size == 101 and np.allclose(ta, tb) and np.allclose(ea, eb) and ta[-1] == pytest.approx(1.01)
+    # trapezoid is exact for a ramp; the next series continues on the channel clock
+    c = EnergyLedger(series_resolution_s=None)
+    assert c.add_power_series("rf", p, 0.01, method="trapezoid") == pytest.approx(50.0)
+    c.add_power_series("rf", np.array([10.0, 10.0]), np.array([0.5]), method="trapezoid")
+    t, e = c.channel_series("rf")
+    assert t[-1] == pytest.approx(1.5) and e[-1] == pytest.approx(55.0) and c.total_energy() == pytest.approx(55.0)
+    with pytest.raises(ValueError):
+        c.add_power_series("rf", p, np.full(3, 0.01))
+    with pytest.raises(ValueError):
+        c.add_power_series("rf", p, 0.01, method="simpson")
+    # downsampled series: the last point of each 0.25 s bin, across calls
+    d = EnergyLedger(series_resolution_s=0.25)
+    for chunk in np.array_split(np.full(1000, 2.0), 7):
+        d.add_power_series("coils", chunk, 1e-3)
+    t, e = d.channel_series("coils")
+    assert t.size == 5 and np.all(np.diff(np.floor(t / 0.25)) > 0) and e[-1] == pytest.approx(2.0)
+    assert EnergyLedger(series_resolution_s=0).add_power_series("x", p, 1.0) > 0
+    # totals only by default: per-sample calls keep no points
+    t0 = EnergyLedger()
+    for x in p:
+        t0.add_channel_energy("rf", x, 0.01)
+    assert t0.channel_series("rf")[0].size == 0 and not t0._pending and t0.channels()["rf"] == a.channels()["rf"]
+    # merge: totals and channels summed (first-seen order), series summed on the union of times
+    m = merge_ledgers(a, c, d)
+    assert list(m.channels()) == ["rf", "coils"]
+    assert m.total_energy() == pytest.approx(a.total_energy() + c.total_energy() + d.total_energy())
+    t, e = m.channel_series("rf")
+    assert e[-1] == pytest.approx(a.channels()["rf"] + 55.0) and np.all(np.diff(e) >= 0)
+    assert merge_ledgers().total_energy() == 0.0
+    # merged ledgers keep the coarsest resolution and the inputs' enhancement
+    assert m._resolution == 0.25 and merge_ledgers(a, c)._resolution is None and merge_ledgers(a, t0)._resolution == 0
+    a.apply_enhancement(4.0)
+    c.apply_enhancement(4.0)
+    assert merge_ledgers(a, c).total_energy() == pytest.approx(a.total_energy() + c.total_energy())
+    assert merge_ledgers(a, c)._enhancement == 4.0
+    assert merge_ledgers(a, d).total_energy() == pytest.approx(a.total_energy() + d.total_energy())
+
+
+def test_cli_param_sweep_evaluates_grid_once(tmp_path, monkeypatch, capsys):
+    import json
+
+    import reactor.metrics
+    from reactor.cli import build_parser
+
+    calls = []
+    real = reactor.metrics.confinement_efficiency_vec
+    monkeypatch.setattr(reactor.metrics, "confinement_efficiency_vec", lambda *a: calls.append(1) or real(*a))
+    args = build_parser().parse_args(["param-sweep", "--xi-steps", "3", "--ripple-steps", "2",
+                                      "--out", str(tmp_path / "s.csv"), "--plot", str(tmp_path / "s.png")])
+    args.func(args)
+    rows = json.loads(capsys.readouterr().out.strip().splitlines()[-1])["rows"]
+    assert len(rows) == 6 and len(calls) == 1
+    assert len((tmp_path / "s.csv").read_text().splitlines()) == 7
+
+
+def test_confinement_search_matches_grid_optimum_with_fewer_evals(tmp_path):
+    import csv
+    import importlib.util
+    import json
+    import pathlib
+    import subprocess
+    import sys
+
+    script = pathlib.Path(__file__).resolve().parents[1] / "scripts" / "param_sweep_confinement.py"
+    spec = importlib.util.spec_from_file_location("param_sweep_confinement", script)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    n = 20
+    grid = [np.linspace(lo, hi, n) for lo, hi in mod.CONFINEMENT_BOUNDS]
+    mod.optimize_confinement(*grid, out_csv=str(tmp_path / "grid.csv"))
+    with open(tmp_path / "grid.csv", newline="") as fh:
+        grid_best = max(float(r["eta"]) for r in csv.DictReader(fh))
+    for method in ("cmaes", "nelder-mead"):
+        res = mod.optimize_confinement_search(*mod.CONFINEMENT_BOUNDS, method=method, budget=200, seed=0)
+        assert res.feasible and res.n_evals * 40 <= n**3
+        assert res.best_value >= grid_best - 1e-5, method
+    out = tmp_path / "opt.json"
+    proc = subprocess.run([sys.executable, str(script), "--out", str(tmp_path / "sweep.csv"), "--optimize", "cmaes",
+                           "--budget", "100", "--optimize-out", str(out)], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    doc = json.loads(out.read_text())
+    assert doc["method"] == "cmaes" and doc["n_evals"] == 100 and doc["best"]["eta"] >= 0.94